@@ -1,14 +1,15 @@
 from django.contrib import admin
 
-from .models import AccessRule, BusinessElement, Role, UserRole
+from .models import AccessPolicy, AccessRule, BusinessElement, Role, UserRole
 
 
 @admin.register(Role)
 class RoleAdmin(admin.ModelAdmin):
     """Управление ролями"""
 
-    list_display = ("name", "description")
+    list_display = ("name", "parent", "description")
     list_filter = ("name",)
+    list_select_related = ("parent",)
     search_fields = ("name", "description")
     ordering = ("name",)
 
@@ -23,6 +24,14 @@ class BusinessElementAdmin(admin.ModelAdmin):
     ordering = ("name",)
 
 
+class AccessPolicyInline(admin.TabularInline):
+    """Политики (условия на строки) правила доступа"""
+
+    model = AccessPolicy
+    extra = 0
+    fields = ("action", "condition", "description")
+
+
 @admin.register(AccessRule)
 class AccessRuleAdmin(admin.ModelAdmin):
     """Управление правил доступа"""
@@ -38,6 +47,7 @@ class AccessRuleAdmin(admin.ModelAdmin):
     list_filter = ("role", "element")
     search_fields = ("role__name", "element__name")
     ordering = ("role", "element")
+    inlines = (AccessPolicyInline,)
 
     fieldsets = (
         ("Основное", {"fields": ("role", "element")}),
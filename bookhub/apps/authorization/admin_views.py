@@ -1,3 +1,4 @@
+from django.db.models import Count
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
@@ -9,7 +10,7 @@ from .serializers import AccessRuleSerializer, BusinessElementSerializer, RoleSe
 class RoleViewSet(viewsets.ModelViewSet):
     """Управление ролями (только для админов)"""
 
-    queryset = Role.objects.all()
+    queryset = Role.objects.annotate(user_count=Count("user_roles"))
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
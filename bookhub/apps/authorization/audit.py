@@ -0,0 +1,108 @@
+import atexit
+import json
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 0.1
+
+
+def audit_decision(request, element_name, permission_type, allowed, **details):
+    """
+    Пишет решение RBAC в канал аудита.
+
+    Отказы пишутся всегда, разрешения - с вероятностью
+    RBAC_AUDIT_SAMPLE_RATE. Сообщение форматируется только в потоке
+    QueueListener, поэтому в запросе стоит лишь создание записи.
+    """
+
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if allowed:
+        rate = getattr(settings, "RBAC_AUDIT_SAMPLE_RATE", DEFAULT_SAMPLE_RATE)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return
+
+    user = getattr(request, "user", None)
+    record = {
+        "user_id": str(user.pk) if user is not None and user.pk else None,
+        "method": request.method,
+        "path": getattr(request, "path", None),
+        "element": element_name,
+        "action": permission_type,
+        "allowed": bool(allowed),
+        **details,
+    }
+    logger.log(
+        logging.INFO if allowed else logging.WARNING,
+        "rbac %s %s %s -> %s",
+        record["user_id"],
+        element_name,
+        permission_type,
+        "allow" if allowed else "deny",
+        extra={"rbac": record},
+    )
+
+
+class AuditFormatter(logging.Formatter):
+    """
+    Формирует JSON-строку из структурированной записи аудита
+    """
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            **getattr(record, "rbac", {"message": record.getMessage()}),
+        }
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class AuditQueueHandler(QueueHandler):
+    """
+    Неблокирующий обработчик: записи уходят в очередь, а вывод
+    и форматирование выполняет фоновый QueueListener.
+
+    Отказы не теряются: последние reserved мест очереди занимают только
+    они, а при полной очереди отказ пишется сразу, в потоке запроса.
+    Разрешения при нехватке места отбрасываются (счетчик dropped).
+    """
+
+    def __init__(self, maxsize=10000, reserved=1000):
+        super().__init__(queue.Queue(maxsize))
+        self.reserved = min(reserved, maxsize)
+        self.dropped = 0
+
+        self.target = logging.StreamHandler()
+        self.target.setFormatter(AuditFormatter())
+        self.listener = QueueListener(
+            self.queue, self.target, respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Форматирование откладывается до потока QueueListener
+        return record
+
+    def enqueue(self, record):
+        if record.levelno < logging.WARNING:
+            # Разрешение: лучше потерять запись аудита, чем блокировать запрос
+            if self.queue.qsize() >= self.queue.maxsize - self.reserved:
+                self.dropped += 1
+                return
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.target.handle(record)
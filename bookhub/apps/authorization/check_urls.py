@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import PermissionCheckView
+
+urlpatterns = [
+    path("check/", PermissionCheckView.as_view(), name="permission-check"),
+]
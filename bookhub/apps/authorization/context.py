@@ -0,0 +1,311 @@
+from apps.core.ownership import get_owner_field
+from django.apps import apps
+from django.db.models import F, Q, UUIDField, Value
+
+from .hierarchy import PERMISSION_BITS, RBAC_VERSION, get_compiled_permissions
+from .models import Role
+from .policies import compile_policies
+
+# (тип права, на все объекты) -> поле AccessRule
+PERMISSION_FIELDS = {
+    ("read", False): "read_permission",
+    ("read", True): "read_all_permission",
+    ("create", False): "create_permission",
+    ("create", True): "create_permission",
+    ("update", False): "update_permission",
+    ("update", True): "update_all_permission",
+    ("delete", False): "delete_permission",
+    ("delete", True): "delete_all_permission",
+}
+
+
+# Бизнес-элемент -> модель; поле владельца объявлено в модели (owner_field)
+ELEMENT_MODELS = {
+    "user": "users.User",
+    "product": "products.Product",
+    "category": "products.Category",
+    "order": "orders.Order",
+    "cart": "orders.CartItem",
+    "review": "orders.Review",
+}
+
+
+def user_rbac_version(user_id):
+    return f"{RBAC_VERSION}:user:{user_id}"
+
+
+def load_object_owners(pairs):
+    """
+    Владельцы объектов одним запросом: {(element, id): owner_id}.
+
+    pairs - пары (элемент, id объекта); отсутствующих объектов в ответе нет.
+    """
+
+    ids_by_element = {}
+    for element_name, object_id in pairs:
+        if element_name in ELEMENT_MODELS:
+            ids_by_element.setdefault(element_name, set()).add(object_id)
+
+    querysets = []
+    for element_name, ids in ids_by_element.items():
+        model = apps.get_model(ELEMENT_MODELS[element_name])
+        owner_field = get_owner_field(model)
+        owner = F(owner_field) if owner_field else Value(None, UUIDField())
+        querysets.append(
+            model.objects.filter(pk__in=ids)
+            .annotate(rbac_element=Value(element_name), rbac_owner=owner)
+            .order_by()
+            .values_list("rbac_element", "pk", "rbac_owner")
+        )
+    if not querysets:
+        return {}
+
+    rows = querysets[0].union(*querysets[1:], all=True)
+    return {
+        (element_name, str(object_id)): owner_id
+        for element_name, object_id, owner_id in rows
+    }
+
+
+class AuthorizationContext:
+    """
+    Контекст авторизации в рамках одного запроса.
+
+    Роли и правила доступа пользователя загружаются один раз,
+    а каждое решение (элемент, действие, свои/все объекты) запоминается.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._role_names = None
+        self._masks = None
+        self._decisions = {}
+        self._policies = {}
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @property
+    def is_admin(self):
+        return self.is_authenticated and (self.user.is_staff or self.user.is_superuser)
+
+    @property
+    def role_names(self):
+        """
+        Имена ролей пользователя (один запрос на весь запрос)
+        """
+
+        if self._role_names is None:
+            if self.is_authenticated:
+                self._role_names = frozenset(
+                    Role.objects.filter(user_roles__user=self.user).values_list(
+                        "name", flat=True
+                    )
+                )
+            else:
+                self._role_names = frozenset()
+        return self._role_names
+
+    def has_role(self, name):
+        """
+        Назначена ли пользователю роль.
+
+        Иерархия здесь не учитывается: наследуются права, а не роль -
+        менеджер не становится покупателем из-за прав роли-предка.
+        """
+
+        return name in self.role_names
+
+    @property
+    def effective_role_names(self):
+        """
+        Роли, по которым считаются права: без ролей пользователь - гость
+        """
+
+        if self.role_names or self.is_admin:
+            return self.role_names
+        return frozenset({"guest"})
+
+    @property
+    def masks(self):
+        """
+        Маски прав по элементам: OR скомпилированных прав ролей пользователя
+        """
+
+        if self._masks is None:
+            compiled = get_compiled_permissions()["masks"]
+            self._masks = {}
+            for role_name in self.effective_role_names:
+                for element_name, mask in compiled.get(role_name, {}).items():
+                    self._masks[element_name] = self._masks.get(element_name, 0) | mask
+        return self._masks
+
+    def check(self, element_name, permission_type, all_objects=False):
+        """
+        Есть ли у пользователя право на элемент (OR по ролям и их предкам)
+        """
+
+        key = (element_name, permission_type, bool(all_objects))
+        if key not in self._decisions:
+            field = PERMISSION_FIELDS.get(key[1:])
+            self._decisions[key] = field is not None and bool(
+                self.masks.get(element_name, 0) & PERMISSION_BITS[field]
+            )
+        return self._decisions[key]
+
+    def policies(self, element_name, permission_type):
+        """
+        Условия политик (ABAC) ролей пользователя для элемента и действия
+        """
+
+        key = (element_name, permission_type)
+        if key not in self._policies:
+            compiled = get_compiled_permissions()["policies"]
+            self._policies[key] = [
+                condition
+                for role_name in self.effective_role_names
+                for condition in compiled.get(role_name, {}).get(key, ())
+            ]
+        return self._policies[key]
+
+    def policy_filter(self, element_name, permission_type):
+        """
+        Q по политикам пользователя (None - политик нет)
+        """
+
+        return compile_policies(
+            self.policies(element_name, permission_type),
+            self.user.pk if self.is_authenticated else None,
+        )
+
+    def object_matches_policies(self, element_name, permission_type, obj):
+        """
+        Подходит ли объект под политики - проверяется одним запросом в БД
+        """
+
+        q = self.policy_filter(element_name, permission_type)
+        if q is None:
+            return False
+        return type(obj)._default_manager.filter(q, pk=obj.pk).exists()
+
+    def has_any_access(self, element_name, permission_type):
+        """
+        Есть ли доступ хоть к каким-то объектам (флаги или политики)
+        """
+
+        return self.scope(element_name, permission_type) is not None or bool(
+            self.policies(element_name, permission_type)
+        )
+
+    def scope(self, element_name, permission_type):
+        """
+        Какие объекты доступны: "all", "own" или None (никакие)
+        """
+
+        if self.is_admin or self.check(element_name, permission_type, True):
+            return "all"
+        if self.check(element_name, permission_type, False):
+            return "own"
+        return None
+
+    def scope_filter(self, element_name, permission_type, owner_field, model=None):
+        """
+        Условие для queryset: поле владельца и политики (None - доступа нет)
+        """
+
+        scope = self.scope(element_name, permission_type)
+        if scope == "all":
+            return Q()
+
+        condition = self.policy_filter(element_name, permission_type)
+        if condition is not None and model is not None:
+            # Подзапрос: lookup'ы по связям "многие" не размножают строки
+            condition = Q(pk__in=model._default_manager.filter(condition).values("pk"))
+        if scope == "own":
+            own = Q(**{owner_field: self.user.pk})
+            return own if condition is None else own | condition
+        return condition
+
+    def evaluate(self, checks):
+        """
+        Пакетная проверка прав.
+
+        checks - словари с ключами element, action и необязательными
+        object_id / all; владельцы всех объектов загружаются одним запросом,
+        политики проверяются в БД пакетно.
+        """
+
+        owners = load_object_owners(
+            (item["element"], str(item["object_id"]))
+            for item in checks
+            if item.get("object_id")
+        )
+
+        results = []
+        for item in checks:
+            element_name, action = item["element"], item["action"]
+            object_id = item.get("object_id")
+            result = {"element": element_name, "action": action}
+
+            if object_id:
+                result["object_id"] = str(object_id)
+                key = (element_name, str(object_id))
+                if key not in owners:
+                    result["allowed"] = False
+                    result["found"] = False
+                    results.append(result)
+                    continue
+                owner_id = owners[key]
+                all_objects = owner_id is not None and str(owner_id) != str(
+                    self.user.pk
+                )
+            else:
+                all_objects = item.get("all", False)
+
+            result["allowed"] = self.is_admin or self.check(
+                element_name, action, all_objects
+            )
+            results.append(result)
+
+        self._apply_policies(results)
+        return results
+
+    def _apply_policies(self, results):
+        """
+        Отказы по объектам перепроверяет по политикам:
+        один запрос на пару (элемент, действие)
+        """
+
+        pending = {}
+        for result in results:
+            if result["allowed"] or not result.get("object_id"):
+                continue
+            key = (result["element"], result["action"])
+            if self.policies(*key):
+                pending.setdefault(key, []).append(result)
+
+        for (element_name, action), items in pending.items():
+            model = apps.get_model(ELEMENT_MODELS[element_name])
+            matched = {
+                str(pk)
+                for pk in model._default_manager.filter(
+                    self.policy_filter(element_name, action),
+                    pk__in=[item["object_id"] for item in items],
+                ).values_list("pk", flat=True)
+            }
+            for item in items:
+                item["allowed"] = item["object_id"] in matched
+
+
+def get_authorization_context(request):
+    """
+    Возвращает контекст авторизации, привязанный к запросу
+    """
+
+    user = getattr(request, "user", None)
+    context = getattr(request, "_authorization_context", None)
+    if context is None or context.user is not user:
+        context = AuthorizationContext(user)
+        request._authorization_context = context
+    return context
@@ -0,0 +1,62 @@
+from apps.core.ownership import get_owner_field
+from rest_framework.filters import BaseFilterBackend
+
+from .context import get_authorization_context
+
+
+def get_view_owner_field(view, model=None):
+    """
+    Поле владельца: view.owner_field или owner_field модели queryset
+    """
+
+    owner_field = getattr(view, "owner_field", None)
+    if owner_field is None:
+        if model is None and hasattr(view, "get_queryset"):
+            model = view.get_queryset().model
+        owner_field = get_owner_field(model)
+    return owner_field
+
+
+def is_rbac_scoped(view):
+    """
+    Ограничивается ли queryset представления через RBACFilterBackend
+    """
+
+    return RBACFilterBackend in getattr(view, "filter_backends", ()) and bool(
+        get_view_owner_field(view)
+    )
+
+
+class RBACFilterBackend(BaseFilterBackend):
+    """
+    Оставляет в queryset только объекты, доступные пользователю по RBAC.
+
+    Права "свои/все" из AccessRule переводятся в условие на поле
+    владельца (owner_field модели), а политики AccessPolicy - в подзапрос,
+    поэтому проверка выполняется в SQL.
+    """
+
+    METHOD_TO_PERMISSION = {
+        "GET": "read",
+        "OPTIONS": "read",
+        "HEAD": "read",
+        # POST на существующий объект (detail action) изменяет его
+        "POST": "update",
+        "PUT": "update",
+        "PATCH": "update",
+        "DELETE": "delete",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        element_name = getattr(view, "business_element_name", None)
+        owner_field = get_view_owner_field(view, queryset.model)
+        if not element_name or not owner_field:
+            return queryset
+
+        permission_type = self.METHOD_TO_PERMISSION.get(request.method, "read")
+        condition = get_authorization_context(request).scope_filter(
+            element_name, permission_type, owner_field, queryset.model
+        )
+        if condition is None:
+            return queryset.none()
+        return queryset.filter(condition)
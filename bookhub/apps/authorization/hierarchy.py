@@ -0,0 +1,117 @@
+from apps.core.cache import get_version
+from django.core.cache import cache
+
+from .models import AccessPolicy, AccessRule, Role
+
+# Пространство имен версии кеша RBAC (см. apps.core.cache)
+RBAC_VERSION = "rbac"
+
+# Биты прав в маске элемента
+PERMISSION_BITS = {
+    "read_permission": 1,
+    "read_all_permission": 2,
+    "create_permission": 4,
+    "update_permission": 8,
+    "update_all_permission": 16,
+    "delete_permission": 32,
+    "delete_all_permission": 64,
+}
+
+COMPILED_CACHE_KEY = "rbac:compiled:{}"
+COMPILED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Скомпилированные права текущего процесса: (версия RBAC, данные)
+_compiled = (None, None)
+
+
+def rule_mask(flags):
+    """
+    Маска прав по словарю флагов AccessRule (например, строке .values())
+    """
+
+    return sum(bit for field, bit in PERMISSION_BITS.items() if flags.get(field))
+
+
+def build_closure(parents):
+    """
+    Транзитивное замыкание иерархии ролей.
+
+    parents - {роль: родитель или None}; возвращает {роль: (роль, предки...)}.
+    Цикл в данных обрывается на уже пройденной роли.
+    """
+
+    closure = {}
+    for role_name in parents:
+        chain = []
+        current = role_name
+        while current is not None and current not in chain:
+            if current in closure:
+                chain.extend(closure[current])
+                break
+            chain.append(current)
+            current = parents.get(current)
+        closure[role_name] = tuple(dict.fromkeys(chain))
+    return closure
+
+
+def compile_permissions():
+    """
+    Эффективные права ролей: OR правил и политик роли и всех ее предков.
+
+    Возвращает {"closure": {роль: (роль, предки...)},
+    "masks": {роль: {элемент: маска}},
+    "policies": {роль: {(элемент, действие): [условия]}}};
+    считается при изменении RBAC, а не в каждом запросе.
+    """
+
+    parents = dict(Role.objects.values_list("name", "parent__name"))
+    own_masks = {}
+    for rule in AccessRule.objects.values(
+        "role__name", "element__name", *PERMISSION_BITS
+    ):
+        masks = own_masks.setdefault(rule["role__name"], {})
+        element_name = rule["element__name"]
+        masks[element_name] = masks.get(element_name, 0) | rule_mask(rule)
+
+    own_policies = {}
+    for policy in AccessPolicy.objects.values(
+        "rule__role__name", "rule__element__name", "action", "condition"
+    ):
+        own_policies.setdefault(policy["rule__role__name"], []).append(
+            (policy["rule__element__name"], policy["action"], policy["condition"])
+        )
+
+    closure = build_closure(parents)
+    compiled = {"closure": closure, "masks": {}, "policies": {}}
+    for role_name, chain in closure.items():
+        masks = compiled["masks"][role_name] = {}
+        policies = compiled["policies"][role_name] = {}
+        for ancestor in chain:
+            for element_name, mask in own_masks.get(ancestor, {}).items():
+                masks[element_name] = masks.get(element_name, 0) | mask
+            for element_name, action, condition in own_policies.get(ancestor, ()):
+                policies.setdefault((element_name, action), []).append(condition)
+    return compiled
+
+
+def get_compiled_permissions():
+    """
+    Скомпилированные права для текущей версии RBAC.
+
+    Хранятся в памяти процесса и в общем кеше; пересчитываются только
+    после изменения ролей или правил (версия RBAC).
+    """
+
+    global _compiled
+
+    version = get_version(RBAC_VERSION)
+    if _compiled[0] == version:
+        return _compiled[1]
+
+    cache_key = COMPILED_CACHE_KEY.format(version)
+    compiled = cache.get(cache_key)
+    if compiled is None:
+        compiled = compile_permissions()
+        cache.set(cache_key, compiled, COMPILED_CACHE_TIMEOUT)
+    _compiled = (version, compiled)
+    return compiled
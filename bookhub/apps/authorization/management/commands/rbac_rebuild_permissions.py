@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...materialized import rebuild
+
+
+class Command(BaseCommand):
+    help = "Полный пересчет материализованных прав пользователей"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Права пересчитаны: {users} пользователей "
+                f"за {time.perf_counter() - start:.2f} с"
+            )
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...materialized import refresh_users, verify
+
+
+class Command(BaseCommand):
+    help = "Проверка материализованных прав пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Пересчитать пользователей с расхождениями",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Сколько расхождений вывести"
+        )
+
+    def handle(self, *args, **options):
+        mismatches = verify()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Расхождений нет"))
+            return
+
+        for user_id, element_id, stored, expected in mismatches[: options["limit"]]:
+            self.stdout.write(
+                f"   • {user_id} / {element_id}: "
+                f"в таблице {stored}, ожидается {expected}"
+            )
+
+        if options["fix"]:
+            refresh_users({user_id for user_id, *_ in mismatches})
+            self.stdout.write(
+                self.style.SUCCESS(f"Исправлено расхождений: {len(mismatches)}")
+            )
+        else:
+            raise CommandError(f"Найдено расхождений: {len(mismatches)}")
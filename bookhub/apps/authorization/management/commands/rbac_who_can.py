@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import BusinessElement
+from ...reports import REPORT_FORMATS, iter_rows, who_can
+
+
+class Command(BaseCommand):
+    help = "Отчет: пользователи, которым разрешено действие над элементом"
+
+    def add_arguments(self, parser):
+        parser.add_argument("element", help="Бизнес-элемент (order, product, ...)")
+        parser.add_argument(
+            "action", choices=["read", "create", "update", "delete"], help="Действие"
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="Только право на все объекты"
+        )
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Включать неактивных пользователей",
+        )
+        parser.add_argument("--format", choices=REPORT_FORMATS, default="csv")
+        parser.add_argument("--output", help="Файл отчета (по умолчанию stdout)")
+
+    def handle(self, *args, **options):
+        if not BusinessElement.objects.filter(name=options["element"]).exists():
+            raise CommandError(f"Бизнес-элемент '{options['element']}' не найден")
+
+        render, _ = REPORT_FORMATS[options["format"]]
+        queryset = who_can(
+            options["element"],
+            options["action"],
+            all_objects=options["all"],
+            include_inactive=options["include_inactive"],
+        )
+
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        chunks = render(counted(iter_rows(queryset)))
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
+        else:
+            # self.stdout: вывод перехватывается call_command(stdout=...)
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+
+        if options["output"]:
+            self.stderr.write(
+                self.style.SUCCESS(f"Записано строк: {count} -> {options['output']}")
+            )
@@ -0,0 +1,174 @@
+from apps.users.models import User
+from django.db import transaction
+from django.db.models import F
+
+from .context import PERMISSION_FIELDS
+from .hierarchy import PERMISSION_BITS, get_compiled_permissions
+from .models import BusinessElement, UserPermission, UserRole
+
+# Администратор получает все права на все элементы
+ADMIN_MASK = sum(PERMISSION_BITS.values())
+REFRESH_BATCH_SIZE = 2000
+
+
+def compute_masks(user_ids):
+    """
+    Эффективные маски пользователей: {user_id: {element_id: mask}}.
+
+    Роли берутся одним запросом, права - из скомпилированных прав ролей;
+    без ролей пользователь - гость, администратор получает ADMIN_MASK,
+    у неактивного пользователя прав нет.
+    """
+
+    compiled = get_compiled_permissions()["masks"]
+    element_ids = dict(BusinessElement.objects.values_list("name", "pk"))
+
+    role_names = {}
+    for user_id, role_name in UserRole.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "role__name"
+    ):
+        role_names.setdefault(user_id, set()).add(role_name)
+
+    result = {}
+    for user_id, is_active, is_staff, is_superuser in User.objects.filter(
+        pk__in=user_ids
+    ).values_list("pk", "is_active", "is_staff", "is_superuser"):
+        if not is_active:
+            result[user_id] = {}
+            continue
+        if is_staff or is_superuser:
+            result[user_id] = dict.fromkeys(element_ids.values(), ADMIN_MASK)
+            continue
+        masks = {}
+        for role_name in role_names.get(user_id) or {"guest"}:
+            for element_name, mask in compiled.get(role_name, {}).items():
+                if mask and element_name in element_ids:
+                    element_id = element_ids[element_name]
+                    masks[element_id] = masks.get(element_id, 0) | mask
+        result[user_id] = masks
+    return result
+
+
+def refresh_users(user_ids):
+    """
+    Пересчитывает материализованные права пользователей пакетами.
+
+    Строки пишутся upsert'ом по (user, element): параллельные пересчеты
+    одного пользователя не падают на уникальности. Маска пишется для
+    каждого элемента, а строки с нулевой маской затем удаляются.
+    """
+
+    user_ids = list(user_ids)
+    element_ids = list(BusinessElement.objects.values_list("pk", flat=True))
+    for start in range(0, len(user_ids), REFRESH_BATCH_SIZE):
+        batch = user_ids[start : start + REFRESH_BATCH_SIZE]
+        masks = compute_masks(batch)
+        with transaction.atomic():
+            UserPermission.objects.bulk_create(
+                [
+                    UserPermission(
+                        user_id=user_id,
+                        element_id=element_id,
+                        mask=elements.get(element_id, 0),
+                    )
+                    for user_id, elements in masks.items()
+                    for element_id in element_ids
+                ],
+                update_conflicts=True,
+                unique_fields=["user", "element"],
+                update_fields=["mask", "updated_at"],
+            )
+            UserPermission.objects.filter(user_id__in=batch, mask=0).delete()
+
+
+def affected_users(role_names):
+    """
+    Пользователи, права которых зависят от ролей (включая наследников)
+    """
+
+    changed = set(role_names)
+    closure = get_compiled_permissions()["closure"]
+    dependent = {
+        role_name for role_name, chain in closure.items() if changed.intersection(chain)
+    }
+    user_ids = set(
+        UserRole.objects.filter(role__name__in=dependent).values_list(
+            "user_id", flat=True
+        )
+    )
+    if "guest" in dependent:
+        # Гость - все пользователи без ролей
+        user_ids.update(
+            User.objects.exclude(pk__in=UserRole.objects.values("user")).values_list(
+                "pk", flat=True
+            )
+        )
+    return user_ids
+
+
+def refresh_roles(role_names):
+    """
+    Пересчитывает права пользователей после изменения ролей или правил
+    """
+
+    refresh_users(affected_users(role_names))
+
+
+def rebuild():
+    """
+    Полный пересчет таблицы; возвращает число пользователей
+    """
+
+    user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+    refresh_users(user_ids)
+    UserPermission.objects.exclude(user_id__in=User.objects.values("pk")).delete()
+    return len(user_ids)
+
+
+def verify(batch_size=REFRESH_BATCH_SIZE):
+    """
+    Сравнивает таблицу с пересчитанными правами.
+
+    Возвращает расхождения (user_id, element_id, в таблице, ожидается).
+    """
+
+    mismatches = []
+    user_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start : start + batch_size]
+        expected = compute_masks(batch)
+        stored = {}
+        for user_id, element_id, mask in UserPermission.objects.filter(
+            user_id__in=batch
+        ).values_list("user_id", "element_id", "mask"):
+            stored.setdefault(user_id, {})[element_id] = mask
+
+        for user_id in batch:
+            have, want = stored.get(user_id, {}), expected.get(user_id, {})
+            for element_id in have.keys() | want.keys():
+                if have.get(element_id) != want.get(element_id):
+                    mismatches.append(
+                        (
+                            user_id,
+                            element_id,
+                            have.get(element_id),
+                            want.get(element_id),
+                        )
+                    )
+    return mismatches
+
+
+def permitted_users(element_name, permission_type, all_objects=False):
+    """
+    Подзапрос id пользователей с правом на элемент - для соединений в SQL.
+
+    Например: Order.objects.filter(customer__in=permitted_users("order", "read")).
+    """
+
+    bit = PERMISSION_BITS[PERMISSION_FIELDS[(permission_type, all_objects)]]
+    return (
+        UserPermission.objects.filter(element__name=element_name)
+        .annotate(granted=F("mask").bitand(bit))
+        .filter(granted__gt=0)
+        .values("user")
+    )
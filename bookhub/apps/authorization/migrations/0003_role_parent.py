@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authorization", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="role",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="children",
+                to="authorization.role",
+                verbose_name="Родительская роль (права наследуются)",
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:19
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authorization", "0003_role_parent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccessPolicy",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        auto_created=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлено"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Удалено"),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("read", "Чтение"),
+                            ("update", "Редактирование"),
+                            ("delete", "Удаление"),
+                        ],
+                        max_length=20,
+                        verbose_name="Действие",
+                    ),
+                ),
+                (
+                    "condition",
+                    models.JSONField(
+                        help_text=(
+                            'Например: {"status__in": ["pending", "processing"]} '
+                            'или {"product__order_items__order__customer": "$user"}'
+                        ),
+                        verbose_name="Условие",
+                    ),
+                ),
+                ("description", models.TextField(blank=True, verbose_name="Описание")),
+                (
+                    "rule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="policies",
+                        to="authorization.accessrule",
+                        verbose_name="Правило доступа",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Политика доступа",
+                "verbose_name_plural": "Политики доступа",
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:26
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authorization", "0004_access_policy"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserPermission",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        auto_created=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлено"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Удалено"),
+                ),
+                (
+                    "mask",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Маска прав"
+                    ),
+                ),
+                (
+                    "element",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_permissions",
+                        to="authorization.businesselement",
+                        verbose_name="Бизнес-элемент",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="effective_permissions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Эффективное право пользователя",
+                "verbose_name_plural": "Эффективные права пользователей",
+                "indexes": [
+                    models.Index(
+                        fields=["element", "mask"],
+                        name="authorizati_element_8c117a_idx",
+                    )
+                ],
+                "unique_together": {("user", "element")},
+            },
+        ),
+    ]
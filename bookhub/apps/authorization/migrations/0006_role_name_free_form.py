@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authorization", "0005_user_permission"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="role",
+            name="name",
+            field=models.CharField(
+                max_length=50, unique=True, verbose_name="Название роли"
+            ),
+        ),
+    ]
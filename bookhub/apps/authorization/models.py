@@ -1,28 +1,40 @@
 from apps.core.models import BaseModel
+from django.apps import apps
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
 class Role(BaseModel):
     """Роли пользователей в системе"""
 
-    ROLE_CHOICES = [
-        ("admin", "Администратор"),
-        ("manager", "Менеджер"),
-        ("customer", "Покупатель"),
-        ("guest", "Гость"),
-    ]
-
-    name = models.CharField(
-        max_length=50, choices=ROLE_CHOICES, unique=True, verbose_name="Название роли"
-    )
+    # Набор ролей не фиксирован: роли заводятся в админке (сотни ролей)
+    name = models.CharField(max_length=50, unique=True, verbose_name="Название роли")
     description = models.TextField(blank=True, verbose_name="Описание роли")
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="children",
+        verbose_name="Родительская роль (права наследуются)",
+    )
 
     class Meta:
         verbose_name = "Роль"
         verbose_name_plural = "Роли"
 
     def __str__(self):
-        return self.get_name_display()
+        return self.name
+
+    def clean(self):
+        # Роль не может наследовать сама себя (в том числе через предков)
+        ancestor = self.parent
+        while ancestor is not None:
+            if ancestor.pk == self.pk:
+                raise ValidationError(
+                    {"parent": "Циклическая иерархия ролей недопустима"}
+                )
+            ancestor = ancestor.parent
 
 
 class BusinessElement(BaseModel):
@@ -94,6 +106,62 @@ class AccessRule(BaseModel):
         return f"{self.role} -> {self.element}"
 
 
+class AccessPolicy(BaseModel):
+    """
+    Условие на строки (ABAC) для правила доступа.
+
+    Политика дополняет права "свои/все": роль получает действие над
+    объектами, подходящими под условие. Условие - ORM lookup'ы, значение
+    "$user" заменяется на id текущего пользователя.
+    """
+
+    ACTION_CHOICES = [
+        ("read", "Чтение"),
+        ("update", "Редактирование"),
+        ("delete", "Удаление"),
+    ]
+
+    rule = models.ForeignKey(
+        AccessRule,
+        on_delete=models.CASCADE,
+        related_name="policies",
+        verbose_name="Правило доступа",
+    )
+    action = models.CharField(
+        max_length=20, choices=ACTION_CHOICES, verbose_name="Действие"
+    )
+    condition = models.JSONField(
+        verbose_name="Условие",
+        help_text='Например: {"status__in": ["pending", "processing"]} '
+        'или {"product__order_items__order__customer": "$user"}',
+    )
+    description = models.TextField(blank=True, verbose_name="Описание")
+
+    class Meta:
+        verbose_name = "Политика доступа"
+        verbose_name_plural = "Политики доступа"
+
+    def __str__(self):
+        return f"{self.rule}: {self.get_action_display()}"
+
+    def clean(self):
+        from .context import ELEMENT_MODELS
+        from .policies import validate_condition
+
+        element = getattr(getattr(self, "rule", None), "element", None)
+        if element is None:
+            return
+        model_label = ELEMENT_MODELS.get(element.name)
+        if model_label is None:
+            raise ValidationError(
+                {"condition": "Для этого элемента политики не поддерживаются"}
+            )
+        try:
+            validate_condition(apps.get_model(model_label), self.condition)
+        except Exception as e:
+            raise ValidationError({"condition": f"Некорректное условие: {e}"})
+
+
 class UserRole(BaseModel):
     """Связь пользователей с ролями (многие-ко-многим)"""
 
@@ -114,3 +182,37 @@ class UserRole(BaseModel):
 
     def __str__(self):
         return f"{self.user} - {self.role}"
+
+
+class UserPermission(BaseModel):
+    """
+    Материализованные права: пользователь x элемент -> битовая маска.
+
+    Поддерживается сигналами при изменении ролей и правил (см. materialized),
+    позволяет применять права RBAC соединением прямо в SQL.
+    """
+
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="effective_permissions",
+        verbose_name="Пользователь",
+    )
+    element = models.ForeignKey(
+        BusinessElement,
+        on_delete=models.CASCADE,
+        related_name="user_permissions",
+        verbose_name="Бизнес-элемент",
+    )
+    mask = models.PositiveSmallIntegerField(default=0, verbose_name="Маска прав")
+
+    class Meta:
+        verbose_name = "Эффективное право пользователя"
+        verbose_name_plural = "Эффективные права пользователей"
+        unique_together = ["user", "element"]
+        indexes = [
+            models.Index(fields=["element", "mask"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} -> {self.element}: {self.mask}"
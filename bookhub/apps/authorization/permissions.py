@@ -1,9 +1,12 @@
 import logging
 
+from apps.core.ownership import get_owner_id, is_owner
 from django.contrib.auth import get_user_model
 from rest_framework import permissions
 
-from .models import AccessRule, BusinessElement, Role, UserRole
+from .audit import audit_decision
+from .context import get_authorization_context
+from .filters import RBACFilterBackend, is_rbac_scoped
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -24,6 +27,9 @@ class RBACPermission(permissions.BasePermission):
         "DELETE": "delete",
     }
 
+    # Backend для filter_backends: свои/все объекты отбираются в SQL
+    filter_backend = RBACFilterBackend
+
     def __init__(self, element_name=None, require_all=False):
         """
         param element_name: имя бизнес-элемента (product, order, etc.)
@@ -37,13 +43,11 @@ class RBACPermission(permissions.BasePermission):
         Проверка прав доступа пользователя
         на основе ролевой модели (RBAC)
         """
-        try:
-            path = getattr(request, "path", "unknown_path")
-            logger.debug(
-                f"RBACPermission.has_permission called for {request.method} {path}"
-            )
-        except Exception:
-            logger.debug(f"RBACPermission.has_permission called for {request.method}")
+        logger.debug(
+            "RBACPermission.has_permission called for %s %s",
+            request.method,
+            getattr(request, "path", "unknown_path"),
+        )
 
         # Публичные маршруты
         if request.method == "GET" and getattr(view, "public_read", False):
@@ -67,17 +71,19 @@ class RBACPermission(permissions.BasePermission):
                 view.__class__.__name__.lower().replace("view", "").replace("api", "")
             )
             logger.warning(
-                f"No business_element_name found, using derived name: {element_name}"
+                "No business_element_name found, using derived name: %s",
+                element_name,
             )
 
         logger.debug(
-            f"Checking permissions for element: "
-            f"{element_name}, user: {request.user.email}"
+            "Checking permissions for element: %s, user: %s",
+            element_name,
+            request.user.pk,
         )
 
         # Определяем тип права
         permission_type = self._get_permission_type(request.method)
-        logger.debug(f"Permission type: {permission_type}")
+        logger.debug("Permission type: %s", permission_type)
 
         # Проверяем право через RBAC
         return self._check_rbac_permission(
@@ -88,7 +94,11 @@ class RBACPermission(permissions.BasePermission):
         """
         Проверка права на конкретный объект
         """
-        logger.debug(f"RBACPermission.has_object_permission called for obj: {obj}")
+        logger.debug(
+            "RBACPermission.has_object_permission called for %s %s",
+            type(obj).__name__,
+            obj.pk,
+        )
 
         if not request.user or not request.user.is_authenticated:
             logger.warning("User not authenticated in object permission")
@@ -104,22 +114,41 @@ class RBACPermission(permissions.BasePermission):
         if not element_name:
             element_name = type(obj).__name__.lower()
             logger.warning(
-                f"No business_element_name found, using object type: {element_name}"
+                "No business_element_name found, using object type: %s",
+                element_name,
             )
 
         # Определяем тип права
         permission_type = self._get_permission_type(request.method)
 
-        # Получаем владельца объекта
+        # Объект уже прошел RBACFilterBackend - владелец проверен в SQL
+        if is_rbac_scoped(view):
+            return self._check_rbac_permission(
+                request.user, element_name, permission_type, request, view
+            )
+
+        # Получаем владельца объекта (id, без загрузки пользователя)
         obj_owner = self._get_object_owner(obj)
-        logger.debug(f"Object owner: {obj_owner}, Current user: {request.user}")
+        logger.debug("Object owner: %s, current user: %s", obj_owner, request.user.pk)
 
         # Проверяем через RBAC
         has_permission = self._check_rbac_permission(
-            request.user, element_name, permission_type, request, view, obj_owner
+            request.user,
+            element_name,
+            permission_type,
+            request,
+            view,
+            obj_owner,
+            object_level=True,
         )
 
-        logger.debug(f"Object permission result: {has_permission}")
+        # Политики (ABAC) проверяются одним запросом к БД
+        if not has_permission:
+            has_permission = get_authorization_context(request).object_matches_policies(
+                element_name, permission_type, obj
+            )
+
+        logger.debug("Object permission result: %s", has_permission)
         return has_permission
 
     def _get_permission_type(self, http_method):
@@ -129,147 +158,85 @@ class RBACPermission(permissions.BasePermission):
 
         return self.METHOD_TO_PERMISSION.get(http_method, "read")
 
+    def _policies_checked_later(self, request, view):
+        """
+        Будут ли условия политик проверены после has_permission:
+        на объекте (detail маршрут) или в SQL через RBACFilterBackend
+        """
+
+        lookup = getattr(view, "lookup_url_kwarg", None) or getattr(
+            view, "lookup_field", None
+        )
+        if lookup and lookup in (getattr(view, "kwargs", None) or {}):
+            return True
+
+        # Создание не проходит через filter_queryset
+        return is_rbac_scoped(view) and (
+            self._get_permission_type(request.method) != "create"
+        )
+
     def _get_object_owner(self, obj):
         """
-        Получает владельца объекта
+        Получает id владельца объекта по owner_field модели
         """
 
-        if hasattr(obj, "user"):
-            return obj.user
-        elif hasattr(obj, "owner"):
-            return obj.owner
-        elif hasattr(obj, "customer"):
-            return obj.customer
-        elif hasattr(obj, "user_id"):
-            return obj.user_id
-        return None
+        return get_owner_id(obj)
 
     def _check_rbac_permission(
-        self, user, element_name, permission_type, request, view, obj_owner=None
+        self,
+        user,
+        element_name,
+        permission_type,
+        request,
+        view,
+        obj_owner=None,
+        object_level=False,
     ):
         """
         Основная логика проверки прав через RBAC
         """
         try:
-            logger.info(
-                f"_check_rbac_permission: user={user.email}, element={element_name}, "
-                f"permission_type={permission_type}, obj_owner={obj_owner}"
-            )
-
-            # Получаем элемент
-            element = BusinessElement.objects.get(name=element_name)
-            logger.debug(f"BusinessElement found: {element.name}")
-
-            # Получаем роли пользователя
-            user_roles = Role.objects.filter(user_roles__user=user).distinct()
-            role_names = [role.name for role in user_roles]
-            logger.debug(f"User roles: {role_names}")
-
-            if not user_roles.exists() and not user.is_staff and not user.is_superuser:
-                try:
-                    guest_role = Role.objects.get(name="guest")
-                    user_roles = [guest_role]
-                    logger.debug("Assigning default guest role to user")
-                except Role.DoesNotExist:
-                    logger.error("Guest role does not exist")
-                    return False
-
-            # Собираем результаты для всех ролей
-            permission_results = []
-
-            # Проверяем права для каждой роли
-            for role in user_roles:
-                try:
-                    access_rule = AccessRule.objects.get(role=role, element=element)
-                    logger.debug(
-                        f"AccessRule found for role {role.name}: "
-                        f"read={access_rule.read_permission}, "
-                        f"create={access_rule.create_permission}, "
-                        f"update={access_rule.update_permission}, "
-                        f"delete={access_rule.delete_permission}"
-                    )
-
-                    if permission_type == "read":
-                        if self.require_all or (
-                            hasattr(view, "action")
-                            and view.action in ["list", "my_cart"]
-                        ):
-                            result = access_rule.read_all_permission
-                            logger.debug(
-                                f"Checking read_all_permission "
-                                f"for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-                        else:
-                            result = access_rule.read_permission
-                            logger.debug(
-                                f"Checking read_permission for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-
-                    elif permission_type == "create":
-                        result = access_rule.create_permission
-                        logger.debug(
-                            f"Checking create_permission for {role.name}: {result}"
-                        )
-                        permission_results.append(result)
-
-                    elif permission_type == "update":
-                        if self.require_all or (obj_owner and obj_owner != user):
-                            result = access_rule.update_all_permission
-                            logger.debug(
-                                f"Checking update_all_permission "
-                                f"for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-                        else:
-                            result = access_rule.update_permission
-                            logger.debug(
-                                f"Checking update_permission "
-                                f"for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-
-                    elif permission_type == "delete":
-                        if self.require_all or (obj_owner and obj_owner != user):
-                            result = access_rule.delete_all_permission
-                            logger.debug(
-                                f"Checking delete_all_permission "
-                                f"for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-                        else:
-                            result = access_rule.delete_permission
-                            logger.debug(
-                                f"Checking delete_permission "
-                                f"for {role.name}: {result}"
-                            )
-                            permission_results.append(result)
-
-                except AccessRule.DoesNotExist:
-                    logger.warning(
-                        f"No AccessRule found for role {role.name} "
-                        f"and element {element.name}"
-                    )
-                    permission_results.append(False)
-                    continue
-
-            if permission_results:
-                final_result = any(permission_results)
-                logger.info(
-                    f"Permission check result for {user.email}: {final_result} "
-                    f"(results from roles: {permission_results})"
+            context = get_authorization_context(request)
+
+            # Без проверки условий дальше политика не дает доступа
+            with_policies = object_level or self._policies_checked_later(request, view)
+
+            if is_rbac_scoped(view) and not self.require_all:
+                # Свои/все объекты ограничивает queryset, достаточно любого права
+                if with_policies:
+                    result = context.has_any_access(element_name, permission_type)
+                else:
+                    result = context.scope(element_name, permission_type) is not None
+                audit_decision(request, element_name, permission_type, result)
+                return result
+
+            if permission_type == "read":
+                all_objects = self.require_all or (
+                    hasattr(view, "action") and view.action in ["list", "my_cart"]
+                )
+            elif permission_type in ("update", "delete"):
+                all_objects = self.require_all or (
+                    obj_owner is not None and obj_owner != user.pk
                 )
-                return final_result
             else:
-                logger.warning("No AccessRules found for any user role")
-                return False
+                all_objects = False
+
+            result = context.check(element_name, permission_type, all_objects)
+            if not result and not object_level and with_policies:
+                # Решение по политикам принимается на уровне объекта
+                result = bool(context.policies(element_name, permission_type))
+
+            audit_decision(
+                request,
+                element_name,
+                permission_type,
+                result,
+                all_objects=all_objects,
+            )
+            return result
 
-        except BusinessElement.DoesNotExist:
-            logger.error(f"BusinessElement '{element_name}' does not exist")
-            return False
         except Exception as e:
-            logger.error(f"Error in _check_rbac_permission: {str(e)}", exc_info=True)
+            logger.error("Error in _check_rbac_permission: %s", e, exc_info=True)
             return False
 
 
@@ -291,11 +258,9 @@ class IsManager(RBACPermission):
         if request.user and (request.user.is_staff or request.user.is_superuser):
             return True
 
-        # Проверка роли manager через UserRole
+        # Проверка роли manager через контекст авторизации
         if request.user and request.user.is_authenticated:
-            return UserRole.objects.filter(
-                user=request.user, role__name="manager"
-            ).exists()
+            return get_authorization_context(request).has_role("manager")
         return False
 
 
@@ -309,9 +274,7 @@ class IsCustomer(RBACPermission):
             return False  # Админы не покупатели
 
         if request.user and request.user.is_authenticated:
-            return UserRole.objects.filter(
-                user=request.user, role__name="customer"
-            ).exists()
+            return get_authorization_context(request).has_role("customer")
         return False
 
 
@@ -332,16 +295,11 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
+        context = get_authorization_context(request)
+
         # Администратор
-        if request.user and (request.user.is_staff or request.user.is_superuser):
+        if context.is_admin:
             return True
 
-        # Владелец
-        if hasattr(obj, "user"):
-            return obj.user == request.user
-        elif hasattr(obj, "owner"):
-            return obj.owner == request.user
-        elif hasattr(obj, "customer"):
-            return obj.customer == request.user
-
-        return False
+        # Владелец - сравнение *_id колонки
+        return is_owner(obj, request.user)
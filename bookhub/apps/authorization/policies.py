@@ -0,0 +1,46 @@
+import uuid
+
+from django.db.models import Q
+
+# Значение условия, которое заменяется на id текущего пользователя
+USER_PLACEHOLDER = "$user"
+
+
+def compile_condition(condition, user_id):
+    """
+    Условие политики {lookup: значение} -> Q (lookup'ы объединяются через AND)
+    """
+
+    return Q(
+        **{
+            lookup: user_id if value == USER_PLACEHOLDER else value
+            for lookup, value in condition.items()
+        }
+    )
+
+
+def compile_policies(conditions, user_id):
+    """
+    Несколько условий -> один Q (через OR); None, если условий нет
+    """
+
+    q = None
+    for condition in conditions:
+        condition_q = compile_condition(condition, user_id)
+        q = condition_q if q is None else q | condition_q
+    return q
+
+
+def validate_condition(model, condition):
+    """
+    Проверяет, что условие строит корректный запрос к модели элемента
+    """
+
+    if not isinstance(condition, dict) or not condition:
+        raise ValueError("Условие должно быть непустым объектом {lookup: значение}")
+    # Запрос только строится (str), но не выполняется
+    str(
+        model._default_manager.filter(
+            compile_condition(condition, uuid.UUID(int=0))
+        ).query
+    )
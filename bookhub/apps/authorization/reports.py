@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+
+from apps.users.models import User
+from django.db.models import Case, Q, Value, When
+
+from .context import PERMISSION_FIELDS
+from .hierarchy import PERMISSION_BITS, get_compiled_permissions
+from .models import UserRole
+
+REPORT_FIELDS = ["user_id", "email", "username", "is_active", "scope"]
+REPORT_CHUNK_SIZE = 5000
+
+
+def granting_roles(element_name, permission_type, all_objects):
+    """
+    Роли, дающие право на элемент (с учетом иерархии ролей)
+    """
+
+    bit = PERMISSION_BITS[PERMISSION_FIELDS[(permission_type, all_objects)]]
+    return {
+        role_name
+        for role_name, masks in get_compiled_permissions()["masks"].items()
+        if masks.get(element_name, 0) & bit
+    }
+
+
+def _roles_condition(role_names):
+    """
+    Q: у пользователя есть одна из ролей; без ролей пользователь - гость
+    """
+
+    if not role_names:
+        return Q(pk__in=[])
+    condition = Q(
+        pk__in=UserRole.objects.filter(role__name__in=role_names).values("user")
+    )
+    if "guest" in role_names:
+        condition |= ~Q(pk__in=UserRole.objects.values("user"))
+    return condition
+
+
+def who_can(element_name, permission_type, all_objects=False, include_inactive=False):
+    """
+    Пользователи, которым разрешено действие над элементом.
+
+    Считается одним запросом: роли с нужным флагом берутся из скомпилированных
+    прав, пользователи - полусоединением с UserRole. all_objects=True оставляет
+    только право на все объекты. Условные политики (ABAC) не учитываются.
+    """
+
+    admin = Q(is_staff=True) | Q(is_superuser=True)
+    all_condition = admin | _roles_condition(
+        granting_roles(element_name, permission_type, True)
+    )
+    condition = all_condition
+    if not all_objects:
+        condition |= _roles_condition(
+            granting_roles(element_name, permission_type, False)
+        )
+
+    queryset = User.objects.filter(condition, deleted_at__isnull=True)
+    if not include_inactive:
+        queryset = queryset.filter(is_active=True)
+    return (
+        queryset.annotate(
+            scope=Case(When(all_condition, then=Value("all")), default=Value("own"))
+        )
+        .order_by("pk")
+        .values_list("pk", "email", "username", "is_active", "scope")
+    )
+
+
+def iter_rows(queryset):
+    """
+    Строки отчета без загрузки всей выборки в память
+    """
+
+    for row in queryset.iterator(chunk_size=REPORT_CHUNK_SIZE):
+        yield dict(zip(REPORT_FIELDS, row))
+
+
+def iter_csv(rows):
+    """
+    CSV по строкам: заголовок и далее по одной строке
+    """
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Пустой отчет - только заголовок
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows):
+    """
+    JSON Lines: один объект на строку
+    """
+
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+REPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "jsonl": (iter_jsonl, "application/x-ndjson"),
+}
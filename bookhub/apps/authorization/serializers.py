@@ -2,6 +2,17 @@ from rest_framework import serializers
 
 from .models import AccessRule, BusinessElement, Role
 
+# Ключ ячейки матрицы прав -> поле AccessRule
+MATRIX_FIELDS = {
+    "read": "read_permission",
+    "create": "create_permission",
+    "update": "update_permission",
+    "delete": "delete_permission",
+    "read_all": "read_all_permission",
+    "update_all": "update_all_permission",
+    "delete_all": "delete_all_permission",
+}
+
 
 class RoleSerializer(serializers.ModelSerializer):
     """
@@ -12,10 +23,23 @@ class RoleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Role
-        fields = ["id", "name", "description", "user_count", "created_at"]
+        fields = ["id", "name", "description", "parent", "user_count", "created_at"]
         read_only_fields = ["id", "created_at"]
 
+    def validate_parent(self, value):
+        ancestor = value
+        while ancestor is not None:
+            if self.instance is not None and ancestor.pk == self.instance.pk:
+                raise serializers.ValidationError(
+                    "Циклическая иерархия ролей недопустима"
+                )
+            ancestor = ancestor.parent
+        return value
+
     def get_user_count(self, obj):
+        # Списки ролей аннотируют user_count, чтобы не считать по запросу на роль
+        if hasattr(obj, "user_count"):
+            return obj.user_count
         return obj.users.count()
 
 
@@ -65,3 +89,64 @@ class AccessRuleDetailSerializer(AccessRuleSerializer):
 
     role = RoleSerializer(read_only=True)
     element = BusinessElementSerializer(read_only=True)
+
+
+class PermissionCheckItemSerializer(serializers.Serializer):
+    """
+    Одна проверка: элемент, действие и (необязательно) объект
+    """
+
+    element = serializers.ChoiceField(choices=BusinessElement.ELEMENT_CHOICES)
+    action = serializers.ChoiceField(choices=["read", "create", "update", "delete"])
+    object_id = serializers.UUIDField(required=False, allow_null=True)
+    all = serializers.BooleanField(required=False, default=False)
+
+
+class PermissionCheckSerializer(serializers.Serializer):
+    """
+    Сериализатор для пакетной проверки прав
+    """
+
+    checks = PermissionCheckItemSerializer(many=True, allow_empty=False)
+
+    def validate_checks(self, value):
+        if len(value) > 100:
+            raise serializers.ValidationError("Не более 100 проверок за запрос")
+        return value
+
+
+class PermissionReportSerializer(serializers.Serializer):
+    """
+    Параметры отчета "кто может выполнить действие"
+    """
+
+    element = serializers.ChoiceField(choices=BusinessElement.ELEMENT_CHOICES)
+    action = serializers.ChoiceField(choices=["read", "create", "update", "delete"])
+    all = serializers.BooleanField(required=False, default=False)
+    include_inactive = serializers.BooleanField(required=False, default=False)
+    output = serializers.ChoiceField(choices=["csv", "jsonl"], default="csv")
+
+
+class AccessMatrixCellSerializer(serializers.Serializer):
+    """
+    Ячейка матрицы прав (роль x элемент)
+    """
+
+    read = serializers.BooleanField(default=False)
+    create = serializers.BooleanField(default=False)
+    update = serializers.BooleanField(default=False)
+    delete = serializers.BooleanField(default=False)
+    read_all = serializers.BooleanField(default=False)
+    update_all = serializers.BooleanField(default=False)
+    delete_all = serializers.BooleanField(default=False)
+
+
+class AccessMatrixSerializer(serializers.Serializer):
+    """
+    Матрица прав в формате summary: {роль: {элемент: ячейка}}
+    """
+
+    matrix = serializers.DictField(
+        child=serializers.DictField(child=AccessMatrixCellSerializer()),
+        allow_empty=False,
+    )
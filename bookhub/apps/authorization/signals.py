@@ -0,0 +1,136 @@
+from apps.core.cache import bump_version_on_commit
+from apps.users.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import materialized
+from .context import RBAC_VERSION, user_rbac_version
+from .models import AccessPolicy, AccessRule, BusinessElement, Role, UserRole
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=BusinessElement)
+@receiver(post_delete, sender=BusinessElement)
+@receiver(post_save, sender=AccessRule)
+@receiver(post_delete, sender=AccessRule)
+@receiver(post_save, sender=AccessPolicy)
+@receiver(post_delete, sender=AccessPolicy)
+def bump_rbac_version(sender, **kwargs):
+    """
+    Изменение ролей или правил доступа делает устаревшими все кеши RBAC.
+    Версия поднимается после COMMIT: иначе параллельный запрос успел бы
+    закешировать старые права под новой версией.
+    """
+
+    bump_version_on_commit(RBAC_VERSION)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def bump_user_rbac_version(sender, instance, **kwargs):
+    """
+    Изменение ролей пользователя затрагивает только его кеши
+    """
+
+    bump_version_on_commit(user_rbac_version(instance.user_id))
+
+
+# Материализованные права пересчитываются после коммита,
+# когда скомпилированные права уже видят изменения
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def refresh_user_permissions(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: materialized.refresh_users([user_id]))
+
+
+# Поля пользователя, от которых зависят материализованные права
+USER_PERMISSION_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+
+@receiver(pre_save, sender=User)
+def track_user_permission_fields(sender, instance, update_fields, **kwargs):
+    """
+    Сохранение без update_fields: меняются ли поля, влияющие на права
+    """
+
+    if instance._state.adding or update_fields is not None:
+        return
+    stored = (
+        User.objects.filter(pk=instance.pk).values_list(*USER_PERMISSION_FIELDS).first()
+    )
+    instance._permission_fields_changed = stored != tuple(
+        getattr(instance, field) for field in USER_PERMISSION_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_admin_permissions(sender, instance, created, update_fields, **kwargs):
+    """
+    Новый пользователь или смена активности и флагов администратора
+    (last_login, пароль и профиль права не меняют)
+    """
+
+    if created:
+        changed = True
+    elif update_fields is None:
+        changed = instance.__dict__.pop("_permission_fields_changed", True)
+    else:
+        changed = bool(set(USER_PERMISSION_FIELDS) & set(update_fields))
+
+    if changed:
+        user_id = instance.pk
+        transaction.on_commit(lambda: materialized.refresh_users([user_id]))
+
+
+@receiver(post_save, sender=AccessRule)
+@receiver(post_delete, sender=AccessRule)
+def refresh_rule_permissions(sender, instance, **kwargs):
+    # При каскадном удалении роли ее строки уже может не быть
+    role_names = list(
+        Role.objects.filter(pk=instance.role_id).values_list("name", flat=True)
+    )
+    transaction.on_commit(lambda: materialized.refresh_roles(role_names))
+
+
+@receiver(post_save, sender=Role)
+def refresh_role_permissions(sender, instance, **kwargs):
+    """
+    Смена родителя меняет права роли и всех ее наследников
+    """
+
+    role_name = instance.name
+    transaction.on_commit(lambda: materialized.refresh_roles([role_name]))
+
+
+@receiver(pre_delete, sender=Role)
+def refresh_deleted_role_permissions(sender, instance, **kwargs):
+    """
+    Наследники удаляемой роли теряют унаследованные права
+    """
+
+    user_ids = materialized.affected_users([instance.name])
+    # pre_delete раньше post_delete: версия должна подняться до пересчета
+    bump_version_on_commit(RBAC_VERSION)
+    transaction.on_commit(lambda: materialized.refresh_users(user_ids))
+
+
+@receiver(post_save, sender=BusinessElement)
+def refresh_element_permissions(sender, instance, created, **kwargs):
+    """
+    Новый элемент: администраторы получают на него все права
+    """
+
+    if created:
+        transaction.on_commit(
+            lambda: materialized.refresh_users(
+                User.objects.filter(
+                    Q(is_staff=True) | Q(is_superuser=True)
+                ).values_list("pk", flat=True)
+            )
+        )
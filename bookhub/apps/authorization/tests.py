@@ -0,0 +1,598 @@
+import argparse
+import atexit
+import logging
+import uuid
+from unittest import mock
+
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Product
+from apps.users.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+
+from . import materialized
+from .audit import AuditQueueHandler
+from .context import get_authorization_context
+from .models import (
+    AccessPolicy,
+    AccessRule,
+    BusinessElement,
+    Role,
+    UserPermission,
+    UserRole,
+)
+from .permissions import IsCustomer, IsManager
+
+# Роли пользователя; скомпилированные права ролей грузятся отдельно и кешируются
+USER_ROLE_TABLE = '"authorization_userrole"'
+
+
+class AuthorizationContextQueryTests(TestCase):
+    """
+    Роли и права загружаются один раз на запрос (AuthorizationContext)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Role.objects.create(name="customer")
+        element = BusinessElement.objects.create(name="order")
+        AccessRule.objects.create(
+            role=customer,
+            element=element,
+            read_permission=True,
+            create_permission=True,
+            update_permission=True,
+        )
+        cls.user = User.objects.create_user(
+            email="customer@test.com", username="customer", password="Test123!"
+        )
+        other = User.objects.create_user(
+            email="other@test.com", username="other", password="Test123!"
+        )
+        UserRole.objects.get_or_create(user=cls.user, role=customer)
+        UserRole.objects.get_or_create(user=other, role=customer)
+        cls.orders = [
+            Order.objects.create(customer=cls.user, shipping_address="Адрес")
+            for _ in range(3)
+        ]
+        Order.objects.create(customer=other, shipping_address="Адрес")
+
+    def setUp(self):
+        # Кеши RBAC не должны переживать тест: нужен холодный запрос
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def capture(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format="json")
+        return response, [query["sql"] for query in queries.captured_queries]
+
+    def assert_roles_loaded_once(self, queries):
+        role_queries = [sql for sql in queries if USER_ROLE_TABLE in sql]
+        self.assertLessEqual(len(role_queries), 1, role_queries)
+        duplicates = {sql for sql in queries if queries.count(sql) > 1}
+        self.assertFalse(duplicates, duplicates)
+
+    def test_list(self):
+        response, queries = self.capture("get", "/api/orders/orders/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assert_roles_loaded_once(queries)
+
+    def test_retrieve(self):
+        order = self.orders[0]
+        response, queries = self.capture("get", f"/api/orders/orders/{order.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assert_roles_loaded_once(queries)
+
+    def test_update(self):
+        order = self.orders[0]
+        response, queries = self.capture(
+            "patch", f"/api/orders/orders/{order.pk}/", {"notes": "Позвонить"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_roles_loaded_once(queries)
+
+    def test_other_customer_order_is_hidden(self):
+        other_order = Order.objects.exclude(customer=self.user).get()
+        response, queries = self.capture("get", f"/api/orders/orders/{other_order.pk}/")
+        self.assertEqual(response.status_code, 404)
+        self.assert_roles_loaded_once(queries)
+
+
+class PolicyOnlyAccessTests(APITestCase):
+    """
+    Политика без флагов правила дает доступ только там, где ее условия
+    проверяются дальше - на объекте или в SQL
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Role.objects.create(name="customer")
+        rule = AccessRule.objects.create(
+            role=customer, element=BusinessElement.objects.create(name="product")
+        )
+        AccessPolicy.objects.create(
+            rule=rule, action="read", condition={"is_available": True}
+        )
+        AccessPolicy.objects.create(
+            rule=rule, action="update", condition={"is_available": True}
+        )
+        cls.user = User.objects.create_user(
+            email="policy@test.com", username="policy", password="Test123!"
+        )
+        UserRole.objects.get_or_create(user=cls.user, role=customer)
+        cls.available = Product.objects.create(
+            title="Есть", author="Автор", price=100, is_available=True
+        )
+        cls.hidden = Product.objects.create(
+            title="Нет", author="Автор", price=100, is_available=False
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_non_scoped_view_is_denied(self):
+        response = self.client.get("/api/products/test-rbac/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_is_denied(self):
+        response = self.client.get("/api/products/export/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_object_matching_policy(self):
+        response = self.client.patch(
+            f"/api/products/{self.available.pk}/", {"stock": 5}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_object_not_matching_policy(self):
+        response = self.client.patch(
+            f"/api/products/{self.hidden.pk}/", {"stock": 5}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class RoleHierarchyTests(APITestCase):
+    """
+    Роль наследует права предков, но не сами роли
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Role.objects.create(name="customer")
+        manager = Role.objects.create(name="manager", parent=customer)
+        AccessRule.objects.create(
+            role=customer,
+            element=BusinessElement.objects.create(name="order"),
+            read_permission=True,
+        )
+        cls.user = User.objects.create_user(
+            email="manager@test.com", username="manager", password="Test123!"
+        )
+        UserRole.objects.filter(user=cls.user).delete()
+        UserRole.objects.create(user=cls.user, role=manager)
+
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_inherits_permissions(self):
+        context = get_authorization_context(self.request)
+        self.assertTrue(context.check("order", "read"))
+
+    def test_role_gate_ignores_hierarchy(self):
+        self.assertTrue(IsManager().has_permission(self.request, None))
+        self.assertFalse(IsCustomer().has_permission(self.request, None))
+
+
+class MaterializedPermissionTests(APITestCase):
+    """
+    Материализованные права пользователей (UserPermission)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Role.objects.create(name="customer")
+        cls.order = BusinessElement.objects.create(name="order")
+        cls.rule = AccessRule.objects.create(
+            role=cls.customer, element=cls.order, read_permission=True
+        )
+        cls.user = User.objects.create_user(
+            email="mat@test.com", username="mat", password="Test123!"
+        )
+        UserRole.objects.get_or_create(user=cls.user, role=cls.customer)
+
+    def setUp(self):
+        cache.clear()
+
+    def stored(self):
+        return dict(
+            UserPermission.objects.filter(user=self.user).values_list(
+                "element__name", "mask"
+            )
+        )
+
+    def test_refresh_is_idempotent(self):
+        materialized.refresh_users([self.user.pk])
+        materialized.refresh_users([self.user.pk])
+        self.assertEqual(self.stored(), {"order": 1})
+
+    def test_revoked_element_is_removed(self):
+        materialized.refresh_users([self.user.pk])
+        self.rule.read_permission = False
+        self.rule.save()
+        cache.clear()
+        materialized.refresh_users([self.user.pk])
+        self.assertEqual(self.stored(), {})
+
+    def test_profile_save_does_not_refresh(self):
+        self.user.first_name = "Имя"
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save()
+            self.user.save(update_fields=["last_login"])
+        self.assertEqual(callbacks, [])
+
+    def test_deactivation_refreshes(self):
+        materialized.refresh_users([self.user.pk])
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.stored(), {})
+
+
+class AuditQueueHandlerTests(SimpleTestCase):
+    """
+    Очередь аудита отбрасывает только разрешения, отказы сохраняются
+    """
+
+    def setUp(self):
+        self.handler = AuditQueueHandler(maxsize=4, reserved=2)
+        # Очередь не разбирается: заполняется как при медленном выводе
+        self.handler.listener.stop()
+        atexit.unregister(self.handler.listener.stop)
+        self.handler.target.handle = mock.Mock()
+
+    def record(self, level):
+        return logging.LogRecord("audit", level, __file__, 0, "rbac", (), None)
+
+    def test_allowed_leave_reserve_for_denials(self):
+        for _ in range(5):
+            self.handler.emit(self.record(logging.INFO))
+        self.assertEqual(self.handler.queue.qsize(), 2)
+        self.assertEqual(self.handler.dropped, 3)
+
+        for _ in range(2):
+            self.handler.emit(self.record(logging.WARNING))
+        self.assertEqual(self.handler.queue.qsize(), 4)
+        self.handler.target.handle.assert_not_called()
+
+    def test_denial_written_when_queue_is_full(self):
+        for _ in range(5):
+            self.handler.emit(self.record(logging.WARNING))
+        self.assertEqual(self.handler.queue.qsize(), 4)
+        self.assertEqual(self.handler.target.handle.call_count, 1)
+        self.assertEqual(self.handler.dropped, 0)
+
+
+class RBACFilterBackendTests(APITestCase):
+    """
+    RBACFilterBackend: свои/все объекты отбираются в SQL
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Role.objects.create(name="customer")
+        manager = Role.objects.create(name="manager")
+        element = BusinessElement.objects.create(name="order")
+        AccessRule.objects.create(
+            role=customer, element=element, read_permission=True, update_permission=True
+        )
+        AccessRule.objects.create(
+            role=manager,
+            element=element,
+            read_permission=True,
+            read_all_permission=True,
+            update_permission=True,
+            update_all_permission=True,
+        )
+        cls.alice, cls.bob, cls.manager = [
+            User.objects.create_user(
+                email=f"{name}@test.com", username=name, password="Test123!"
+            )
+            for name in ("alice", "bob", "manager")
+        ]
+        UserRole.objects.filter(user=cls.manager).delete()
+        UserRole.objects.create(user=cls.manager, role=manager)
+        cls.guest = User.objects.create_user(
+            email="guest@test.com", username="guest", password="Test123!"
+        )
+        UserRole.objects.filter(user=cls.guest).delete()
+
+        for customer_user in (cls.alice, cls.alice, cls.bob):
+            Order.objects.create(customer=customer_user, shipping_address="Адрес")
+        cls.bob_order = Order.objects.get(customer=cls.bob)
+
+    def setUp(self):
+        cache.clear()
+
+    def list_customers(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get("/api/orders/orders/")
+        self.assertEqual(response.status_code, 200)
+        return sorted(order["customer"] for order in response.json()["results"])
+
+    def test_own_objects(self):
+        self.assertEqual(self.list_customers(self.alice), [str(self.alice.pk)] * 2)
+
+    def test_all_objects(self):
+        self.assertEqual(len(self.list_customers(self.manager)), 3)
+
+    def test_no_permission(self):
+        self.client.force_authenticate(self.guest)
+        response = self.client.get("/api/orders/orders/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_update_other_customer_order(self):
+        self.client.force_authenticate(self.alice)
+        response = self.client.patch(
+            f"/api/orders/orders/{self.bob_order.pk}/", {"notes": "x"}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_any_order(self):
+        self.client.force_authenticate(self.manager)
+        response = self.client.patch(
+            f"/api/orders/orders/{self.bob_order.pk}/", {"notes": "x"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class PermissionCheckViewTests(APITestCase):
+    """
+    Пакетная проверка прав: POST /api/permissions/check/
+    """
+
+    url = "/api/permissions/check/"
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Role.objects.create(name="customer")
+        AccessRule.objects.create(
+            role=customer,
+            element=BusinessElement.objects.create(name="order"),
+            read_permission=True,
+            update_permission=True,
+        )
+        cls.user = User.objects.create_user(
+            email="check@test.com", username="check", password="Test123!"
+        )
+        cls.other = User.objects.create_user(
+            email="other@test.com", username="other", password="Test123!"
+        )
+        cls.own = Order.objects.create(customer=cls.user, shipping_address="Адрес")
+        cls.foreign = Order.objects.create(customer=cls.other, shipping_address="Адрес")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def check(self, *checks):
+        response = self.client.post(self.url, {"checks": checks}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_results_in_request_order(self):
+        results = self.check(
+            {"element": "order", "action": "update", "object_id": str(self.own.pk)},
+            {"element": "order", "action": "read"},
+            {"element": "order", "action": "read", "all": True},
+            {"element": "order", "action": "update", "object_id": str(self.foreign.pk)},
+            {"element": "product", "action": "delete"},
+            {"element": "order", "action": "read", "object_id": str(uuid.uuid4())},
+        )
+        self.assertEqual(
+            [result["allowed"] for result in results],
+            [True, True, False, False, False, False],
+        )
+        self.assertEqual(results[0]["object_id"], str(self.own.pk))
+        self.assertIs(results[5]["found"], False)
+
+    def test_object_checks_are_not_cached(self):
+        item = {"element": "order", "action": "update", "object_id": str(self.own.pk)}
+        self.assertTrue(self.check(item)[0]["allowed"])
+        Order.objects.filter(pk=self.own.pk).update(customer=self.other)
+        self.assertFalse(self.check(item)[0]["allowed"])
+
+    def test_batch_limit(self):
+        checks = [{"element": "order", "action": "read"}] * 101
+        response = self.client.post(self.url, {"checks": checks}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class AccessMatrixTests(APITestCase):
+    """
+    Матрица прав: сводка одним запросом и массовый upsert
+    """
+
+    url = "/api/admin/permissions/permissions/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Role.objects.create(name="customer")
+        Role.objects.create(name="guest")
+        cls.order = BusinessElement.objects.create(name="order")
+        BusinessElement.objects.create(name="product")
+        AccessRule.objects.create(
+            role=cls.customer,
+            element=cls.order,
+            read_permission=True,
+            update_permission=True,
+        )
+        cls.admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="Test123!"
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Подъемы версии из setUpTestData ждут COMMIT, которого в тесте нет,
+        # и подъем после изменения матрицы считался бы уже запланированным
+        connection.run_on_commit.clear()
+        self.client.force_authenticate(self.admin)
+
+    def put_matrix(self, matrix):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.put(
+                f"{self.url}matrix/", {"matrix": matrix}, format="json"
+            )
+
+    def test_summary(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"{self.url}summary/")
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual(summary["guest"], {"order": None, "product": None})
+        self.assertTrue(summary["customer"]["order"]["update"])
+        self.assertEqual(len(queries), 2)
+
+        response = self.client.get(
+            f"{self.url}summary/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_upsert(self):
+        etag = self.client.get(f"{self.url}summary/")["ETag"]
+        response = self.put_matrix(
+            {
+                "customer": {"order": {"read": True}},
+                "guest": {"product": {"read": True, "read_all": True}},
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 2)
+
+        rule = AccessRule.objects.get(role=self.customer, element=self.order)
+        self.assertTrue(rule.read_permission)
+        self.assertFalse(rule.update_permission)
+        self.assertTrue(
+            AccessRule.objects.filter(
+                role__name="guest", element__name="product", read_all_permission=True
+            ).exists()
+        )
+        # Версия RBAC поднята: сводка строится заново
+        response = self.client.get(f"{self.url}summary/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["customer"]["order"]["update"])
+
+    def test_unknown_names(self):
+        response = self.put_matrix({"nobody": {"order": {"read": True}}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["missing"], {"roles": ["nobody"]})
+        self.assertEqual(AccessRule.objects.count(), 1)
+
+    def test_admin_only(self):
+        user = User.objects.create_user(
+            email="user@test.com", username="user", password="Test123!"
+        )
+        self.client.force_authenticate(user)
+        response = self.put_matrix({"customer": {"order": {"read": True}}})
+        self.assertEqual(response.status_code, 403)
+
+
+class PolicyScopingTests(APITestCase):
+    """
+    Политики (ABAC) переводятся в условие queryset через RBACFilterBackend
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        support = Role.objects.create(name="support")
+        supplier = Role.objects.create(name="supplier")
+        element = BusinessElement.objects.create(name="order")
+        AccessPolicy.objects.create(
+            rule=AccessRule.objects.create(role=support, element=element),
+            action="read",
+            condition={"status": "pending"},
+        )
+        AccessPolicy.objects.create(
+            rule=AccessRule.objects.create(role=supplier, element=element),
+            action="read",
+            condition={"items__product__owner": "$user"},
+        )
+        cls.support, cls.supplier, customer = [
+            User.objects.create_user(
+                email=f"{name}@test.com", username=name, password="Test123!"
+            )
+            for name in ("support", "supplier", "customer")
+        ]
+        UserRole.objects.create(user=cls.support, role=support)
+        UserRole.objects.create(user=cls.supplier, role=supplier)
+
+        product = Product.objects.create(
+            title="Книга", author="Автор", price=100, owner=cls.supplier
+        )
+        cls.pending = Order.objects.create(customer=customer, shipping_address="А")
+        cls.shipped = Order.objects.create(
+            customer=customer, shipping_address="А", status="shipped"
+        )
+        # Две позиции одного товара: заказ не должен задваиваться
+        for _ in range(2):
+            OrderItem.objects.create(
+                order=cls.shipped, product=product, quantity=1, price=100
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        return self.client.get(url)
+
+    def test_condition_on_field(self):
+        response = self.get(self.support, "/api/orders/orders/")
+        self.assertEqual(response.status_code, 200)
+        ids = [order["id"] for order in response.json()["results"]]
+        self.assertEqual(ids, [str(self.pending.pk)])
+
+        response = self.get(self.support, f"/api/orders/orders/{self.shipped.pk}/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_condition_on_current_user(self):
+        response = self.get(self.supplier, "/api/orders/orders/")
+        ids = [order["id"] for order in response.json()["results"]]
+        self.assertEqual(ids, [str(self.shipped.pk)])
+
+
+class RBACBenchmarkTests(TestCase):
+    """
+    Бенчмарк RBAC (scripts/benchmark_rbac.py) на малом объеме данных
+    """
+
+    def test_queries_do_not_grow_with_roles(self):
+        from scripts import benchmark_rbac
+
+        audit = logging.getLogger("apps.authorization.audit")
+        self.addCleanup(setattr, audit, "disabled", audit.disabled)
+        args = argparse.Namespace(
+            roles=30, elements=20, density=0.3, user_roles=25, iterations=3, seed=1
+        )
+
+        report = benchmark_rbac.run(args)
+        self.assertEqual(
+            set(report["results"]),
+            {
+                f"{name}.{check}"
+                for name in benchmark_rbac.PERMISSION_CLASSES
+                for check in ("has_permission", "has_object_permission")
+            },
+        )
+        self.assertEqual(report["flagged"], [])
+        # Данные бенчмарка откатываются
+        self.assertFalse(Role.objects.filter(name__startswith="bench_").exists())
@@ -1,17 +1,36 @@
-from rest_framework import viewsets
+import hashlib
+import json
+
+from apps.core.cache import bump_version_on_commit, get_version, get_versions
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from . import materialized
+from .context import RBAC_VERSION, get_authorization_context, user_rbac_version
 from .models import AccessRule, BusinessElement, Role
 from .permissions import IsAdmin
+from .reports import REPORT_FORMATS, iter_rows, who_can
 from .serializers import (
+    MATRIX_FIELDS,
+    AccessMatrixSerializer,
     AccessRuleDetailSerializer,
     AccessRuleSerializer,
     BusinessElementSerializer,
+    PermissionCheckSerializer,
+    PermissionReportSerializer,
     RoleSerializer,
 )
 
+PERMISSION_CHECK_CACHE_TIMEOUT = 300
+SUMMARY_CACHE_TIMEOUT = 60 * 60
+
 
 class AdminRoleViewSet(viewsets.ModelViewSet):
     """
@@ -23,7 +42,7 @@ class AdminRoleViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get_queryset(self):
-        return Role.objects.all().order_by("name")
+        return Role.objects.annotate(user_count=Count("user_roles")).order_by("name")
 
 
 class AdminBusinessElementViewSet(viewsets.ModelViewSet):
@@ -60,29 +79,175 @@ class AdminAccessRuleViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def summary(self, request):
         """
-        Получить сводку по правам
+        Получить сводку по правам (кешируется по версии RBAC, с ETag)
+        """
+
+        version = get_version(RBAC_VERSION)
+        etag = f'"rbac-summary-{version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        cache_key = f"rbac:summary:{version}"
+        summary_data = cache.get(cache_key)
+        if summary_data is None:
+            summary_data = self._build_summary()
+            cache.set(cache_key, summary_data, SUMMARY_CACHE_TIMEOUT)
+
+        return Response(summary_data, headers={"ETag": etag})
+
+    def _build_summary(self):
+        """
+        Матрица роль x элемент: роли с правилами одним LEFT JOIN запросом
         """
 
+        element_names = list(
+            BusinessElement.objects.order_by("name").values_list("name", flat=True)
+        )
+        rows = Role.objects.order_by("name").values(
+            "name",
+            "access_rules__element__name",
+            *(f"access_rules__{field}" for field in MATRIX_FIELDS.values()),
+        )
+
         summary_data = {}
+        for row in rows:
+            role_data = summary_data.setdefault(
+                row["name"], dict.fromkeys(element_names)
+            )
+            element_name = row["access_rules__element__name"]
+            if element_name is not None:
+                role_data[element_name] = {
+                    key: row[f"access_rules__{field}"]
+                    for key, field in MATRIX_FIELDS.items()
+                }
+        return summary_data
+
+    @action(detail=False, methods=["get"], url_path="who-can")
+    def who_can(self, request):
+        """
+        Кто может выполнить действие над элементом (CSV/JSONL потоком)
+        """
+
+        serializer = PermissionReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        render, content_type = REPORT_FORMATS[params["output"]]
+        queryset = who_can(
+            params["element"],
+            params["action"],
+            all_objects=params["all"],
+            include_inactive=params["include_inactive"],
+        )
+        response = StreamingHttpResponse(
+            render(iter_rows(queryset)), content_type=content_type
+        )
+        filename = f"who-can-{params['action']}-{params['element']}.{params['output']}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=["put"])
+    def matrix(self, request):
+        """
+        Массово задать матрицу прав роль x элемент одной транзакцией
+        """
+
+        serializer = AccessMatrixSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        matrix = serializer.validated_data["matrix"]
+
+        element_names = {name for cells in matrix.values() for name in cells}
+        roles = {role.name: role for role in Role.objects.filter(name__in=list(matrix))}
+        elements = {
+            element.name: element
+            for element in BusinessElement.objects.filter(name__in=element_names)
+        }
+
+        errors = {}
+        missing_roles = set(matrix) - set(roles)
+        if missing_roles:
+            errors["roles"] = sorted(missing_roles)
+        missing_elements = element_names - set(elements)
+        if missing_elements:
+            errors["elements"] = sorted(missing_elements)
+        if errors:
+            return Response(
+                {"error": "Неизвестные роли или элементы", "missing": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rules = [
+            AccessRule(
+                role=roles[role_name],
+                element=elements[element_name],
+                **{field: cell[key] for key, field in MATRIX_FIELDS.items()},
+            )
+            for role_name, cells in matrix.items()
+            for element_name, cell in cells.items()
+        ]
+
+        with transaction.atomic():
+            # bulk_create не отправляет сигналы - версию поднимаем один раз
+            AccessRule.objects.bulk_create(
+                rules,
+                update_conflicts=True,
+                unique_fields=["role", "element"],
+                update_fields=[*MATRIX_FIELDS.values(), "updated_at"],
+            )
+            bump_version_on_commit(RBAC_VERSION)
+            transaction.on_commit(lambda: materialized.refresh_roles(list(roles)))
+
+        return Response({"status": "Матрица прав обновлена", "updated": len(rules)})
+
+
+class PermissionCheckView(APIView):
+    """
+    Пакетная проверка прав текущего пользователя для UI.
 
-        roles = Role.objects.all()
-        elements = BusinessElement.objects.all()
-
-        for role in roles:
-            summary_data[role.name] = {}
-            for element in elements:
-                try:
-                    rule = AccessRule.objects.get(role=role, element=element)
-                    summary_data[role.name][element.name] = {
-                        "read": rule.read_permission,
-                        "create": rule.create_permission,
-                        "update": rule.update_permission,
-                        "delete": rule.delete_permission,
-                        "read_all": rule.read_all_permission,
-                        "update_all": rule.update_all_permission,
-                        "delete_all": rule.delete_all_permission,
-                    }
-                except AccessRule.DoesNotExist:
-                    summary_data[role.name][element.name] = None
-
-        return Response(summary_data)
+    Принимает список (element, action, object_id) и проверяет все за один
+    проход. Проверки без объекта кешируются по пользователю и версии RBAC;
+    проверки объектов зависят от владельца и состояния объекта (политики),
+    поэтому выполняются заново.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = PermissionCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        checks = serializer.validated_data["checks"]
+        element_checks = [item for item in checks if not item.get("object_id")]
+        object_checks = [item for item in checks if item.get("object_id")]
+
+        context = get_authorization_context(request)
+        rbac_version, user_version = get_versions(
+            RBAC_VERSION, user_rbac_version(request.user.pk)
+        )
+
+        element_results = []
+        if element_checks:
+            digest = hashlib.sha1(
+                json.dumps(element_checks, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            cache_key = (
+                f"rbac:check:{request.user.pk}:{int(context.is_admin)}:"
+                f"{rbac_version}:{user_version}:{digest}"
+            )
+            element_results = cache.get(cache_key)
+            if element_results is None:
+                element_results = context.evaluate(element_checks)
+                cache.set(cache_key, element_results, PERMISSION_CHECK_CACHE_TIMEOUT)
+        object_results = context.evaluate(object_checks) if object_checks else []
+
+        # Ответ в порядке запроса
+        element_results, object_results = iter(element_results), iter(object_results)
+        results = [
+            next(object_results if item.get("object_id") else element_results)
+            for item in checks
+        ]
+
+        response = Response(
+            {"version": f"{rbac_version}.{user_version}", "results": results}
+        )
+        response["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,222 @@
+import math
+import random
+import time
+import uuid
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "version:{}"
+STATS_KEY = "cache:stats:{}:{}"
+STATS_FIELDS = ("hits", "misses", "refreshes", "early_refreshes", "stale", "stampedes")
+
+# Раннее обновление (XFetch): чем дольше пересчет, тем раньше до истечения
+EARLY_EXPIRATION_BETA = 1.0
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 5
+WAIT_INTERVAL = 0.05
+
+_bump_callbacks = {}
+
+
+def initial_version():
+    """
+    Начальная версия для отсутствующего ключа.
+
+    Ключ версии может пропасть (вытеснение, очистка кеша); начать снова с 1
+    нельзя - воркеры и записи кеша прежнего поколения с той же версией
+    снова стали бы актуальными. Время в наносекундах не повторяется и
+    всегда больше ранее выданных версий.
+    """
+
+    return time.time_ns()
+
+
+def get_version(namespace):
+    """
+    Текущая версия (поколение) данных пространства имен
+    """
+
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        seed = initial_version()
+        cache.add(key, seed, timeout=None)
+        version = cache.get(key, seed)
+    return version
+
+
+def get_versions(*namespaces):
+    """
+    Версии нескольких пространств имен одним обращением к кешу
+    """
+
+    keys = {VERSION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    return tuple(
+        found[key] if key in found else get_version(namespace)
+        for key, namespace in keys.items()
+    )
+
+
+def bump_version(namespace):
+    """
+    Увеличивает версию - все ключи, построенные на старой, устаревают
+    """
+
+    key = VERSION_KEY.format(namespace)
+    cache.add(key, initial_version(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ успел истечь между add и incr
+        version = initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def bump_version_on_commit(namespace, using=None):
+    """
+    Поднимает версию после фиксации транзакции - один раз на транзакцию.
+
+    Сохранение сотни строк (list_editable в админке) дает одно увеличение,
+    и новые ключи не успевают заполниться данными до COMMIT.
+    """
+
+    connection = transaction.get_connection(using)
+    callback = _bump_callbacks.setdefault(namespace, partial(bump_version, namespace))
+    # Отмененные откатом callbacks Django сам убирает из run_on_commit
+    if connection.in_atomic_block and any(
+        entry[1] is callback for entry in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(callback, using=using)
+
+
+def incr_counter(key, delta=1):
+    """
+    Бессрочный счетчик в кеше (метрики попаданий, объема и т.п.)
+    """
+
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def count(name, field, delta=1):
+    """
+    Счетчик статистики кеша name (см. cache_stats)
+    """
+
+    if name:
+        incr_counter(STATS_KEY.format(name, field), delta)
+
+
+def cache_stats(name, fields=STATS_FIELDS):
+    """
+    Счетчики кеша name и доля запросов, обслуженных без пересчета
+    """
+
+    keys = {STATS_KEY.format(name, field): field for field in fields}
+    found = cache.get_many(keys)
+    stats = {field: found.get(key, 0) for key, field in keys.items()}
+    served = sum(stats.get(field, 0) for field in ("hits", "stale", "stampedes"))
+    computed = ("misses", "refreshes", "early_refreshes")
+    total = served + sum(stats.get(field, 0) for field in computed)
+    stats["hit_ratio"] = round(served / total, 4) if total else None
+    return stats
+
+
+def _acquire_lock(lock_key, timeout):
+    # В django-redis add - это SET NX с TTL: блокировка одна на все воркеры
+    token = uuid.uuid4().hex
+    return token if cache.add(lock_key, token, timeout) else None
+
+
+def _release_lock(lock_key, token):
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout, version):
+    start = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - start
+    cache.set(
+        key, (value, version, time.time() + timeout, delta), timeout + stale_timeout
+    )
+    return value
+
+
+def get_or_compute(
+    key,
+    compute,
+    timeout,
+    *,
+    version=None,
+    name=None,
+    stale_timeout=None,
+    beta=EARLY_EXPIRATION_BETA,
+    lock_timeout=LOCK_TIMEOUT,
+):
+    """
+    Значение из кеша с защитой от лавины пересчетов (cache stampede).
+
+    Пересчитывает compute() только один воркер (блокировка в кеше), пока
+    остальные отдают устаревшее значение (stale-while-revalidate) еще
+    stale_timeout секунд после истечения (по умолчанию - timeout). Запись с
+    другой version считается устаревшей, а не отсутствующей: после смены
+    версии каталога старый ответ отдается, пока новый считается. Незадолго
+    до истечения пересчет запускается с вероятностью, растущей по мере
+    приближения к сроку (XFetch), так что горячий ключ обновляется раньше,
+    чем истечет у всех сразу. Если значения нет совсем, остальные воркеры
+    ждут результат до WAIT_TIMEOUT секунд. name - имя для cache_stats.
+    """
+
+    if stale_timeout is None:
+        stale_timeout = timeout
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, entry_version, expires_at, delta = entry
+        now = time.time()
+        # -log(u) > 0: сдвиг "текущего времени" вперед пропорционально delta
+        early = now - delta * beta * math.log(1.0 - random.random())
+        if entry_version == version and early < expires_at:
+            count(name, "hits")
+            return value
+
+        token = _acquire_lock(lock_key, lock_timeout)
+        if token is None:
+            # Пересчет уже идет в другом воркере
+            count(name, "stale")
+            return value
+        try:
+            expired = entry_version != version or now >= expires_at
+            count(name, "refreshes" if expired else "early_refreshes")
+            return _compute_and_store(key, compute, timeout, stale_timeout, version)
+        finally:
+            _release_lock(lock_key, token)
+
+    token = _acquire_lock(lock_key, lock_timeout)
+    if token is None:
+        # Одновременный промах: ждем результат пересчитывающего воркера
+        count(name, "stampedes")
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None and entry[1] == version:
+                return entry[0]
+        # Не дождались - считаем сами, не занимая блокировку
+        return _compute_and_store(key, compute, timeout, stale_timeout, version)
+    count(name, "misses")
+    try:
+        return _compute_and_store(key, compute, timeout, stale_timeout, version)
+    finally:
+        _release_lock(lock_key, token)
@@ -0,0 +1,78 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalRetrieveMixin:
+    """
+    Условный GET для retrieve: ETag и Last-Modified по updated_at.
+
+    Валидаторы берутся одним агрегатным запросом по колонкам
+    conditional_timestamps (свой updated_at и updated_at связанных объектов,
+    попадающих в ответ) и числу связанных объектов - удаление дочернего
+    объекта не меняет максимум updated_at, но меняет ETag; при совпадении
+    If-None-Match / If-Modified-Since ответ 304 отдается без загрузки
+    объекта и сериализации.
+    """
+
+    conditional_timestamps = ("updated_at",)
+    conditional_cache_control = "no-cache"
+
+    def get_validators(self):
+        """
+        (etag, last_modified) объекта или (None, None), если он недоступен
+        """
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # Те же фильтры, что и в get_object: чужой объект не получит 304
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        relations = sorted(
+            {
+                field.rsplit("__", 1)[0]
+                for field in self.conditional_timestamps
+                if "__" in field
+            }
+        )
+        row = queryset.aggregate(
+            **{
+                f"t{index}": Max(field)
+                for index, field in enumerate(self.conditional_timestamps)
+            },
+            **{
+                f"c{index}": Count(relation, distinct=True)
+                for index, relation in enumerate(relations)
+            },
+        )
+        timestamps = [
+            value
+            for key, value in row.items()
+            if key.startswith("t") and value is not None
+        ]
+        if not timestamps:
+            return None, None
+
+        raw = f"{self.kwargs[lookup_url_kwarg]}:" + ":".join(
+            value.isoformat() if hasattr(value, "isoformat") else str(value or "")
+            for value in row.values()
+        )
+        etag = f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+        return etag, int(max(timestamps).timestamp())
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = self.conditional_cache_control
+        return response
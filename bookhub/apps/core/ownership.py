@@ -0,0 +1,86 @@
+from django.contrib import admin
+from django.db.models import Q
+
+# Колонки владельца для моделей без owner_field
+FALLBACK_OWNER_ATTNAMES = ("user_id", "owner_id", "customer_id")
+
+
+def get_owner_field(model):
+    """
+    Поле владельца модели - атрибут owner_field ("customer", "cart__user", "pk")
+    """
+
+    return getattr(model, "owner_field", None)
+
+
+def get_owner_id(obj):
+    """
+    id владельца объекта без загрузки связанного пользователя.
+
+    Сравнивается колонка *_id; для пути через связь ("cart__user")
+    загружаются только промежуточные объекты.
+    """
+
+    owner_field = get_owner_field(type(obj))
+    if owner_field is None:
+        for attname in FALLBACK_OWNER_ATTNAMES:
+            if hasattr(obj, attname):
+                return getattr(obj, attname)
+        return None
+    if owner_field == "pk":
+        return obj.pk
+
+    *path, name = owner_field.split("__")
+    for step in path:
+        obj = getattr(obj, step)
+        if obj is None:
+            return None
+    return getattr(obj, obj._meta.get_field(name).attname)
+
+
+def is_owner(obj, user):
+    """
+    Принадлежит ли объект пользователю
+    """
+
+    owner_id = get_owner_id(obj)
+    return owner_id is not None and owner_id == user.pk
+
+
+def owned_by(model, user_id):
+    """
+    Условие для queryset: объекты пользователя (None - у модели нет владельца)
+    """
+
+    owner_field = get_owner_field(model)
+    if owner_field is None:
+        return None
+    return Q(**{owner_field: user_id})
+
+
+class OwnerListFilter(admin.SimpleListFilter):
+    """
+    Фильтр админки "мои / чужие / без владельца" по owner_field модели
+    """
+
+    title = "Владелец"
+    parameter_name = "owned"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("me", "Мои"),
+            ("others", "Чужие"),
+            ("none", "Без владельца"),
+        )
+
+    def queryset(self, request, queryset):
+        owner_field = get_owner_field(queryset.model)
+        if owner_field is None or self.value() is None:
+            return queryset
+        if self.value() == "me":
+            return queryset.filter(**{owner_field: request.user.pk})
+        if self.value() == "others":
+            return queryset.exclude(**{owner_field: request.user.pk}).exclude(
+                **{f"{owner_field}__isnull": True}
+            )
+        return queryset.filter(**{f"{owner_field}__isnull": True})
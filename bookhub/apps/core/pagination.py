@@ -0,0 +1,204 @@
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_CACHE_TIMEOUT = 60
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def keyset_condition(ordering, values):
+    """
+    Условие "после строки с values" для сортировки ordering.
+
+    (a DESC, id DESC) после (x, y): a < x OR (a = x AND id < y).
+    """
+
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def estimate_count(queryset):
+    """
+    Оценка числа строк по плану PostgreSQL (без COUNT по всей выборке)
+    """
+
+    # psycopg декодирует json сам, и explain() возвращает сериализованный
+    # словарь плана; без декодирования - список из одного плана
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+def cached_count(queryset):
+    """
+    Точный COUNT, кешируемый по SQL запроса на короткое время
+    """
+
+    digest = hashlib.sha1(str(queryset.query).encode()).hexdigest()
+    cache_key = f"pagination:count:{queryset.model._meta.label_lower}:{digest}"
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничный вывод по курсору (keyset) с откатом на номера страниц.
+
+    С параметром ?cursor= (пустой - первая страница) выборка идет по
+    (поле сортировки, id) без OFFSET и без COUNT; без него - обычный
+    PageNumberPagination. ?ordering= выбирает одну из view.keyset_orderings,
+    ?count=exact|estimate добавляет кешированный или оценочный count.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    count_query_param = "count"
+    default_orderings = ("-created_at",)
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.ordering_name, ordering = self.get_ordering(request, view)
+        values, previous = self.decode_cursor(request)
+        if values is not None:
+            values = self.parse_values(queryset.model, ordering, values)
+
+        order = [_invert(field) for field in ordering] if previous else ordering
+        queryset = queryset.order_by(*order)
+        self.count = self.get_count(request, queryset)
+        if values is not None:
+            queryset = queryset.filter(keyset_condition(order, values))
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if previous:
+            rows.reverse()
+
+        has_next = has_more if not previous else values is not None
+        has_previous = has_more if previous else values is not None
+        self.next_values = (
+            self.row_values(rows[-1], ordering) if rows and has_next else None
+        )
+        self.previous_values = (
+            self.row_values(rows[0], ordering) if rows and has_previous else None
+        )
+        return rows
+
+    def get_ordering(self, request, view):
+        """
+        Поля сортировки с id для однозначности: ("-created_at", "-id")
+        """
+
+        allowed = getattr(view, "keyset_orderings", self.default_orderings)
+        name = request.query_params.get(self.ordering_query_param) or allowed[0]
+        if name not in allowed:
+            raise NotFound(f"Недопустимая сортировка: {name}")
+        return name, [name, "-id" if name.startswith("-") else "id"]
+
+    def get_count(self, request, queryset):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "estimate" and connections[queryset.db].vendor == "postgresql":
+            return estimate_count(queryset)
+        if mode in ("exact", "estimate"):
+            # Без PostgreSQL оценки нет - точный, но кешированный COUNT
+            return cached_count(queryset)
+        return None
+
+    def parse_values(self, model, ordering, values):
+        """
+        Значения из курсора в типы полей модели
+        """
+
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound("Некорректный курсор")
+        try:
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except ValidationError:
+            raise NotFound("Некорректный курсор")
+
+    def row_values(self, row, ordering):
+        # Строка - экземпляр модели или словарь из .values()
+        if isinstance(row, dict):
+            return [row[field.lstrip("-")] for field in ordering]
+        return [getattr(row, field.lstrip("-")) for field in ordering]
+
+    def encode_cursor(self, values, previous):
+        payload = json.dumps(
+            {"v": values, "p": previous, "o": self.ordering_name}, default=str
+        )
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """
+        (значения ключа, назад ли) из курсора; пустой курсор - первая страница
+        """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if payload["o"] != self.ordering_name:
+                raise ValueError
+            return payload["v"], bool(payload["p"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Некорректный курсор")
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values, previous=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if self.previous_values is None:
+            return None
+        return self.encode_cursor(self.previous_values, previous=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
@@ -0,0 +1,132 @@
+import hashlib
+
+from django.http import HttpResponse
+
+from .cache import (
+    STATS_FIELDS,
+    cache_stats,
+    count,
+    get_or_compute,
+    get_version,
+    get_versions,
+)
+
+RESPONSE_CACHE_TIMEOUT = 300
+# Ответы больше этого размера не кешируются (выгрузки на тысячи строк)
+RESPONSE_CACHE_MAX_BYTES = 512 * 1024
+
+RESPONSE_STATS_FIELDS = (*STATS_FIELDS, "stored", "stored_bytes")
+
+
+class UncacheableResponse(Exception):
+    """
+    Ответ, который нельзя класть в кеш (ошибка, слишком большой)
+    """
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def normalize_params(query_params):
+    """
+    Параметры запроса в каноническом виде: порядок ключей и значений
+    и пустые параметры не влияют на ключ
+    """
+
+    items = []
+    for key in sorted(query_params):
+        values = sorted(value.strip() for value in query_params.getlist(key))
+        values = [value for value in values if value]
+        if values:
+            items.append(f"{key}={','.join(values)}")
+    return "&".join(items)
+
+
+def response_cache_stats(name):
+    """
+    Попадания, промахи, доля попаданий и объем записанных ответов
+    """
+
+    return cache_stats(f"response:{name}", RESPONSE_STATS_FIELDS)
+
+
+class VersionedResponseCacheMixin:
+    """
+    Кеш готовых JSON ответов GET для публичных view.
+
+    Ключ - версия пространства имен (response_cache_namespace, для ответа
+    из нескольких источников - кортеж) и нормализованные параметры
+    запроса: изменение данных поднимает версию, и сразу после него ответы
+    строятся заново, устаревший ответ не отдается. Одновременные промахи
+    ждут ответ одного воркера (см. get_or_compute). Заголовки ответа
+    (Vary, Allow) хранятся вместе с телом.
+    """
+
+    response_cache_namespace = None
+    response_cache_name = None
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def get_response_cache_key(self, request, version):
+        # Хост входит в ключ: ссылки пагинации в ответе абсолютные
+        raw = f"{request.get_host()}|{request.path}|{normalize_params(request.GET)}"
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        if isinstance(version, tuple):
+            version = "-".join(map(str, version))
+        return f"response:{self.response_cache_name}:{version}:{digest}"
+
+    def get_response_cache_version(self):
+        namespace = self.response_cache_namespace
+        if isinstance(namespace, tuple):
+            return get_versions(*namespace)
+        return get_version(namespace)
+
+    def response_cache_enabled(self, request):
+        # Браузерный API и другие форматы не кешируются
+        renderer = getattr(request, "accepted_renderer", None)
+        return renderer is not None and renderer.format == "json"
+
+    def render_cacheable(self, request, *args, **kwargs):
+        """
+        (тело, заголовки) готового ответа для кеша
+        """
+
+        response = super().get(request, *args, **kwargs)
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code != 200:
+            raise UncacheableResponse(response)
+        response.render()
+        if len(response.content) > RESPONSE_CACHE_MAX_BYTES:
+            raise UncacheableResponse(response)
+
+        stats_name = f"response:{self.response_cache_name}"
+        count(stats_name, "stored")
+        count(stats_name, "stored_bytes", len(response.content))
+        return response.content, dict(response.items())
+
+    def get(self, request, *args, **kwargs):
+        if not self.response_cache_enabled(request):
+            return super().get(request, *args, **kwargs)
+
+        computed = False
+
+        def compute():
+            nonlocal computed
+            computed = True
+            return self.render_cacheable(request, *args, **kwargs)
+
+        version = self.get_response_cache_version()
+        try:
+            content, headers = get_or_compute(
+                self.get_response_cache_key(request, version),
+                compute,
+                self.response_cache_timeout,
+                version=version,
+                name=f"response:{self.response_cache_name}",
+            )
+        except UncacheableResponse as exc:
+            return exc.response
+
+        response = HttpResponse(content, headers=headers)
+        response["X-Cache"] = "MISS" if computed else "HIT"
+        return response
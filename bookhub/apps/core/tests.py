@@ -0,0 +1,134 @@
+import json
+from unittest import mock, skipUnless
+
+from apps.products.models import Product
+from apps.products.views import ProductListView
+from apps.users.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework.test import APIClient, APITestCase
+
+from .cache import bump_version, get_version
+from .pagination import estimate_count
+
+
+class VersionTests(SimpleTestCase):
+    """
+    Версии пространств имен кеша
+    """
+
+    def test_lost_version_is_not_reused(self):
+        cache.delete("version:test")
+        first = get_version("test")
+        bumped = bump_version("test")
+        self.assertEqual(bumped, first + 1)
+
+        # Ключ вытеснен: новая версия не совпадает ни с одной из прежних
+        cache.delete("version:test")
+        self.assertGreater(get_version("test"), bumped)
+
+
+class EstimateCountTests(SimpleTestCase):
+    """
+    Разбор плана EXPLAIN (FORMAT JSON) в оценку числа строк
+    """
+
+    def queryset(self, explain):
+        queryset = mock.Mock()
+        queryset.order_by.return_value.explain.return_value = explain
+        return queryset
+
+    def test_decoded_plan(self):
+        # Так explain() отдает план через psycopg: json уже декодирован
+        explain = json.dumps({"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}})
+        self.assertEqual(estimate_count(self.queryset(explain)), 42)
+
+    def test_plan_list(self):
+        explain = json.dumps([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 7}}])
+        self.assertEqual(estimate_count(self.queryset(explain)), 7)
+
+
+class KeysetCountTests(TestCase):
+    """
+    ?count= у постраничного вывода по курсору
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create(
+            Product(title=f"Книга {i}", author="Автор", price=100) for i in range(3)
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "оценка по плану PostgreSQL")
+    def test_estimate_count_postgresql(self):
+        self.assertIsInstance(estimate_count(Product.objects.all()), int)
+
+    def test_cursor_estimate_count(self):
+        response = APIClient().get("/api/products/?cursor=&count=estimate")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("count", response.json())
+
+    def test_cursor_exact_count(self):
+        response = APIClient().get("/api/products/?cursor=&count=exact")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 3)
+
+
+class ResponseCacheTests(APITestCase):
+    """
+    Кеш ответов списка товаров под версией каталога
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="Test123!"
+        )
+        # bulk_create без сигналов: в setUpTestData (транзакция без COMMIT)
+        # подъем версии занял бы место подъема после создания в тесте
+        Product.objects.bulk_create(
+            [Product(title="Первая", author="Автор", price=100)]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_list(self):
+        self.client.force_authenticate(None)
+        return self.client.get("/api/products/", HTTP_ACCEPT="application/json")
+
+    def test_hit_keeps_headers(self):
+        miss, hit = self.get_list(), self.get_list()
+        self.assertEqual((miss["X-Cache"], hit["X-Cache"]), ("MISS", "HIT"))
+        for response in (miss, hit):
+            self.assertIn("Accept", response["Vary"])
+            self.assertIn("GET", response["Allow"])
+        self.assertEqual(miss.content, hit.content)
+
+    def test_create_invalidates_immediately(self):
+        self.get_list()
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/products/",
+                {
+                    "title": "Вторая",
+                    "author": "Автор",
+                    "description": "Текст",
+                    "price": 1,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+        # Ответ под новой версией уже пересчитывает другой воркер
+        view = ProductListView()
+        request = RequestFactory().get("/api/products/")
+        key = view.get_response_cache_key(request, view.get_response_cache_version())
+        cache.add(f"{key}:lock", "other", 30)
+
+        with mock.patch("apps.core.cache.WAIT_TIMEOUT", 0):
+            response = self.get_list()
+        titles = [item["title"] for item in response.json()["results"]]
+        self.assertIn("Вторая", titles)
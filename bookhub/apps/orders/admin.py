@@ -1,3 +1,4 @@
+from apps.core.ownership import OwnerListFilter
 from django.contrib import admin
 
 from .models import Cart, CartItem, Order, OrderItem, Review
@@ -20,7 +21,7 @@ class OrderAdmin(admin.ModelAdmin):
     """
 
     list_display = ("id_display", "customer", "status", "total_amount", "created_at")
-    list_filter = ("status", "created_at")
+    list_filter = ("status", OwnerListFilter, "created_at")
     search_fields = ("customer__email", "customer__username", "shipping_address")
     list_editable = ("status",)
     ordering = ("-created_at",)
@@ -65,7 +66,7 @@ class CartItemAdmin(admin.ModelAdmin):
     """
 
     list_display = ("cart", "product", "quantity", "created_at")
-    list_filter = ("created_at",)
+    list_filter = (OwnerListFilter, "created_at")
     search_fields = ("cart__user__email", "product__title")
     autocomplete_fields = ("cart", "product")
 
@@ -77,7 +78,7 @@ class ReviewAdmin(admin.ModelAdmin):
     """
 
     list_display = ("product", "user", "rating", "created_at")
-    list_filter = ("rating", "created_at")
+    list_filter = ("rating", OwnerListFilter, "created_at")
     search_fields = ("product__title", "user__email", "text")
     ordering = ("-created_at",)
     autocomplete_fields = ("product", "user")
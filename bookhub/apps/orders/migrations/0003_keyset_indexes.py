@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0002_owner_scope_indexes"),
+        ("products", "0005_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="orders_orde_created_f2fe3a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="orders_revi_created_b5e503_idx"
+            ),
+        ),
+    ]
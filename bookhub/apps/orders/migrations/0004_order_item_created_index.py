@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0003_keyset_indexes"),
+        ("products", "0010_sales_rankings"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="orderitem",
+            index=models.Index(
+                fields=["created_at"], name="orders_orde_created_861eeb_idx"
+            ),
+        ),
+    ]
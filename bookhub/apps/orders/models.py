@@ -1,6 +1,9 @@
+from apps.core.cache import bump_version_on_commit
 from apps.core.models import BaseModel
+from apps.products.models import Product
+from apps.products.signals import CATALOG_VERSION
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 
 class Order(BaseModel):
@@ -34,10 +37,17 @@ class Order(BaseModel):
     shipping_address = models.TextField(verbose_name="Адрес доставки")
     notes = models.TextField(blank=True, verbose_name="Примечания")
 
+    # Владелец для проверок прав, scoping и админки (apps.core.ownership)
+    owner_field = "customer"
+
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["customer", "-created_at"]),
+            models.Index(fields=["-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"Заказ #{self.id} - {self.customer}"
@@ -67,6 +77,10 @@ class OrderItem(BaseModel):
     class Meta:
         verbose_name = "Элемент заказа"
         verbose_name_plural = "Элементы заказа"
+        indexes = [
+            # Инкрементальный пересчет рейтинга продаж (apps.products.rankings)
+            models.Index(fields=["created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.product.title} x{self.quantity}"
@@ -84,6 +98,8 @@ class Cart(BaseModel):
         verbose_name="Пользователь",
     )
 
+    owner_field = "user"
+
     class Meta:
         verbose_name = "Корзина"
         verbose_name_plural = "Корзины"
@@ -110,6 +126,8 @@ class CartItem(BaseModel):
         default=1, validators=[MinValueValidator(1)], verbose_name="Количество"
     )
 
+    owner_field = "cart__user"
+
     class Meta:
         verbose_name = "Элемент корзины"
         verbose_name_plural = "Элементы корзины"
@@ -142,10 +160,38 @@ class Review(BaseModel):
     )
     text = models.TextField(verbose_name="Текст отзыва")
 
+    owner_field = "user"
+
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         unique_together = ["product", "user"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.product}: {self.rating}★"
+
+    def save(self, *args, **kwargs):
+        # Гистограмма оценок товара меняется в той же транзакции, что и отзыв
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Review.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("product_id", "rating")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            current = (self.product_id, self.rating)
+            if previous != current:
+                if previous is not None:
+                    Product.objects.filter(pk=previous[0]).adjust_rating(
+                        previous[1], -1
+                    )
+                Product.objects.filter(pk=self.product_id).adjust_rating(self.rating, 1)
+                # update() не отправляет сигналы
+                bump_version_on_commit(CATALOG_VERSION)
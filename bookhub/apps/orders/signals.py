@@ -0,0 +1,18 @@
+from apps.core.cache import bump_version_on_commit
+from apps.products.models import Product
+from apps.products.signals import CATALOG_VERSION
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Review
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    """
+    Удаление отзыва (в т.ч. каскадное) убирает его оценку из гистограммы.
+    Collector выполняет удаление и сигналы в одной транзакции.
+    """
+
+    Product.objects.filter(pk=instance.product_id).adjust_rating(instance.rating, -1)
+    bump_version_on_commit(CATALOG_VERSION)
@@ -0,0 +1,128 @@
+from apps.authorization.models import AccessRule, BusinessElement, Role, UserRole
+from apps.core.ownership import get_owner_id, is_owner, owned_by
+from apps.products.models import Category, Product
+from apps.users.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from .models import Cart, CartItem, Order, OrderItem
+
+
+class OwnershipTests(TestCase):
+    """
+    Владелец объекта по owner_field модели без загрузки пользователя
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="customer@test.com", username="customer", password="Test123!"
+        )
+        cls.other = User.objects.create_user(
+            email="other@test.com", username="other", password="Test123!"
+        )
+        cls.product = Product.objects.create(
+            title="Книга", author="Автор", price=100, owner=cls.other
+        )
+        cls.order = Order.objects.create(customer=cls.user, shipping_address="Адрес")
+        Order.objects.create(customer=cls.other, shipping_address="Адрес")
+        cart = Cart.objects.create(user=cls.user)
+        cls.cart_item = CartItem.objects.create(cart=cart, product=cls.product)
+
+    def test_owner_column_without_queries(self):
+        order = Order.objects.get(pk=self.order.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_owner_id(order), self.user.pk)
+            self.assertTrue(is_owner(order, self.user))
+            self.assertFalse(is_owner(order, self.other))
+
+    def test_owner_through_relation(self):
+        # Загружается только корзина, пользователь - нет
+        item = CartItem.objects.get(pk=self.cart_item.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_owner_id(item), self.user.pk)
+
+    def test_product_owner(self):
+        product = Product.objects.get(pk=self.product.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_owner(product, self.other))
+
+    def test_owned_by(self):
+        self.assertEqual(
+            list(Order.objects.filter(owned_by(Order, self.user.pk))), [self.order]
+        )
+        self.assertEqual(
+            CartItem.objects.filter(owned_by(CartItem, self.other.pk)).count(), 0
+        )
+        self.assertIsNone(owned_by(Category, self.user.pk))
+
+
+class ConditionalRetrieveTests(APITestCase):
+    """
+    ETag / Last-Modified у retrieve заказов
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        customer, _ = Role.objects.get_or_create(name="customer")
+        AccessRule.objects.create(
+            role=customer,
+            element=BusinessElement.objects.create(name="order"),
+            read_permission=True,
+        )
+        cls.user = User.objects.create_user(
+            email="customer@test.com", username="customer", password="Test123!"
+        )
+        other = User.objects.create_user(
+            email="other@test.com", username="other", password="Test123!"
+        )
+        UserRole.objects.get_or_create(user=cls.user, role=customer)
+        UserRole.objects.get_or_create(user=other, role=customer)
+        cls.product = Product.objects.create(title="Книга", author="Автор", price=100)
+        cls.order = Order.objects.create(customer=cls.user, shipping_address="Адрес")
+        cls.other_order = Order.objects.create(customer=other, shipping_address="Адрес")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def get_order(self, order=None, **headers):
+        order = order or self.order
+        return self.client.get(f"/api/orders/orders/{order.pk}/", headers=headers)
+
+    def test_not_modified(self):
+        response = self.get_order()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+
+        response = self.get_order(**{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+        response = self.get_order(
+            **{"If-Modified-Since": self.get_order()["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_changes_update_etag(self):
+        etag = self.get_order()["ETag"]
+        item = OrderItem.objects.create(
+            order=self.order, product=self.product, quantity=1, price=100
+        )
+        added = self.get_order(**{"If-None-Match": etag})
+        self.assertEqual(added.status_code, 200)
+        self.assertNotEqual(added["ETag"], etag)
+
+        # Удаление позиции не меняет максимум updated_at, но меняет их число
+        item.delete()
+        removed = self.get_order(**{"If-None-Match": added["ETag"]})
+        self.assertEqual(removed.status_code, 200)
+
+    def test_other_customer_order(self):
+        etag = self.get_order()["ETag"]
+        response = self.get_order(self.other_order, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
@@ -1,4 +1,6 @@
 from apps.authorization.permissions import RBACPermission
+from apps.core.conditional import ConditionalRetrieveMixin
+from apps.core.pagination import KeysetPagination
 from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -22,16 +24,13 @@ class CartViewSet(viewsets.ModelViewSet):
 
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated, RBACPermission]
+    filter_backends = [RBACPermission.filter_backend]
 
     business_element_name = "cart"
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff:
-            return CartItem.objects.all()
-
-        cart, _ = Cart.objects.get_or_create(user=user)
-        return CartItem.objects.filter(cart=cart)
+        # Свои/все элементы корзины отбирает RBACFilterBackend
+        return CartItem.objects.all().order_by("-created_at")
 
     def get_cart(self):
         user = self.request.user
@@ -114,29 +113,32 @@ class CartViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """
-    ViewSet для заказов
+    ViewSet для заказов (retrieve поддерживает ETag / If-None-Match)
     """
 
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, RBACPermission]
+    filter_backends = [RBACPermission.filter_backend]
 
     business_element_name = "order"
+    pagination_class = KeysetPagination
+    # Статус опрашивается клиентами: позиции и товары входят в ответ
+    conditional_timestamps = (
+        "updated_at",
+        "customer__updated_at",
+        "items__updated_at",
+        "items__product__updated_at",
+    )
+    conditional_cache_control = "private, no-cache"
 
     def get_queryset(self):
-        user = self.request.user
-
-        # Админы видят все заказы
-        if user.is_staff:
-            return Order.objects.all()
-
-        # Менеджеры видят все заказы (но не могут удалять)
-        if user.roles.filter(name="manager").exists():
-            return Order.objects.all()
-
-        # Покупатели видят только свои заказы
-        return Order.objects.filter(customer=user)
+        # Менеджеры и админы видят все заказы, покупатели - только свои:
+        # условие строит RBACFilterBackend по read/read_all
+        return Order.objects.select_related("customer").prefetch_related(
+            "items__product__category"
+        )
 
     def perform_create(self, serializer):
         # При создании заказа автоматически назначаем текущего пользователя
@@ -159,21 +161,20 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response({"status": "Статус обновлен", "new_status": new_status})
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """
-    ViewSet для отзывов
+    ViewSet для отзывов (retrieve поддерживает ETag / If-None-Match)
     """
 
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated, RBACPermission]
+    filter_backends = [RBACPermission.filter_backend]
     business_element_name = "review"
+    pagination_class = KeysetPagination
+    conditional_timestamps = ("updated_at", "user__updated_at", "product__updated_at")
+    conditional_cache_control = "private, no-cache"
 
     def get_queryset(self):
-        user = self.request.user
-
-        if user.is_staff:
-            return Review.objects.all().order_by("-created_at")
-
         return Review.objects.all().order_by("-created_at")
 
     def perform_create(self, serializer):
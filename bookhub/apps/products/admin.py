@@ -1,3 +1,4 @@
+from apps.core.ownership import OwnerListFilter
 from django.contrib import admin
 
 from .models import Category, Product
@@ -25,10 +26,14 @@ class ProductAdmin(admin.ModelAdmin):
         "category",
         "is_available",
         "stock",
+        "rating_avg",
+        "rating_count",
         "owner",
     )
-    list_filter = ("is_available", "category", "created_at")
-    search_fields = ("title", "author", "description")
+    list_filter = ("is_available", "category", OwnerListFilter, "created_at")
+    search_fields = ("title", "author", "description", "external_id")
+    # Сохраняется в одной транзакции через save() - версия каталога
+    # поднимается сигналом один раз после COMMIT
     list_editable = ("price", "is_available", "stock")
     ordering = ("-created_at",)
     autocomplete_fields = ("category", "owner")
@@ -0,0 +1,121 @@
+from apps.core.cache import bump_version_on_commit
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .serializers import ProductBulkUpdateItemSerializer
+from .signals import CATALOG_VERSION
+
+BULK_UPDATE_FIELDS = ("price", "stock", "is_available")
+BULK_UPDATE_BATCH_SIZE = 1000
+
+
+def update_from_values(model, objs, fields, using):
+    """
+    UPDATE ... FROM (VALUES ...) по первичному ключу пачками.
+
+    В отличие от bulk_update (CASE WHEN на каждую строку и поле) SQL
+    линейный и почти не тратит время на сборку выражений Django.
+    Колонки VALUES - column1..N, так запрос одинаков для PostgreSQL
+    и SQLite >= 3.33.
+    """
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = model._meta.pk
+    model_fields = [model._meta.get_field(name) for name in fields]
+    assignments = ", ".join(
+        f"{quote(field.column)} = v.column{position}"
+        for position, field in enumerate(model_fields, start=2)
+    )
+    row_placeholder = "(" + ", ".join(["%s"] * (len(fields) + 1)) + ")"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), BULK_UPDATE_BATCH_SIZE):
+            batch = objs[start : start + BULK_UPDATE_BATCH_SIZE]
+            params = []
+            for obj in batch:
+                params.append(pk.get_db_prep_value(obj.pk, connection))
+                params += [
+                    field.get_db_prep_save(getattr(obj, field.attname), connection)
+                    for field in model_fields
+                ]
+            values = ", ".join([row_placeholder] * len(batch))
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} FROM (VALUES {values}) AS v "
+                f"WHERE {table}.{quote(pk.column)} = v.column1",
+                params,
+            )
+
+
+def bulk_update_products(queryset, items):
+    """
+    Пакетное обновление цены/остатка/доступности товаров из queryset.
+
+    Строки проверяются по отдельности, доступные товары блокируются
+    (SELECT ... FOR UPDATE в порядке id) и пишутся UPDATE ... FROM VALUES
+    в одной транзакции; версия каталога поднимается один раз после COMMIT.
+    Возвращает {"updated": n, "errors": [{"index", "id", "errors"}]}.
+    """
+
+    row_serializer = ProductBulkUpdateItemSerializer()
+    errors = []
+    changes = {}
+    for index, item in enumerate(items):
+        try:
+            data = row_serializer.run_validation(item)
+        except ValidationError as exc:
+            errors.append({"index": index, "id": item.get("id"), "errors": exc.detail})
+            continue
+        if data["id"] in changes:
+            errors.append(
+                {
+                    "index": index,
+                    "id": str(data["id"]),
+                    "errors": {"id": ["Товар повторяется в запросе"]},
+                }
+            )
+            continue
+        changes[data["id"]] = (index, data)
+
+    updated = []
+    with transaction.atomic():
+        # of=self: условия RBAC не должны блокировать строки других таблиц
+        products = (
+            queryset.filter(pk__in=changes)
+            .select_for_update(of=("self",))
+            .order_by("pk")
+        )
+        now = timezone.now()
+        for product in products.only("id", *BULK_UPDATE_FIELDS):
+            _, data = changes.pop(product.pk)
+            for field in BULK_UPDATE_FIELDS:
+                if field in data:
+                    setattr(product, field, data[field])
+            # bulk_update не вызывает auto_now
+            product.updated_at = now
+            updated.append(product)
+
+        if updated:
+            fields = [*BULK_UPDATE_FIELDS, "updated_at"]
+            if connections[queryset.db].vendor in ("postgresql", "sqlite"):
+                update_from_values(queryset.model, updated, fields, queryset.db)
+            else:
+                queryset.model.objects.bulk_update(
+                    updated, fields, batch_size=BULK_UPDATE_BATCH_SIZE
+                )
+            # bulk_update не отправляет сигналы
+            bump_version_on_commit(CATALOG_VERSION)
+
+    # Оставшиеся id не найдены или недоступны пользователю
+    for pk, (index, _) in changes.items():
+        errors.append(
+            {
+                "index": index,
+                "id": str(pk),
+                "errors": {"id": ["Товар не найден или нет прав на изменение"]},
+            }
+        )
+    errors.sort(key=lambda error: error["index"])
+    return {"updated": len(updated), "errors": errors}
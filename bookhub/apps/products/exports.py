@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from itertools import islice
+
+from apps.core.pagination import keyset_condition
+
+from .models import Product
+
+EXPORT_CHUNK_SIZE = 5000
+# Строк в одном куске ответа (~100-200 КБ CSV)
+EXPORT_BATCH_SIZE = 1000
+
+# Колонка выгрузки -> поле для .values_list()
+EXPORT_FIELDS = {
+    "id": "id",
+    "external_id": "external_id",
+    "title": "title",
+    "author": "author",
+    "description": "description",
+    "price": "price",
+    "stock": "stock",
+    "is_available": "is_available",
+    "category_id": "category_id",
+    "category_slug": "category__slug",
+    "updated_at": "updated_at",
+}
+
+# Порядок выгрузки: по нему же продолжение с ?after=
+EXPORT_ORDERING = ["updated_at", "id"]
+
+
+def export_queryset(since=None, after=None):
+    """
+    Товары для выгрузки в порядке (updated_at, id).
+
+    since - только измененные начиная с момента, after - (updated_at, id)
+    последней полученной строки для продолжения оборванной выгрузки.
+    """
+
+    queryset = Product.objects.order_by(*EXPORT_ORDERING)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    if after is not None:
+        queryset = queryset.filter(keyset_condition(EXPORT_ORDERING, after))
+    return queryset.values_list(*EXPORT_FIELDS.values())
+
+
+# Колонки, которым нужно преобразование в JSON/CSV-совместимый вид
+EXPORT_CONVERTERS = {
+    "id": str,
+    "price": str,
+    "category_id": str,
+    "updated_at": datetime.isoformat,
+}
+
+
+def iter_export_batches(queryset):
+    """
+    Пачки строк выгрузки из серверного курсора без загрузки выборки в память
+    """
+
+    # Преобразуются только UUID, Decimal и datetime - остальное уже str/int/bool
+    converters = [
+        (index, EXPORT_CONVERTERS[column])
+        for index, column in enumerate(EXPORT_FIELDS)
+        if column in EXPORT_CONVERTERS
+    ]
+    values = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while batch := [list(row) for row in islice(values, EXPORT_BATCH_SIZE)]:
+        for index, convert in converters:
+            for row in batch:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+        yield batch
+
+
+def iter_csv(batches):
+    """
+    CSV с заголовком, кусок ответа на пачку строк
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(batches):
+    """
+    JSON Lines, кусок ответа на пачку строк
+    """
+
+    columns = list(EXPORT_FIELDS)
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for batch in batches:
+        yield "".join(f"{dumps(dict(zip(columns, row)))}\n" for row in batch)
+
+
+def gzip_stream(chunks):
+    """
+    Сжатие потока в gzip на лету
+    """
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8"),
+}
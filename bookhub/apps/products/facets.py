@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+from apps.core.cache import get_or_compute, get_version
+from django.db.models import Count, Q
+
+from .signals import CATALOG_VERSION
+
+FACET_NAMES = ("category", "author", "is_available", "price")
+
+# Диапазоны цены для фасета: (от, до); None - без границы
+PRICE_RANGES = [(None, 500), (500, 1000), (1000, 2000), (2000, None)]
+
+AUTHOR_FACET_LIMIT = 20
+FACETS_CACHE_TIMEOUT = 60 * 10
+
+
+def parse_facets(value):
+    """
+    ?facets=category,author - запрошенные фасеты (неизвестные пропускаются)
+    """
+
+    names = {name.strip() for name in (value or "").split(",")}
+    return [name for name in FACET_NAMES if name in names]
+
+
+def _price_condition(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def compute_facets(queryset, names):
+    """
+    Счетчики фасетов по уже отфильтрованной выборке.
+
+    Категории и авторы - отдельные GROUP BY с сортировкой по счетчику в БД
+    (авторы - с LIMIT), без перекрестного произведения групп; наличие и
+    диапазоны цены - условные COUNT одним агрегатом.
+    """
+
+    queryset = queryset.order_by()
+    facets = {}
+
+    if "category" in names:
+        rows = (
+            queryset.values("category_id", "category__name")
+            .annotate(count=Count("pk"))
+            .order_by("-count", "category__name")
+        )
+        facets["category"] = [
+            {
+                "id": str(row["category_id"]) if row["category_id"] else None,
+                "name": row["category__name"],
+                "count": row["count"],
+            }
+            for row in rows
+        ]
+
+    if "author" in names:
+        rows = (
+            queryset.values("author")
+            .annotate(count=Count("pk"))
+            .order_by("-count", "author")[:AUTHOR_FACET_LIMIT]
+        )
+        facets["author"] = [
+            {"value": row["author"], "count": row["count"]} for row in rows
+        ]
+
+    if "is_available" in names or "price" in names:
+        aggregates = {
+            "total": Count("pk"),
+            "available": Count("pk", filter=Q(is_available=True)),
+        }
+        for index, (low, high) in enumerate(PRICE_RANGES):
+            aggregates[f"price_{index}"] = Count(
+                "pk", filter=_price_condition(low, high)
+            )
+        row = queryset.aggregate(**aggregates)
+        if "is_available" in names:
+            facets["is_available"] = [
+                {"value": True, "count": row["available"]},
+                {"value": False, "count": row["total"] - row["available"]},
+            ]
+        if "price" in names:
+            facets["price"] = [
+                {"min": low, "max": high, "count": row[f"price_{index}"]}
+                for index, (low, high) in enumerate(PRICE_RANGES)
+            ]
+
+    # Порядок ключей как в FACET_NAMES
+    return {name: facets[name] for name in FACET_NAMES if name in facets}
+
+
+def get_facets(queryset, names, params):
+    """
+    Фасеты из кеша по нормализованным параметрам и версии каталога
+    """
+
+    normalized = json.dumps(
+        {"facets": names, "params": params}, sort_keys=True, default=str
+    )
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    return get_or_compute(
+        f"products:facets:{digest}",
+        lambda: compute_facets(queryset, names),
+        FACETS_CACHE_TIMEOUT,
+        version=get_version(CATALOG_VERSION),
+        name="products:facets",
+    )
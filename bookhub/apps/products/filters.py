@@ -0,0 +1,103 @@
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .tree import get_subtree_paths
+
+# Параметры фильтров каталога: category, category_subtree, author - через запятую
+FILTER_PARAMS = (
+    "category",
+    "category_subtree",
+    "author",
+    "price_min",
+    "price_max",
+    "rating_min",
+    "is_available",
+)
+
+BOOLEAN_VALUES = {"true": True, "1": True, "false": False, "0": False}
+
+
+def parse_filters(params):
+    """
+    Разбирает фильтры каталога из query params в нормализованный словарь
+    """
+
+    filters = {}
+    errors = {}
+
+    for name in ("category", "category_subtree", "author"):
+        values = [
+            value.strip()
+            for raw in params.getlist(name)
+            for value in raw.split(",")
+            if value.strip()
+        ]
+        if values:
+            filters[name] = sorted(set(values))
+
+    for name in ("category", "category_subtree"):
+        if name in filters:
+            try:
+                filters[name] = sorted(
+                    {str(uuid.UUID(value)) for value in filters[name]}
+                )
+            except ValueError:
+                errors[name] = "Ожидаются UUID категорий"
+
+    for name in ("price_min", "price_max", "rating_min"):
+        if params.get(name):
+            try:
+                filters[name] = Decimal(params[name])
+            except InvalidOperation:
+                errors[name] = "Ожидается число"
+
+    if params.get("is_available"):
+        value = BOOLEAN_VALUES.get(params["is_available"].lower())
+        if value is None:
+            errors["is_available"] = "Ожидается true или false"
+        else:
+            filters["is_available"] = value
+
+    if errors:
+        raise ValidationError(errors)
+    return filters
+
+
+def apply_filters(queryset, filters):
+    """
+    Применяет разобранные фильтры к queryset товаров
+    """
+
+    if "category" in filters:
+        queryset = queryset.filter(category_id__in=filters["category"])
+    if "category_subtree" in filters:
+        # Пути берутся из кешированного дерева - сам фильтр один запрос
+        # с LIKE по индексу пути категории
+        condition = Q()
+        for path in get_subtree_paths(filters["category_subtree"]):
+            condition |= Q(category__path__startswith=path)
+        queryset = queryset.filter(condition) if condition else queryset.none()
+    if "author" in filters:
+        queryset = queryset.filter(author__in=filters["author"])
+    if "price_min" in filters:
+        queryset = queryset.filter(price__gte=filters["price_min"])
+    if "price_max" in filters:
+        queryset = queryset.filter(price__lte=filters["price_max"])
+    if "rating_min" in filters:
+        queryset = queryset.filter(rating_avg__gte=filters["rating_min"])
+    if "is_available" in filters:
+        queryset = queryset.filter(is_available=filters["is_available"])
+    return queryset
+
+
+class ProductFilterBackend(BaseFilterBackend):
+    """
+    Фильтры каталога: категория, автор, диапазон цены, рейтинг и наличие
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return apply_filters(queryset, parse_filters(request.query_params))
@@ -0,0 +1,242 @@
+import csv
+import json
+from itertools import islice
+
+from apps.core.cache import bump_version_on_commit
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Category, Product
+from .serializers import ProductImportRowSerializer
+from .signals import CATALOG_VERSION
+
+IMPORT_BATCH_SIZE = 1000
+# Сколько ошибок строк хранить в отчете (остальные только считаются)
+IMPORT_MAX_ERRORS = 100
+
+# Поля, которые импорт перезаписывает у существующего товара
+IMPORT_UPDATE_FIELDS = [
+    "title",
+    "author",
+    "description",
+    "price",
+    "stock",
+    "is_available",
+    "category",
+    "updated_at",
+]
+
+
+def iter_csv_records(lines):
+    """
+    Записи CSV с заголовком построчно
+    """
+
+    yield from csv.DictReader(lines)
+
+
+def iter_jsonl_records(lines):
+    """
+    Записи JSONL построчно; битая строка - ошибка только этой записи
+    """
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else {"__invalid__": line[:100]}
+
+
+IMPORT_FORMATS = {"csv": iter_csv_records, "jsonl": iter_jsonl_records}
+
+
+def detect_format(filename):
+    """
+    Формат по расширению файла (по умолчанию CSV)
+    """
+
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+class ProductImporter:
+    """
+    Потоковый импорт товаров пачками.
+
+    Записи читаются из итератора, проверяются построчно и пачкой
+    записываются через bulk_create(update_conflicts=True) по external_id:
+    новые товары создаются, существующие обновляются одним запросом на
+    пачку. Категории ищутся в словаре slug -> id, загруженном один раз.
+    Память не зависит от размера файла: держится одна пачка и первые
+    IMPORT_MAX_ERRORS ошибок.
+
+    update_queryset - товары, которые можно перезаписывать (область
+    update по RBAC); строки с чужим external_id попадают в ошибки.
+    None - без ограничений (команда import_products).
+    """
+
+    def __init__(
+        self,
+        owner=None,
+        batch_size=IMPORT_BATCH_SIZE,
+        progress=None,
+        update_queryset=None,
+    ):
+        self.owner = owner
+        self.update_queryset = update_queryset
+        self.batch_size = batch_size
+        self.progress = progress
+        self.categories = dict(Category.objects.values_list("slug", "id"))
+        self.row_serializer = ProductImportRowSerializer()
+        self.rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row, detail):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": detail})
+
+    def build_product(self, row, record):
+        """
+        Product из записи фида или None (ошибка записана в отчет)
+        """
+
+        if "__invalid__" in record:
+            self.add_error(row, {"non_field_errors": ["Некорректный JSON"]})
+            return None
+        # Пустые ячейки CSV и null в JSON - значения по умолчанию
+        record = {
+            key: value
+            for key, value in record.items()
+            if key is not None and value not in ("", None)
+        }
+        try:
+            data = self.row_serializer.run_validation(record)
+        except ValidationError as exc:
+            self.add_error(row, exc.detail)
+            return None
+
+        category_id = None
+        if data["category"]:
+            category_id = self.categories.get(data["category"])
+            if category_id is None:
+                self.add_error(row, {"category": ["Неизвестная категория"]})
+                return None
+
+        return Product(
+            external_id=data["external_id"],
+            title=data["title"],
+            author=data["author"],
+            description=data["description"],
+            price=data["price"],
+            stock=data["stock"],
+            is_available=data["is_available"],
+            category_id=category_id,
+            owner=self.owner,
+        )
+
+    def split_batch(self, rows):
+        """
+        (новые, разрешенные к обновлению) товары пачки; строки с товарами
+        вне области update записываются в отчет как ошибки
+        """
+
+        external_ids = [product.external_id for _, product in rows]
+        existing = set(
+            Product.objects.filter(external_id__in=external_ids).values_list(
+                "external_id", flat=True
+            )
+        )
+        allowed = existing
+        if self.update_queryset is not None and existing:
+            allowed = set(
+                self.update_queryset.filter(external_id__in=existing).values_list(
+                    "external_id", flat=True
+                )
+            )
+
+        created, updated = [], []
+        for row, product in rows:
+            if product.external_id not in existing:
+                created.append(product)
+            elif product.external_id in allowed:
+                updated.append(product)
+            else:
+                self.add_error(
+                    row, {"external_id": ["Нет прав на изменение этого товара"]}
+                )
+        return created, updated
+
+    def write_batch(self, rows):
+        # Повтор external_id в пачке: ON CONFLICT не обновит строку дважды
+        rows = list(
+            {product.external_id: (row, product) for row, product in rows}.values()
+        )
+        error_count, errors = self.error_count, len(self.errors)
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    created, updated = self.split_batch(rows)
+                    # Новые - обычным INSERT: товар, созданный параллельно
+                    # другим пользователем, не будет перезаписан (IntegrityError)
+                    Product.objects.bulk_create(created)
+                    Product.objects.bulk_create(
+                        updated,
+                        update_conflicts=True,
+                        unique_fields=["external_id"],
+                        update_fields=IMPORT_UPDATE_FIELDS,
+                    )
+                break
+            except IntegrityError:
+                if attempt:
+                    raise
+                # Повтор с новой разбивкой без ошибок первой попытки
+                self.error_count = error_count
+                del self.errors[errors:]
+        self.imported += len(created) + len(updated)
+
+    def run(self, records):
+        """
+        Импорт записей; возвращает отчет (строки, записано, ошибки)
+        """
+
+        numbered = enumerate(records, start=1)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            self.rows += len(batch)
+            products = [
+                (row, product)
+                for row, record in batch
+                if (product := self.build_product(row, record)) is not None
+            ]
+            if products:
+                self.write_batch(products)
+            if self.progress:
+                self.progress(self.report())
+
+        if self.imported:
+            # bulk_create не отправляет сигналы - версия каталога один раз
+            bump_version_on_commit(CATALOG_VERSION)
+        return self.report()
+
+    def report(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def import_products(lines, format="csv", **kwargs):
+    """
+    Импорт товаров из строк CSV/JSONL (файл, поток), см. ProductImporter
+    """
+
+    return ProductImporter(**kwargs).run(IMPORT_FORMATS[format](lines))
@@ -0,0 +1,61 @@
+import json
+import time
+
+from apps.users.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ...imports import IMPORT_BATCH_SIZE, IMPORT_FORMATS, detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = "Импорт товаров из CSV/JSONL фида (upsert по external_id)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл фида")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS, help="Формат (по расширению файла)"
+        )
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--owner", help="Email владельца новых товаров")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["owner"]:
+            owner = User.objects.filter(email=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"Пользователь '{options['owner']}' не найден")
+
+        started = time.monotonic()
+
+        def progress(report):
+            elapsed = time.monotonic() - started
+            self.stderr.write(
+                f"   строк {report['rows']}, записано {report['imported']}, "
+                f"ошибок {report['error_count']} "
+                f"({report['rows'] / max(elapsed, 1e-6):.0f} строк/с)",
+                ending="\r",
+            )
+
+        try:
+            feed = open(options["path"], encoding="utf-8-sig", newline="")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with feed:
+            report = import_products(
+                feed,
+                format=options["format"] or detect_format(options["path"]),
+                owner=owner,
+                batch_size=options["batch_size"],
+                progress=progress,
+            )
+        self.stderr.write("")
+
+        for error in report["errors"]:
+            details = json.dumps(error["errors"], ensure_ascii=False)
+            self.stderr.write(f"   строка {error['row']}: {details}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Импортировано {report['imported']} из {report['rows']} строк, "
+                f"ошибок: {report['error_count']}"
+            )
+        )
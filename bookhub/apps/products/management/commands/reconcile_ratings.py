@@ -0,0 +1,40 @@
+from apps.core.cache import bump_version_on_commit
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import Product
+from ...signals import CATALOG_VERSION
+
+
+class Command(BaseCommand):
+    help = "Сверка рейтингов товаров с отзывами (периодически, с --fix)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Пересчитать товары с расхождениями",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Сколько расхождений вывести"
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            mismatches = Product.objects.reconcile_ratings(fix=options["fix"])
+            if mismatches and options["fix"]:
+                bump_version_on_commit(CATALOG_VERSION)
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Расхождений нет"))
+            return
+
+        for product_id in mismatches[: options["limit"]]:
+            self.stdout.write(f"   • {product_id}")
+
+        if options["fix"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Исправлено товаров: {len(mismatches)}")
+            )
+        else:
+            raise CommandError(f"Найдено товаров с расхождениями: {len(mismatches)}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from ...rankings import RANKING_HALF_LIVES, update_rankings
+
+
+class Command(BaseCommand):
+    help = "Пересчет рейтингов продаж по новым заказам (периодически)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            choices=RANKING_HALF_LIVES,
+            action="append",
+            help="Окно рейтинга (по умолчанию все)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Пересчитать с нуля (например, после отмены заказов)",
+        )
+
+    def handle(self, *args, **options):
+        for window in options["window"] or RANKING_HALF_LIVES:
+            report = update_rankings(window, rebuild=options["rebuild"])
+            mode = "с нуля" if report["rebuild"] else "инкрементально"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{window}: {mode}, товаров с новыми продажами "
+                    f"{report['products']}, категорий обновлено "
+                    f"{report['categories']}"
+                )
+            )
@@ -0,0 +1,40 @@
+from django.db import models
+
+from .ratings import adjust_rating, reconcile_ratings
+from .search import autocomplete_products, search_products
+
+
+class ProductQuerySet(models.QuerySet):
+    def search(self, query):
+        """
+        Полнотекстовый поиск с ранжированием (см. apps.products.search)
+        """
+
+        return search_products(self, query)
+
+    def autocomplete(self, prefix, limit=10):
+        """
+        Подсказки для строки поиска (см. apps.products.search)
+        """
+
+        return autocomplete_products(self, prefix, limit)
+
+    def adjust_rating(self, star, delta):
+        """
+        Изменение гистограммы оценок (см. apps.products.ratings)
+        """
+
+        return adjust_rating(self, star, delta)
+
+    def reconcile_ratings(self, fix=True):
+        """
+        Сверка гистограмм оценок с отзывами (см. apps.products.ratings)
+        """
+
+        return reconcile_ratings(self, fix)
+
+
+class ProductManager(models.Manager.from_queryset(ProductQuerySet)):
+    def get_queryset(self):
+        # Поисковый документ нужен только в WHERE и ORDER BY
+        return super().get_queryset().defer("search_vector")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:30
+
+import apps.products.search
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    # GIN индекс есть только в PostgreSQL; в SQLite поиск идет через LIKE
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS products_product_search_gin "
+            "ON products_product USING gin (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS products_product_search_gin")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=apps.products.search.ProductSearchVector(),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name="Поисковый документ",
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
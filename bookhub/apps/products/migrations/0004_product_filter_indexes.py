@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0003_product_trigram_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "is_available", "price"],
+                name="products_pr_categor_4621db_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["author", "is_available"], name="products_pr_author_7b6390_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["is_available", "price"], name="products_pr_is_avai_702a2b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:44
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    """
+    Пути существующих категорий: обход от корней, уровень за уровнем
+    """
+
+    Category = apps.get_model("products", "Category")
+    parents = dict(Category.objects.values_list("pk", "parent_id"))
+    children = {}
+    for pk, parent_id in parents.items():
+        children.setdefault(parent_id, []).append(pk)
+
+    updated = []
+    level = [(pk, f"/{pk.hex}/") for pk in children.get(None, [])]
+    depth = 0
+    while level:
+        next_level = []
+        for pk, path in level:
+            updated.append(Category(pk=pk, path=path, depth=depth))
+            next_level += [
+                (child, f"{path}{child.hex}/") for child in children.get(pk, [])
+            ]
+        level = next_level
+        depth += 1
+    Category.objects.bulk_update(updated, ["path", "depth"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, verbose_name="Глубина"
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                default="",
+                editable=False,
+                max_length=1024,
+                verbose_name="Путь в дереве",
+            ),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["path"],
+                name="products_category_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0007_product_external_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["updated_at", "id"], name="products_pr_updated_e6e93b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def fill_ratings(apps, schema_editor):
+    """
+    Гистограммы оценок по уже существующим отзывам
+    """
+
+    Product = apps.get_model("products", "Product")
+    Review = apps.get_model("orders", "Review")
+    counts = (
+        Review.objects.order_by()
+        .values("product_id", "rating")
+        .annotate(count=Count("id"))
+    )
+    histograms = {}
+    for row in counts:
+        histograms.setdefault(row["product_id"], {})[f"rating_{row['rating']}"] = row[
+            "count"
+        ]
+    for product_id, histogram in histograms.items():
+        Product.objects.filter(pk=product_id).update(**histogram)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0008_product_export_index"),
+        ("orders", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_1",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_2",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_3",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_4",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_5",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_avg",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=Coalesce(
+                    Cast(
+                        Cast(
+                            F("rating_1") * 1
+                            + F("rating_2") * 2
+                            + F("rating_3") * 3
+                            + F("rating_4") * 4
+                            + F("rating_5") * 5,
+                            models.DecimalField(decimal_places=2, max_digits=12),
+                        )
+                        / NullIf(
+                            F("rating_1")
+                            + F("rating_2")
+                            + F("rating_3")
+                            + F("rating_4")
+                            + F("rating_5"),
+                            0,
+                        ),
+                        models.DecimalField(decimal_places=2, max_digits=3),
+                    ),
+                    models.Value(0),
+                    output_field=models.DecimalField(decimal_places=2, max_digits=3),
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=3),
+                verbose_name="Средняя оценка",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_count",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=F("rating_1")
+                + F("rating_2")
+                + F("rating_3")
+                + F("rating_4")
+                + F("rating_5"),
+                output_field=models.PositiveIntegerField(),
+                verbose_name="Число отзывов",
+            ),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-rating_avg", "-id"], name="products_pr_rating__089415_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,185 @@
+# Generated by Django 5.2.5 on 2026-10-19 20:04
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0009_product_ratings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesRankingState",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        auto_created=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлено"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Удалено"),
+                ),
+                (
+                    "window",
+                    models.CharField(
+                        choices=[("week", "Неделя"), ("month", "Месяц")],
+                        max_length=10,
+                        unique=True,
+                        verbose_name="Окно",
+                    ),
+                ),
+                (
+                    "processed_until",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Заказы учтены до"
+                    ),
+                ),
+                ("epoch", models.DateTimeField(verbose_name="Начало отсчета весов")),
+            ],
+            options={
+                "verbose_name": "Состояние рейтинга продаж",
+                "verbose_name_plural": "Состояния рейтингов продаж",
+            },
+        ),
+        migrations.CreateModel(
+            name="BestsellerRank",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        auto_created=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлено"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Удалено"),
+                ),
+                (
+                    "window",
+                    models.CharField(
+                        choices=[("week", "Неделя"), ("month", "Месяц")],
+                        max_length=10,
+                        verbose_name="Окно",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField(verbose_name="Место")),
+                ("score", models.FloatField(verbose_name="Продажи с учетом затухания")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bestseller_ranks",
+                        to="products.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bestseller_ranks",
+                        to="products.product",
+                        verbose_name="Товар",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Место в рейтинге продаж",
+                "verbose_name_plural": "Рейтинг продаж",
+                "indexes": [
+                    models.Index(
+                        fields=["window", "category", "position"],
+                        name="products_be_window_77c75a_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductSalesScore",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        auto_created=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создано"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлено"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Удалено"),
+                ),
+                (
+                    "window",
+                    models.CharField(
+                        choices=[("week", "Неделя"), ("month", "Месяц")],
+                        max_length=10,
+                        verbose_name="Окно",
+                    ),
+                ),
+                ("score", models.FloatField(default=0, verbose_name="Счет")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sales_scores",
+                        to="products.product",
+                        verbose_name="Товар",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счет продаж товара",
+                "verbose_name_plural": "Счета продаж товаров",
+                "indexes": [
+                    models.Index(
+                        fields=["window", "-score"],
+                        name="products_pr_window_58820b_idx",
+                    )
+                ],
+                "unique_together": {("window", "product")},
+            },
+        ),
+    ]
@@ -1,7 +1,15 @@
 from apps.core.models import BaseModel
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.utils.text import slugify
 
+from .managers import ProductManager
+from .ratings import RATING_FIELDS, rating_avg_expression, rating_count_expression
+from .search import ProductSearchVector
+
 
 class Category(BaseModel):
     """
@@ -21,20 +29,89 @@ class Category(BaseModel):
         related_name="children",
         verbose_name="Родительская категория",
     )
+    # Материализованный путь "/<id корня>/.../<свой id>/": поддерево -
+    # path LIKE '<путь>%', предки - id из пути
+    path = models.CharField(
+        max_length=1024, editable=False, default="", verbose_name="Путь в дереве"
+    )
+    depth = models.PositiveSmallIntegerField(
+        editable=False, default=0, verbose_name="Глубина"
+    )
 
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
         ordering = ["name"]
+        indexes = [
+            # pattern_ops - чтобы LIKE по префиксу шел по индексу в PostgreSQL
+            models.Index(
+                fields=["path"],
+                name="products_category_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def build_path(self):
+        """
+        Путь и глубина по родителю (родитель должен быть сохранен)
+        """
+
+        if self.parent_id is None:
+            return f"/{self.pk.hex}/", 0
+        # Из БД, а не из self.parent: родителя могли перенести после загрузки
+        parent_path, parent_depth = Category.objects.values_list("path", "depth").get(
+            pk=self.parent_id
+        )
+        if f"/{self.pk.hex}/" in parent_path:
+            raise ValidationError(
+                {"parent": "Нельзя перенести категорию в ее же поддерево"}
+            )
+        return f"{parent_path}{self.pk.hex}/", parent_depth + 1
+
+    def clean(self):
+        super().clean()
+        if self.parent_id is not None:
+            self.build_path()
+
+    def get_ancestors(self):
+        """
+        Предки от корня к родителю - одним запросом по id из пути
+        """
+
+        ids = self.path.strip("/").split("/")[:-1]
+        return Category.objects.filter(pk__in=ids).order_by("depth")
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "parent" not in update_fields:
+            super().save(*args, **kwargs)
+            return
+
+        old = (
+            Category.objects.filter(pk=self.pk).values("path", "depth").first()
+            if not self._state.adding
+            else None
+        )
+        self.path, self.depth = self.build_path()
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "path", "depth"}
         super().save(*args, **kwargs)
 
+        if old and old["path"] and old["path"] != self.path:
+            # Перенос поддерева: пути и глубины потомков - одним UPDATE
+            Category.objects.filter(path__startswith=old["path"]).exclude(
+                pk=self.pk
+            ).update(
+                path=Concat(Value(self.path), Substr("path", len(old["path"]) + 1)),
+                depth=F("depth") + (self.depth - old["depth"]),
+            )
+
 
 class Product(BaseModel):
     """
@@ -61,11 +138,177 @@ class Product(BaseModel):
     )
     is_available = models.BooleanField(default=True, verbose_name="Доступен для заказа")
     stock = models.PositiveIntegerField(default=0, verbose_name="Количество на складе")
+    # Ключ импорта из фидов поставщиков: ISBN или артикул поставщика
+    external_id = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Внешний идентификатор (ISBN)",
+    )
+    # Поисковый документ: tsvector в PostgreSQL, текст для LIKE в SQLite
+    search_vector = models.GeneratedField(
+        expression=ProductSearchVector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="Поисковый документ",
+    )
+
+    # Гистограмма оценок из отзывов: меняется инкрементально вместе с
+    # Review (см. ratings.py), число и среднее вычисляет сама БД
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.GeneratedField(
+        expression=rating_count_expression(),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+        verbose_name="Число отзывов",
+    )
+    rating_avg = models.GeneratedField(
+        expression=rating_avg_expression(),
+        output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        db_persist=True,
+        verbose_name="Средняя оценка",
+    )
+
+    objects = ProductManager()
+
+    # Поле владельца (см. apps.core.ownership)
+    owner_field = "owner"
 
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
         ordering = ["-created_at"]
+        # Под сочетания фильтров каталога (см. filters.py)
+        indexes = [
+            models.Index(fields=["category", "is_available", "price"]),
+            models.Index(fields=["author", "is_available"]),
+            models.Index(fields=["is_available", "price"]),
+            # Keyset-пагинация (см. apps.core.pagination)
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["price", "id"]),
+            # Выгрузка и ее продолжение (см. exports.py)
+            models.Index(fields=["updated_at", "id"]),
+            # Сортировка и фильтр по рейтингу
+            models.Index(fields=["-rating_avg", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.author}"
+
+    def save(self, *args, **kwargs):
+        # Счетчики оценок меняет только adjust_rating (UPDATE ... = F() + 1):
+        # сохранение товара не должно писать обратно значения, прочитанные
+        # до нового отзыва
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.attname not in deferred
+                and field.name not in RATING_FIELDS.values()
+            ]
+        super().save(*args, **kwargs)
+
+
+# Окна рейтинга продаж (см. rankings.py)
+RANKING_WINDOW_CHOICES = [
+    ("week", "Неделя"),
+    ("month", "Месяц"),
+]
+
+
+class SalesRankingState(BaseModel):
+    """
+    Состояние пересчета рейтинга продаж окна: до какого момента учтены
+    позиции заказов и от какого момента отсчитываются веса затухания
+    """
+
+    window = models.CharField(
+        max_length=10, choices=RANKING_WINDOW_CHOICES, unique=True, verbose_name="Окно"
+    )
+    processed_until = models.DateTimeField(
+        null=True, blank=True, verbose_name="Заказы учтены до"
+    )
+    epoch = models.DateTimeField(verbose_name="Начало отсчета весов")
+
+    class Meta:
+        verbose_name = "Состояние рейтинга продаж"
+        verbose_name_plural = "Состояния рейтингов продаж"
+
+    def __str__(self):
+        return f"{self.window}: {self.processed_until}"
+
+
+class ProductSalesScore(BaseModel):
+    """
+    Счет продаж товара в окне с затуханием по времени.
+
+    Хранится в весах от epoch окна (см. rankings.py), поэтому новые
+    продажи только прибавляются к счету.
+    """
+
+    window = models.CharField(
+        max_length=10, choices=RANKING_WINDOW_CHOICES, verbose_name="Окно"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="sales_scores",
+        verbose_name="Товар",
+    )
+    score = models.FloatField(default=0, verbose_name="Счет")
+
+    class Meta:
+        verbose_name = "Счет продаж товара"
+        verbose_name_plural = "Счета продаж товаров"
+        unique_together = ["window", "product"]
+        indexes = [
+            models.Index(fields=["window", "-score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.window}: {self.product_id} - {self.score:.2f}"
+
+
+class BestsellerRank(BaseModel):
+    """
+    Топ-K товаров окна по категории (с подкатегориями); category = NULL -
+    весь каталог
+    """
+
+    window = models.CharField(
+        max_length=10, choices=RANKING_WINDOW_CHOICES, verbose_name="Окно"
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="bestseller_ranks",
+        verbose_name="Категория",
+    )
+    position = models.PositiveSmallIntegerField(verbose_name="Место")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="bestseller_ranks",
+        verbose_name="Товар",
+    )
+    score = models.FloatField(verbose_name="Продажи с учетом затухания")
+
+    class Meta:
+        verbose_name = "Место в рейтинге продаж"
+        verbose_name_plural = "Рейтинг продаж"
+        indexes = [
+            models.Index(fields=["window", "category", "position"]),
+        ]
+
+    def __str__(self):
+        return f"{self.window}: {self.category_id} #{self.position}"
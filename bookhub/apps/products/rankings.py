@@ -0,0 +1,204 @@
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from apps.core.cache import bump_version_on_commit
+from apps.orders.models import OrderItem
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BestsellerRank, Product, ProductSalesScore, SalesRankingState
+from .signals import BESTSELLERS_VERSION
+from .tree import get_category_tree
+
+# Окно -> период полураспада веса продажи (половина окна)
+RANKING_HALF_LIVES = {
+    "week": timedelta(days=3.5),
+    "month": timedelta(days=15),
+}
+RANKING_TOP_K = 50
+# Позиции моложе этого не берутся: их транзакция могла еще не завершиться
+RANKING_LAG = timedelta(minutes=5)
+# Через сколько полупериодов веса переносятся к новому epoch (2**40 ~ 1e12)
+RANKING_REBASE_AFTER = 40
+# Без заказов дольше стольких полупериодов товар выпадает из рейтинга
+RANKING_HISTORY = 20
+# После переноса весов счета меньше этого удаляются
+RANKING_MIN_SCORE = 2**-RANKING_HISTORY
+
+
+def decay_weight(moment, epoch, half_life):
+    """
+    Вес продажи в момент moment относительно epoch: 2 ** ((moment - epoch) / T).
+
+    Вес растет со временем вместо затухания старых продаж, поэтому
+    отношение счетов товаров со временем не меняется и новые продажи
+    просто прибавляются к счету без пересчета истории.
+    """
+
+    return 2 ** ((moment - epoch) / half_life)
+
+
+def category_ancestors(path):
+    """
+    id категории и всех ее предков из материализованного пути
+    """
+
+    return [uuid.UUID(part) for part in path.strip("/").split("/")]
+
+
+def collect_sales(since, until, epoch, half_life):
+    """
+    Взвешенные продажи по товарам из позиций заказов в (since, until]
+    """
+
+    items = OrderItem.objects.filter(created_at__lte=until).exclude(
+        order__status="cancelled"
+    )
+    if since is not None:
+        items = items.filter(created_at__gt=since)
+
+    sales = defaultdict(float)
+    for product_id, quantity, created_at in items.values_list(
+        "product_id", "quantity", "created_at"
+    ).iterator(chunk_size=5000):
+        sales[product_id] += quantity * decay_weight(created_at, epoch, half_life)
+    return sales
+
+
+def rebase_scores(window, state, new_epoch, half_life):
+    """
+    Перенос счетов окна к новому epoch: одно умножение, без пересчета
+    истории; товары с исчезающе малым счетом удаляются
+    """
+
+    factor = 1 / decay_weight(new_epoch, state.epoch, half_life)
+    scores = ProductSalesScore.objects.filter(window=window)
+    scores.update(score=F("score") * factor, updated_at=timezone.now())
+    scores.filter(score__lt=RANKING_MIN_SCORE).delete()
+    state.epoch = new_epoch
+
+
+def add_scores(window, sales):
+    """
+    Прибавляет новые продажи к счетам товаров (upsert пачкой)
+    """
+
+    current = dict(
+        ProductSalesScore.objects.filter(
+            window=window, product_id__in=list(sales)
+        ).values_list("product_id", "score")
+    )
+    ProductSalesScore.objects.bulk_create(
+        [
+            ProductSalesScore(
+                window=window,
+                product_id=product_id,
+                score=current.get(product_id, 0) + gain,
+            )
+            for product_id, gain in sales.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["window", "product"],
+        update_fields=["score", "updated_at"],
+        batch_size=1000,
+    )
+
+
+def refresh_ranks(window, category_ids, scale):
+    """
+    Пересобирает топ-K окна для категорий (None - весь каталог).
+
+    scale переводит счет из весов epoch в продажи с затуханием на момент
+    пересчета - это значение и хранится в рейтинге.
+    """
+
+    paths = get_category_tree()["paths"]
+    for category_id in category_ids:
+        scores = ProductSalesScore.objects.filter(window=window)
+        if category_id is not None:
+            path = paths.get(str(category_id))
+            if path is None:
+                continue
+            scores = scores.filter(product__category__path__startswith=path)
+        top = scores.order_by("-score", "product_id").values_list(
+            "product_id", "score"
+        )[:RANKING_TOP_K]
+        ranks = [
+            BestsellerRank(
+                window=window,
+                category_id=category_id,
+                position=position,
+                product_id=product_id,
+                score=round(score * scale, 4),
+            )
+            for position, (product_id, score) in enumerate(top, start=1)
+        ]
+        BestsellerRank.objects.filter(window=window, category_id=category_id).delete()
+        BestsellerRank.objects.bulk_create(ranks)
+
+
+def update_rankings(window, now=None, rebuild=False):
+    """
+    Инкрементальный пересчет рейтинга продаж окна.
+
+    Берутся только позиции заказов, созданные после прошлого пересчета
+    (по индексу created_at); их веса прибавляются к счетам товаров, а
+    топ-K пересобирается лишь для категорий этих товаров и их предков.
+    rebuild - пересчет с нуля по последним RANKING_HISTORY полупериодам.
+    Запуски одного окна сериализуются блокировкой строки состояния.
+    """
+
+    half_life = RANKING_HALF_LIVES[window]
+    until = (now or timezone.now()) - RANKING_LAG
+
+    with transaction.atomic():
+        state, _ = SalesRankingState.objects.select_for_update().get_or_create(
+            window=window, defaults={"epoch": until}
+        )
+        full = rebuild or state.processed_until is None
+        if full:
+            ProductSalesScore.objects.filter(window=window).delete()
+            state.epoch = until
+            since = until - half_life * RANKING_HISTORY
+        else:
+            since = state.processed_until
+            if until - state.epoch > half_life * RANKING_REBASE_AFTER:
+                rebase_scores(window, state, until, half_life)
+                full = True
+
+        sales = collect_sales(since, until, state.epoch, half_life)
+        if sales:
+            add_scores(window, sales)
+
+        if full:
+            products = Product.objects.filter(sales_scores__window=window)
+            # Категории, выпавшие из рейтинга, тоже очищаются
+            BestsellerRank.objects.filter(window=window).delete()
+        else:
+            products = Product.objects.filter(pk__in=list(sales))
+        paths = (
+            products.filter(category__isnull=False)
+            .order_by()
+            .values_list("category__path", flat=True)
+            .distinct()
+        )
+        categories = {None} if sales or full else set()
+        for path in paths:
+            categories.update(category_ancestors(path))
+        refresh_ranks(
+            window, categories, 1 / decay_weight(until, state.epoch, half_life)
+        )
+
+        state.processed_until = until
+        state.save(update_fields=["processed_until", "epoch", "updated_at"])
+        if categories:
+            bump_version_on_commit(BESTSELLERS_VERSION)
+
+    return {
+        "window": window,
+        "rebuild": full,
+        "products": len(sales),
+        "categories": len(categories),
+    }
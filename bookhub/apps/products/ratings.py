@@ -0,0 +1,113 @@
+import operator
+from functools import reduce
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Now, NullIf
+
+# Оценка (звезды) -> колонка гистограммы на товаре
+RATING_FIELDS = {star: f"rating_{star}" for star in range(1, 6)}
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+def rating_count_expression():
+    """
+    Число отзывов: сумма гистограммы
+    """
+
+    return reduce(operator.add, (F(field) for field in RATING_FIELDS.values()))
+
+
+def rating_avg_expression():
+    """
+    Средняя оценка с точностью 0.01; 0 для товара без отзывов
+    """
+
+    total = reduce(
+        operator.add, (F(field) * star for star, field in RATING_FIELDS.items())
+    )
+    average = Cast(total, DecimalField(max_digits=12, decimal_places=2)) / NullIf(
+        rating_count_expression(), 0
+    )
+    return Coalesce(
+        Cast(average, DecimalField(max_digits=3, decimal_places=2)),
+        Value(0),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def rating_histogram(product):
+    """
+    Гистограмма оценок {"1": n, ..., "5": n} экземпляра или строки .values()
+    """
+
+    if isinstance(product, dict):
+        return {str(star): product[field] for star, field in RATING_FIELDS.items()}
+    return {str(star): getattr(product, field) for star, field in RATING_FIELDS.items()}
+
+
+def adjust_rating(queryset, star, delta):
+    """
+    Атомарно меняет счетчик оценки star на delta (UPDATE ... SET = F() + delta).
+    Ниже нуля не опускается: расхождение исправит reconcile_ratings.
+    """
+
+    field = RATING_FIELDS[star]
+    return queryset.update(
+        **{field: Greatest(F(field) + delta, 0), "updated_at": Now()}
+    )
+
+
+def actual_rating_counts(queryset):
+    """
+    Подзапросы: фактическое число отзывов с каждой оценкой по таблице отзывов
+    """
+
+    review_model = queryset.model._meta.get_field("reviews").related_model
+    return {
+        field: Coalesce(
+            Subquery(
+                review_model.objects.filter(product=OuterRef("pk"), rating=star)
+                .order_by()
+                .values("product")
+                .annotate(count=Count("pk"))
+                .values("count"),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+        for star, field in RATING_FIELDS.items()
+    }
+
+
+def reconcile_ratings(queryset, fix=True):
+    """
+    Сверяет гистограммы товаров с отзывами; с fix=True исправляет
+    расхождения. Возвращает id товаров, где они были найдены.
+    """
+
+    actual = actual_rating_counts(queryset)
+    mismatch = reduce(
+        operator.or_,
+        (~Q(**{field: F(f"actual_{field}")}) for field in RATING_FIELDS.values()),
+    )
+    ids = list(
+        queryset.annotate(**{f"actual_{field}": expr for field, expr in actual.items()})
+        .filter(mismatch)
+        .values_list("pk", flat=True)
+    )
+    if fix:
+        for start in range(0, len(ids), RECONCILE_BATCH_SIZE):
+            queryset.model.objects.filter(
+                pk__in=ids[start : start + RECONCILE_BATCH_SIZE]
+            ).update(**actual, updated_at=Now())
+    return ids
@@ -0,0 +1,123 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import Case, Expression, F, Q, TextField, Value, When
+from django.db.models.functions import Concat, Greatest, Lower
+
+# Словари для стемминга: документ и запрос строятся по обоим
+SEARCH_CONFIGS = ("russian", "english")
+
+# Поле товара -> вес в ранжировании (A - самый важный)
+SEARCH_WEIGHTS = {"title": "A", "author": "B", "description": "C"}
+
+# Поля подсказок: по ним построены триграммные GIN индексы
+AUTOCOMPLETE_FIELDS = ("title", "author")
+AUTOCOMPLETE_MAX_LENGTH = 50
+
+
+class ProductSearchVector(Expression):
+    """
+    Поисковый документ товара для GeneratedField.
+
+    В PostgreSQL - tsvector с весами полей по русскому и английскому
+    словарям, в остальных БД - склеенный текст в нижнем регистре для LIKE.
+    """
+
+    def __init__(self, output_field=None):
+        super().__init__(output_field=output_field or SearchVectorField())
+        self.vector = reduce(
+            operator.add,
+            (
+                SearchVector(field, config=config, weight=weight)
+                for field, weight in SEARCH_WEIGHTS.items()
+                for config in SEARCH_CONFIGS
+            ),
+        )
+        parts = []
+        for field in SEARCH_WEIGHTS:
+            parts += [F(field), Value(" ")]
+        self.text = Lower(Concat(*parts[:-1], output_field=TextField()))
+
+    def get_source_expressions(self):
+        return [self.vector, self.text]
+
+    def set_source_expressions(self, exprs):
+        self.vector, self.text = exprs
+
+    def as_sql(self, compiler, connection):
+        return compiler.compile(self.text)
+
+    def as_postgresql(self, compiler, connection):
+        return compiler.compile(self.vector)
+
+
+def search_products(queryset, query):
+    """
+    Товары по поисковой строке, самые релевантные первыми.
+
+    PostgreSQL: websearch-запрос по обоим словарям, GIN индекс и ts_rank;
+    иначе - все слова запроса должны входить в текст товара (LIKE,
+    без стемминга; LOWER в SQLite переводит в нижний регистр только латиницу).
+    """
+
+    if connections[queryset.db].vendor == "postgresql":
+        search_query = reduce(
+            operator.or_,
+            (
+                SearchQuery(query, config=config, search_type="websearch")
+                for config in SEARCH_CONFIGS
+            ),
+        )
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-created_at")
+        )
+
+    condition = Q()
+    for term in query.lower().split():
+        condition &= Q(search_vector__contains=term)
+    return queryset.filter(condition)
+
+
+def normalize_prefix(prefix):
+    """
+    Префикс подсказки: нижний регистр, одиночные пробелы, ограничение длины
+    """
+
+    return " ".join(prefix.lower().split())[:AUTOCOMPLETE_MAX_LENGTH]
+
+
+def autocomplete_products(queryset, prefix, limit):
+    """
+    Подсказки по названию и автору: только id, title и author.
+
+    Кандидаты отбираются icontains - в PostgreSQL его UPPER(...) LIKE
+    обслуживают триграммные GIN индексы; порядок - по word_similarity.
+    """
+
+    condition = Q()
+    for field in AUTOCOMPLETE_FIELDS:
+        condition |= Q(**{f"{field}__icontains": prefix})
+    queryset = queryset.filter(condition)
+
+    if connections[queryset.db].vendor == "postgresql":
+        score = Greatest(
+            *(TrigramWordSimilarity(prefix, field) for field in AUTOCOMPLETE_FIELDS)
+        )
+    else:
+        score = Case(When(title__istartswith=prefix, then=Value(1)), default=Value(0))
+
+    return (
+        queryset.annotate(score=score)
+        .order_by("-score", "title")
+        .values("id", "title", "author")[:limit]
+    )
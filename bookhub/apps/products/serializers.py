@@ -1,17 +1,26 @@
+import uuid
+
 from rest_framework import serializers
 
-from .models import Category, Product
+from .models import RANKING_WINDOW_CHOICES, Category, Product
+from .rankings import RANKING_TOP_K
+from .ratings import RATING_FIELDS, rating_histogram
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name", "description", "parent_id", "created_at"]
+        fields = ["id", "name", "description", "parent_id", "depth", "created_at"]
         read_only_fields = ["id", "created_at"]
 
 
 class ProductSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
+    rating_avg = serializers.DecimalField(
+        max_digits=3, decimal_places=2, read_only=True
+    )
+    rating_count = serializers.IntegerField(read_only=True)
+    rating_histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -26,11 +35,173 @@ class ProductSerializer(serializers.ModelSerializer):
             "owner",
             "stock",
             "is_available",
+            "rating_avg",
+            "rating_count",
+            "rating_histogram",
             "created_at",
         ]
         read_only_fields = ["id", "created_at", "owner"]
 
+    def get_rating_histogram(self, obj):
+        return rating_histogram(obj)
+
     def create(self, validated_data):
         # Устанавливаем владельца как текущего пользователя
         validated_data["owner"] = self.context["request"].user
         return super().create(validated_data)
+
+
+class ProductReadSerializer(serializers.BaseSerializer):
+    """
+    Легкий сериализатор списка товаров: строки .values() -> dict.
+
+    Формат ответа совпадает с ProductSerializer, но без экземпляров
+    моделей и без полей DRF на каждую строку.
+    """
+
+    # Колонки для .values(): категория присоединяется в том же запросе
+    FIELDS = (
+        "id",
+        "title",
+        "author",
+        "description",
+        "price",
+        "category_id",
+        "category__name",
+        "owner_id",
+        "stock",
+        "is_available",
+        "rating_avg",
+        "rating_count",
+        *RATING_FIELDS.values(),
+        "created_at",
+    )
+
+    _price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    _rating = serializers.DecimalField(max_digits=3, decimal_places=2)
+    _datetime = serializers.DateTimeField()
+
+    def to_representation(self, row):
+        category_id, owner_id = row["category_id"], row["owner_id"]
+        data = {
+            "id": str(row["id"]),
+            "title": row["title"],
+            "author": row["author"],
+            "description": row["description"],
+            "price": self._price.to_representation(row["price"]),
+            "category": str(category_id) if category_id else None,
+            "category_name": row["category__name"],
+            "owner": str(owner_id) if owner_id else None,
+            "stock": row["stock"],
+            "is_available": row["is_available"],
+            "rating_avg": self._rating.to_representation(row["rating_avg"]),
+            "rating_count": row["rating_count"],
+            "rating_histogram": rating_histogram(row),
+            "created_at": self._datetime.to_representation(row["created_at"]),
+        }
+        if not category_id:
+            # ProductSerializer пропускает category.name у товара без категории
+            del data["category_name"]
+        return data
+
+
+class BestsellerReadSerializer(ProductReadSerializer):
+    """
+    Товар рейтинга продаж: поля ProductReadSerializer, место и продажи
+    с учетом затухания
+    """
+
+    def to_representation(self, row):
+        return {
+            "position": row["position"],
+            "sales_score": row["sales_score"],
+            **super().to_representation(row),
+        }
+
+
+class BestsellerQuerySerializer(serializers.Serializer):
+    """
+    Параметры рейтинга продаж; без category - по всему каталогу
+    """
+
+    window = serializers.ChoiceField(choices=RANKING_WINDOW_CHOICES, default="week")
+    category = serializers.UUIDField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=RANKING_TOP_K, default=10)
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """
+    Строка фида импорта; category - slug существующей категории
+    """
+
+    external_id = serializers.CharField(max_length=64)
+    title = serializers.CharField(max_length=255)
+    author = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    stock = serializers.IntegerField(min_value=0, required=False, default=0)
+    is_available = serializers.BooleanField(required=False, default=True)
+    category = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class ProductImportSerializer(serializers.Serializer):
+    """
+    Параметры импорта товаров из файла
+    """
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=["csv", "jsonl"], required=False)
+    batch_size = serializers.IntegerField(
+        min_value=100, max_value=10000, required=False, default=1000
+    )
+
+
+class ProductExportSerializer(serializers.Serializer):
+    """
+    Параметры выгрузки каталога; after - "<updated_at>,<id>" последней строки
+    """
+
+    output = serializers.ChoiceField(choices=["csv", "jsonl"], default="csv")
+    gzip = serializers.BooleanField(required=False, default=False)
+    since = serializers.DateTimeField(required=False)
+    after = serializers.CharField(required=False)
+
+    def validate_after(self, value):
+        updated_at, _, pk = value.rpartition(",")
+        try:
+            return [
+                serializers.DateTimeField().to_internal_value(updated_at),
+                uuid.UUID(pk),
+            ]
+        except (serializers.ValidationError, ValueError):
+            raise serializers.ValidationError("Ожидается <updated_at>,<id>")
+
+
+class ProductBulkUpdateItemSerializer(serializers.Serializer):
+    """
+    Изменение одного товара в пакетном обновлении
+    """
+
+    id = serializers.UUIDField()
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    stock = serializers.IntegerField(min_value=0, required=False)
+    is_available = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError(
+                "Нужно хотя бы одно из полей price, stock, is_available"
+            )
+        return attrs
+
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    """
+    Пакетное обновление цен и остатков (строки проверяются по отдельности)
+    """
+
+    items = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=5000
+    )
@@ -0,0 +1,34 @@
+from apps.core.cache import bump_version_on_commit
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Product
+
+# Пространство имен версии каталога (см. apps.core.cache)
+CATALOG_VERSION = "catalog"
+# Дерево категорий не зависит от товаров - своя версия
+CATEGORY_TREE_VERSION = "category_tree"
+# Рейтинги продаж: поднимается после пересчета (см. rankings.py)
+BESTSELLERS_VERSION = "bestsellers"
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_catalog_version(sender, **kwargs):
+    """
+    Любое изменение товаров или категорий делает устаревшими кеши каталога
+    """
+
+    bump_version_on_commit(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_tree_version(sender, **kwargs):
+    """
+    Изменение категории (в т.ч. перенос поддерева) устаревает кеш дерева
+    """
+
+    bump_version_on_commit(CATEGORY_TREE_VERSION)
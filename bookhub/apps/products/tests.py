@@ -0,0 +1,731 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from apps.authorization.models import AccessRule, BusinessElement, Role, UserRole
+from apps.orders.models import Order, OrderItem, Review
+from apps.users.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .exports import EXPORT_FIELDS
+from .facets import FACET_NAMES, compute_facets
+from .models import BestsellerRank, Category, Product
+from .rankings import RANKING_HALF_LIVES, RANKING_LAG, decay_weight, update_rankings
+from .serializers import ProductSerializer
+
+
+class RatingHistogramTests(APITestCase):
+    """
+    Гистограмма оценок товара меняется вместе с отзывами
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="Test123!"
+        )
+        cls.users = [
+            User.objects.create_user(
+                email=f"reader{i}@test.com", username=f"reader{i}", password="Test123!"
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            title="Книга", author="Автор", description="", price=100
+        )
+
+    def review(self, user, rating):
+        return Review.objects.create(
+            product=self.product, user=user, rating=rating, text="Отзыв"
+        )
+
+    def histogram(self):
+        self.product.refresh_from_db()
+        return (
+            [getattr(self.product, f"rating_{star}") for star in range(1, 6)],
+            self.product.rating_count,
+            self.product.rating_avg,
+        )
+
+    def test_create_change_delete(self):
+        first = self.review(self.users[0], 5)
+        self.review(self.users[1], 3)
+        self.assertEqual(self.histogram(), ([0, 0, 1, 0, 1], 2, 4))
+
+        first.rating = 1
+        first.save()
+        self.assertEqual(self.histogram(), ([1, 0, 1, 0, 0], 2, 2))
+
+        first.delete()
+        self.assertEqual(self.histogram(), ([0, 0, 1, 0, 0], 1, 3))
+
+    def test_review_during_edit_is_kept(self):
+        # Товар прочитан до отзыва и сохранен после него
+        stale = Product.objects.get(pk=self.product.pk)
+        self.review(self.users[0], 5)
+        stale.price = 150
+        stale.save()
+        self.assertEqual(self.histogram(), ([0, 0, 0, 0, 1], 1, 5))
+        self.assertEqual(self.product.price, 150)
+
+    def test_reconcile(self):
+        self.review(self.users[0], 4)
+        Product.objects.filter(pk=self.product.pk).update(rating_4=0, rating_2=3)
+        self.assertEqual(
+            Product.objects.reconcile_ratings(fix=False), [self.product.pk]
+        )
+
+        self.assertEqual(Product.objects.reconcile_ratings(), [self.product.pk])
+        self.assertEqual(self.histogram(), ([0, 0, 0, 1, 0], 1, 4))
+        self.assertEqual(Product.objects.reconcile_ratings(), [])
+
+    def test_rating_min_filter(self):
+        self.review(self.users[0], 4)
+        Product.objects.create(title="Без отзывов", author="Автор", price=1)
+        response = self.client.get("/api/products/", {"rating_min": "3.5"})
+        titles = [item["title"] for item in response.json()["results"]]
+        self.assertEqual(titles, ["Книга"])
+
+    def test_api_edit_keeps_reviews(self):
+        self.review(self.users[0], 3)
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(
+            f"/api/products/{self.product.pk}/", {"stock": 7}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.histogram(), ([0, 0, 1, 0, 0], 1, 3))
+
+
+class SearchTests(APITestCase):
+    """
+    Полнотекстовый поиск ?q=: PostgreSQL и запасной вариант на LIKE
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dune = Product.objects.create(
+            title="Dune", author="Frank Herbert", description="Desert planet", price=1
+        )
+        cls.messiah = Product.objects.create(
+            title="Dune Messiah", author="Frank Herbert", description="Sequel", price=1
+        )
+        Product.objects.create(
+            title="Solaris", author="Stanislaw Lem", description="Ocean planet", price=1
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get("/api/products/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return {item["title"] for item in response.json()["results"]}
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search("planet"), {"Dune", "Solaris"})
+        self.assertEqual(self.search("herbert desert"), {"Dune"})
+        self.assertEqual(self.search("lem desert"), set())
+
+    def test_blank_query_lists_everything(self):
+        self.assertEqual(len(self.search("  ")), 3)
+
+    def test_queryset_search(self):
+        titles = Product.objects.search("Messiah").values_list("title", flat=True)
+        self.assertEqual(list(titles), ["Dune Messiah"])
+
+    @skipUnless(connection.vendor == "postgresql", "ранжирование ts_rank")
+    def test_rank_postgresql(self):
+        # Совпадение в названии (вес A) выше, чем в описании (вес C)
+        Product.objects.create(
+            title="Arrakis", author="Anon", description="About dune", price=1
+        )
+        titles = list(Product.objects.search("dune").values_list("title", flat=True))
+        self.assertEqual(titles[-1], "Arrakis")
+
+
+class AutocompleteTests(APITestCase):
+    """
+    Подсказки /api/products/autocomplete/
+    """
+
+    url = "/api/products/autocomplete/"
+
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.create(title="Dune", author="Frank Herbert", price=1)
+        Product.objects.create(title="The Dune Saga", author="Anon", price=1)
+        Product.objects.create(title="Solaris", author="Stanislaw Lem", price=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def suggest(self, query, **params):
+        response = self.client.get(self.url, {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_short_prefix(self):
+        self.assertEqual(self.suggest("du")["suggestions"], [])
+
+    def test_prefix_match_first(self):
+        data = self.suggest("  DUNE ")
+        self.assertEqual(data["query"], "dune")
+        self.assertEqual(
+            [item["title"] for item in data["suggestions"]], ["Dune", "The Dune Saga"]
+        )
+        self.assertEqual(set(data["suggestions"][0]), {"id", "title", "author"})
+
+    def test_author_and_limit(self):
+        self.assertEqual(len(self.suggest("herb")["suggestions"]), 1)
+        self.assertEqual(len(self.suggest("dun", limit=1)["suggestions"]), 1)
+        self.assertEqual(len(self.suggest("dun", limit="x")["suggestions"]), 2)
+
+
+class FacetTests(APITestCase):
+    """
+    Счетчики фасетов ?facets= по отфильтрованной выборке
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prose = Category.objects.create(name="Проза", slug="prose")
+        cls.poetry = Category.objects.create(name="Поэзия", slug="poetry")
+        for title, author, price, category, available in (
+            ("A", "Толстой", 300, cls.prose, True),
+            ("B", "Толстой", 700, cls.prose, False),
+            ("C", "Чехов", 1500, cls.prose, True),
+            ("D", "Пушкин", 2500, cls.poetry, True),
+            ("E", "Пушкин", 100, None, True),
+        ):
+            Product.objects.create(
+                title=title,
+                author=author,
+                price=price,
+                category=category,
+                is_available=available,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compute_facets(self):
+        with self.assertNumQueries(3):
+            facets = compute_facets(Product.objects.all(), FACET_NAMES)
+
+        self.assertEqual(list(facets), list(FACET_NAMES))
+        categories = [(item["name"], item["count"]) for item in facets["category"]]
+        self.assertEqual(categories[0], ("Проза", 3))
+        # Место NULL среди равных счетчиков зависит от БД
+        self.assertCountEqual(categories[1:], [("Поэзия", 1), (None, 1)])
+        self.assertEqual(
+            [(item["value"], item["count"]) for item in facets["author"]],
+            [("Пушкин", 2), ("Толстой", 2), ("Чехов", 1)],
+        )
+        self.assertEqual(
+            facets["is_available"],
+            [{"value": True, "count": 4}, {"value": False, "count": 1}],
+        )
+        self.assertEqual([item["count"] for item in facets["price"]], [2, 1, 1, 1])
+
+    def test_facets_follow_filters(self):
+        response = self.client.get(
+            "/api/products/",
+            {"facets": "author,unknown", "category": str(self.prose.pk)},
+        )
+        self.assertEqual(response.status_code, 200)
+        facets = response.json()["facets"]
+        self.assertEqual(list(facets), ["author"])
+        self.assertEqual(
+            facets["author"],
+            [{"value": "Толстой", "count": 2}, {"value": "Чехов", "count": 1}],
+        )
+
+    def test_author_limit(self):
+        with mock.patch("apps.products.facets.AUTHOR_FACET_LIMIT", 1):
+            facets = compute_facets(Product.objects.all(), ["author"])
+        self.assertEqual(facets["author"], [{"value": "Пушкин", "count": 2}])
+
+
+class CategorySubtreeTests(APITestCase):
+    """
+    Материализованные пути категорий и фильтр ?category_subtree=
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fiction = Category.objects.create(name="Художественная", slug="fiction")
+        cls.fantasy = Category.objects.create(
+            name="Фэнтези", slug="fantasy", parent=cls.fiction
+        )
+        cls.epic = Category.objects.create(name="Эпос", slug="epic", parent=cls.fantasy)
+        cls.science = Category.objects.create(name="Наука", slug="science")
+        for category in (cls.fiction, cls.fantasy, cls.epic, cls.science):
+            Product.objects.create(
+                title=category.slug, author="Автор", price=1, category=category
+            )
+
+    def setUp(self):
+        cache.clear()
+        # Подъемы версий из setUpTestData ждут COMMIT, которого в тесте нет
+        connection.run_on_commit.clear()
+
+    def subtree(self, *category_ids):
+        response = self.client.get(
+            "/api/products/",
+            {"category_subtree": ",".join(str(pk) for pk in category_ids)},
+        )
+        self.assertEqual(response.status_code, 200)
+        return {item["title"] for item in response.json()["results"]}
+
+    def test_paths(self):
+        self.epic.refresh_from_db()
+        self.assertEqual(self.epic.depth, 2)
+        self.assertEqual(
+            self.epic.path,
+            f"/{self.fiction.pk.hex}/{self.fantasy.pk.hex}/{self.epic.pk.hex}/",
+        )
+        self.assertEqual(list(self.epic.get_ancestors()), [self.fiction, self.fantasy])
+
+    def test_subtree_filter(self):
+        self.assertEqual(self.subtree(self.fiction.pk), {"fiction", "fantasy", "epic"})
+        self.assertEqual(
+            self.subtree(self.epic.pk, self.science.pk), {"epic", "science"}
+        )
+        self.assertEqual(self.subtree(uuid.uuid4()), set())
+
+    def test_invalid_id(self):
+        response = self.client.get("/api/products/", {"category_subtree": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_move_subtree(self):
+        self.fantasy.parent = self.science
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fantasy.save()
+
+        self.epic.refresh_from_db()
+        self.assertEqual(self.epic.path.count("/"), 4)
+        self.assertTrue(self.epic.path.startswith(f"/{self.science.pk.hex}/"))
+        self.assertEqual(self.subtree(self.fiction.pk), {"fiction"})
+        self.assertEqual(self.subtree(self.science.pk), {"science", "fantasy", "epic"})
+
+    def test_move_into_own_subtree(self):
+        self.fiction.parent = self.epic
+        with self.assertRaises(ValidationError):
+            self.fiction.save()
+
+
+class ProductImportTests(APITestCase):
+    """
+    Импорт товаров из CSV/JSONL: /api/products/import/
+    """
+
+    url = "/api/products/import/"
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = Role.objects.create(name="seller")
+        AccessRule.objects.create(
+            role=seller,
+            element=BusinessElement.objects.create(name="product"),
+            read_permission=True,
+            create_permission=True,
+            update_permission=True,
+        )
+        cls.admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="Test123!"
+        )
+        cls.seller = User.objects.create_user(
+            email="seller@test.com", username="seller", password="Test123!"
+        )
+        UserRole.objects.create(user=cls.seller, role=seller)
+        Category.objects.create(name="Проза", slug="prose")
+
+    def setUp(self):
+        cache.clear()
+
+    def upload(self, user, content, name="feed.csv"):
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_csv(self):
+        report = self.upload(
+            self.admin,
+            "external_id,title,author,price,stock,category\n"
+            "isbn-1,Первая,Автор,100,5,prose\n"
+            "isbn-2,Вторая,Автор,abc,,\n"
+            "isbn-3,Третья,Автор,300,,missing\n"
+            "isbn-1,Первая (2),Автор,150,,prose\n",
+        )
+        self.assertEqual((report["rows"], report["imported"]), (4, 1))
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3])
+        self.assertIn("price", report["errors"][0]["errors"])
+
+        # Повтор external_id в файле - строка записывается один раз, последней
+        product = Product.objects.get(external_id="isbn-1")
+        self.assertEqual((product.title, product.price), ("Первая (2)", 150))
+        self.assertEqual(product.category.slug, "prose")
+        self.assertEqual(product.owner, self.admin)
+
+    def test_jsonl_update(self):
+        Product.objects.create(
+            external_id="isbn-1", title="Старая", author="Автор", price=1, stock=9
+        )
+        report = self.upload(
+            self.admin,
+            '{"external_id": "isbn-1", "title": "Новая", "author": "А", "price": 5}\n'
+            "not json\n"
+            '{"external_id": "isbn-2", "title": "Другая", "author": "А", "price": 7}\n',
+            name="feed.jsonl",
+        )
+        self.assertEqual((report["rows"], report["imported"]), (3, 2))
+        self.assertEqual(report["errors"][0]["row"], 2)
+        product = Product.objects.get(external_id="isbn-1")
+        self.assertEqual((product.title, product.stock), ("Новая", 0))
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_update_scope(self):
+        Product.objects.create(
+            external_id="admin-1", title="Чужая", author="А", price=1, owner=self.admin
+        )
+        Product.objects.create(
+            external_id="own-1", title="Своя", author="А", price=1, owner=self.seller
+        )
+        report = self.upload(
+            self.seller,
+            "external_id,title,author,price\n"
+            "admin-1,Перезапись,А,2\n"
+            "own-1,Изменена,А,2\n"
+            "new-1,Новая,А,2\n",
+        )
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(
+            report["errors"],
+            [
+                {
+                    "row": 1,
+                    "errors": {"external_id": ["Нет прав на изменение этого товара"]},
+                }
+            ],
+        )
+        self.assertEqual(Product.objects.get(external_id="admin-1").title, "Чужая")
+        self.assertEqual(Product.objects.get(external_id="own-1").title, "Изменена")
+        self.assertEqual(Product.objects.get(external_id="new-1").owner, self.seller)
+
+
+class ProductExportTests(APITestCase):
+    """
+    Потоковая выгрузка каталога: /api/products/export/
+    """
+
+    url = "/api/products/export/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@test.com", username="admin", password="Test123!"
+        )
+        category = Category.objects.create(name="Проза", slug="prose")
+        start = timezone.now() - timedelta(days=1)
+        cls.products = []
+        for index in range(3):
+            product = Product.objects.create(
+                title=f"Книга {index}",
+                author='Автор, "в кавычках"',
+                price=100 + index,
+                category=category if index else None,
+            )
+            Product.objects.filter(pk=product.pk).update(
+                updated_at=start + timedelta(hours=index)
+            )
+            product.refresh_from_db()
+            cls.products.append(product)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        if params.get("gzip"):
+            self.assertEqual(response["Content-Type"], "application/gzip")
+            content = gzip.decompress(content)
+        return response, content.decode()
+
+    def test_csv(self):
+        response, content = self.export()
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual(
+            [row[0] for row in rows[1:]], [str(p.pk) for p in self.products]
+        )
+        self.assertEqual(rows[1][3], 'Автор, "в кавычках"')
+
+    def test_jsonl_gzip(self):
+        _, content = self.export(output="jsonl", gzip="true")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertIsNone(rows[0]["category_slug"])
+        self.assertEqual(
+            (rows[2]["category_slug"], rows[2]["price"]), ("prose", "102.00")
+        )
+
+    def test_resume_and_since(self):
+        first = self.products[0]
+        after = f"{first.updated_at.isoformat()},{first.pk}"
+        _, content = self.export(output="jsonl", after=after)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in content.splitlines()],
+            [str(p.pk) for p in self.products[1:]],
+        )
+
+        _, content = self.export(
+            output="jsonl", since=self.products[2].updated_at.isoformat()
+        )
+        self.assertEqual(len(content.splitlines()), 1)
+
+    def test_invalid_after(self):
+        response = self.client.get(self.url, {"after": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (401, 403))
+
+
+class ProductBulkUpdateTests(APITestCase):
+    """
+    Пакетное изменение цен и остатков: ошибки по строкам без отката пачки
+    """
+
+    url = "/api/products/bulk-update/"
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = Role.objects.create(name="seller")
+        AccessRule.objects.create(
+            role=seller,
+            element=BusinessElement.objects.create(name="product"),
+            read_permission=True,
+            update_permission=True,
+        )
+        cls.seller = User.objects.create_user(
+            email="seller@test.com", username="seller", password="Test123!"
+        )
+        UserRole.objects.create(user=cls.seller, role=seller)
+        cls.own = Product.objects.create(
+            title="Своя", author="А", price=100, stock=1, owner=cls.seller
+        )
+        cls.other = Product.objects.create(title="Чужая", author="А", price=100)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.seller)
+
+    def patch(self, items):
+        response = self.client.patch(self.url, {"items": items}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_row_errors(self):
+        result = self.patch(
+            [
+                {"id": str(self.own.pk), "price": "90.50", "stock": 3},
+                {"id": str(self.own.pk), "stock": 4},
+                {"id": str(self.other.pk), "price": "1"},
+                {"id": str(uuid.uuid4()), "stock": 1},
+                {"id": str(self.own.pk)},
+                {"id": "abc", "price": "-1"},
+            ]
+        )
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(
+            [(error["index"], sorted(error["errors"])) for error in result["errors"]],
+            [
+                (1, ["id"]),
+                (2, ["id"]),
+                (3, ["id"]),
+                (4, ["non_field_errors"]),
+                (5, ["id", "price"]),
+            ],
+        )
+
+        self.own.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.own.price, self.own.stock), (Decimal("90.50"), 3))
+        self.assertEqual(self.other.price, 100)
+
+    def test_updated_at_changes(self):
+        before = self.own.updated_at
+        self.patch([{"id": str(self.own.pk), "is_available": False}])
+        self.own.refresh_from_db()
+        self.assertFalse(self.own.is_available)
+        self.assertGreater(self.own.updated_at, before)
+
+    def test_empty_request(self):
+        response = self.client.patch(self.url, {"items": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class BestsellerRankingTests(APITestCase):
+    """
+    Рейтинг продаж с затуханием по времени (rankings.py)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(
+            email="buyer@test.com", username="buyer", password="Test123!"
+        )
+        cls.fiction = Category.objects.create(name="Проза", slug="prose")
+        cls.fantasy = Category.objects.create(
+            name="Фэнтези", slug="fantasy", parent=cls.fiction
+        )
+        cls.old_hit = Product.objects.create(
+            title="Старый хит", author="А", price=1, category=cls.fiction
+        )
+        cls.new_hit = Product.objects.create(
+            title="Новинка", author="А", price=1, category=cls.fantasy
+        )
+        cls.now = timezone.now()
+
+    def setUp(self):
+        cache.clear()
+
+    def sell(self, product, quantity, ago, status="pending"):
+        order = Order.objects.create(
+            customer=self.customer, shipping_address="Адрес", status=status
+        )
+        item = OrderItem.objects.create(
+            order=order, product=product, quantity=quantity, price=1
+        )
+        OrderItem.objects.filter(pk=item.pk).update(created_at=self.now - ago)
+
+    def ranks(self, category=None):
+        return list(
+            BestsellerRank.objects.filter(window="week", category=category)
+            .order_by("position")
+            .values_list("product__title", "score")
+        )
+
+    def test_decay_weight(self):
+        half_life = RANKING_HALF_LIVES["week"]
+        epoch = self.now - half_life
+        self.assertAlmostEqual(decay_weight(self.now, epoch, half_life), 2)
+        self.assertAlmostEqual(decay_weight(epoch, epoch, half_life), 1)
+
+    def test_older_sales_weigh_less(self):
+        lag = RANKING_LAG
+        self.sell(self.old_hit, 3, RANKING_HALF_LIVES["week"] * 2 + lag)
+        self.sell(self.new_hit, 1, lag)
+        self.sell(self.new_hit, 5, lag, status="cancelled")
+        update_rankings("week", now=self.now)
+
+        (first, first_score), (second, second_score) = self.ranks()
+        self.assertEqual((first, second), ("Новинка", "Старый хит"))
+        self.assertAlmostEqual(first_score, 1, places=3)
+        self.assertAlmostEqual(second_score, 0.75, places=3)
+
+        # Товар подкатегории попадает и в рейтинг родителя
+        self.assertEqual(len(self.ranks(self.fiction)), 2)
+        self.assertEqual([title for title, _ in self.ranks(self.fantasy)], ["Новинка"])
+
+    def test_incremental_matches_rebuild(self):
+        self.sell(self.old_hit, 4, timedelta(days=2))
+        update_rankings("week", now=self.now - timedelta(days=1))
+        self.sell(self.new_hit, 2, timedelta(hours=1))
+        result = update_rankings("week", now=self.now)
+        self.assertEqual((result["rebuild"], result["products"]), (False, 1))
+        incremental = self.ranks()
+
+        update_rankings("week", now=self.now, rebuild=True)
+        for (title, score), (expected_title, expected) in zip(
+            incremental, self.ranks()
+        ):
+            self.assertEqual(title, expected_title)
+            self.assertAlmostEqual(score, expected, places=4)
+
+    def test_api(self):
+        self.sell(self.new_hit, 1, timedelta(hours=1))
+        update_rankings("week", now=self.now)
+        response = self.client.get(
+            "/api/products/bestsellers/", {"category": str(self.fiction.pk)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["position"], row["title"]) for row in response.json()],
+            [(1, "Новинка")],
+        )
+
+        response = self.client.get(
+            "/api/products/bestsellers/", {"category": str(uuid.uuid4())}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductReadPathTests(APITestCase):
+    """
+    Список товаров: строки .values() и ProductReadSerializer
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Проза", slug="prose")
+        Product.objects.create(
+            title="С категорией", author="А", price=10, category=category
+        )
+        Product.objects.create(title="Без категории", author="Б", price="9.50")
+        Product.objects.bulk_create(
+            Product(title=f"Книга {i}", author="В", price=1, category=category)
+            for i in range(10)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_same_json_as_model_serializer(self):
+        response = self.client.get("/api/products/", {"page_size": 50})
+        self.assertEqual(response.status_code, 200)
+        rows = {row["id"]: row for row in response.json()["results"]}
+        self.assertEqual(len(rows), Product.objects.count())
+
+        for product in Product.objects.select_related("category"):
+            expected = json.loads(
+                json.dumps(ProductSerializer(product).data, cls=DjangoJSONEncoder)
+            )
+            self.assertEqual(rows[str(product.pk)], expected)
+
+    def test_single_query_per_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/?cursor=")
+        self.assertEqual(response.status_code, 200)
+        product_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if '"products_category"' in query["sql"]
+            or '"products_product"' in query["sql"]
+        ]
+        self.assertEqual(len(product_queries), 1, product_queries)
@@ -0,0 +1,58 @@
+from apps.core.cache import get_or_compute, get_version
+
+from .models import Category
+from .signals import CATEGORY_TREE_VERSION
+
+CATEGORY_TREE_CACHE_TIMEOUT = 3600
+
+
+def build_category_tree():
+    """
+    Дерево категорий одним запросом: при сортировке по глубине родитель
+    всегда раньше потомков
+    """
+
+    nodes = {}
+    roots = []
+    rows = Category.objects.order_by("depth", "name").values(
+        "id", "name", "slug", "parent_id", "path", "depth"
+    )
+    for row in rows:
+        node = {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "slug": row["slug"],
+            "depth": row["depth"],
+            "path": row["path"],
+            "children": [],
+        }
+        nodes[row["id"]] = node
+        parent = nodes.get(row["parent_id"])
+        (parent["children"] if parent else roots).append(node)
+    return {
+        "tree": roots,
+        "paths": {str(pk): node["path"] for pk, node in nodes.items()},
+    }
+
+
+def get_category_tree():
+    """
+    Кешированное дерево категорий и пути по id
+    """
+
+    return get_or_compute(
+        "products:category_tree",
+        build_category_tree,
+        CATEGORY_TREE_CACHE_TIMEOUT,
+        version=get_version(CATEGORY_TREE_VERSION),
+        name="products:category_tree",
+    )
+
+
+def get_subtree_paths(category_ids):
+    """
+    Материализованные пути категорий; неизвестные id пропускаются
+    """
+
+    paths = get_category_tree()["paths"]
+    return [paths[pk] for pk in category_ids if pk in paths]
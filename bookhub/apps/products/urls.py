@@ -5,9 +5,36 @@ from . import views
 urlpatterns = [
     # Товары
     path("", views.ProductListView.as_view(), name="product-list"),
+    path(
+        "autocomplete/",
+        views.ProductAutocompleteView.as_view(),
+        name="product-autocomplete",
+    ),
+    path(
+        "bestsellers/",
+        views.BestsellerListView.as_view(),
+        name="product-bestsellers",
+    ),
+    path("import/", views.ProductImportView.as_view(), name="product-import"),
+    path("export/", views.ProductExportView.as_view(), name="product-export"),
+    path(
+        "bulk-update/",
+        views.ProductBulkUpdateView.as_view(),
+        name="product-bulk-update",
+    ),
+    path(
+        "cache-stats/",
+        views.CatalogCacheStatsView.as_view(),
+        name="catalog-cache-stats",
+    ),
     path("<uuid:pk>/", views.ProductDetailView.as_view(), name="product-detail"),
     # Категории
     path("categories/", views.CategoryListView.as_view(), name="category-list"),
+    path(
+        "categories/tree/",
+        views.CategoryTreeView.as_view(),
+        name="category-tree",
+    ),
     path(
         "categories/<uuid:pk>/",
         views.CategoryDetailView.as_view(),
@@ -1,19 +1,101 @@
-from apps.authorization.permissions import PublicReadOnly, RBACPermission
-from rest_framework import generics
+import codecs
+import hashlib
+import logging
+
+from apps.authorization.permissions import IsAdmin, PublicReadOnly, RBACPermission
+from apps.core.cache import cache_stats
+from apps.core.conditional import ConditionalRetrieveMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import VersionedResponseCacheMixin, response_cache_stats
+from django.core.cache import cache
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .bulk import bulk_update_products
+from .exports import EXPORT_FORMATS, export_queryset, gzip_stream, iter_export_batches
+from .facets import get_facets, parse_facets
+from .filters import ProductFilterBackend, parse_filters
+from .imports import detect_format, import_products
 from .models import Category, Product
-from .serializers import CategorySerializer, ProductSerializer
+from .search import normalize_prefix
+from .serializers import (
+    BestsellerQuerySerializer,
+    BestsellerReadSerializer,
+    CategorySerializer,
+    ProductBulkUpdateSerializer,
+    ProductExportSerializer,
+    ProductImportSerializer,
+    ProductReadSerializer,
+    ProductSerializer,
+)
+from .signals import BESTSELLERS_VERSION, CATALOG_VERSION
+from .tree import get_category_tree, get_subtree_paths
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+# Триграммный GIN индекс не обслуживает шаблоны короче 3 символов:
+# более короткий префикс - полный перебор каталога
+AUTOCOMPLETE_MIN_LENGTH = 3
+AUTOCOMPLETE_LIMIT = 10
 
 
-class ProductListView(generics.ListCreateAPIView):
+class ProductListView(VersionedResponseCacheMixin, generics.ListCreateAPIView):
     """
-    Список товаров (публичный GET, создание - по правам)
+    Список товаров (публичный GET, создание - по правам).
+
+    ?q= - полнотекстовый поиск по названию, автору и описанию;
+    ?category=, ?category_subtree=, ?author=, ?price_min=, ?price_max=,
+    ?rating_min=, ?is_available= - фильтры (category_subtree - категория
+    с подкатегориями);
+    ?facets=category,author,is_available,price - счетчики для фильтров;
+    ?cursor= - постраничный вывод по курсору (см. KeysetPagination),
+    ?ordering=-rating_avg - сначала товары с высоким рейтингом.
+    Ответы GET кешируются до следующего изменения каталога.
     """
 
+    response_cache_namespace = CATALOG_VERSION
+    response_cache_name = "products"
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    filter_backends = [ProductFilterBackend]
+    pagination_class = KeysetPagination
+    keyset_orderings = ("-created_at", "created_at", "price", "-price", "-rating_avg")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get("q", "").strip()
+        if query:
+            queryset = queryset.search(query)
+        if self.request.method == "GET":
+            # Чтение списка: только нужные колонки, категория - через JOIN
+            queryset = queryset.values(*ProductReadSerializer.FIELDS)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ProductReadSerializer
+        return ProductSerializer
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        names = parse_facets(request.query_params.get("facets"))
+        if names:
+            params = {
+                "q": request.query_params.get("q", "").strip(),
+                **parse_filters(request.query_params),
+            }
+            response.data["facets"] = get_facets(
+                self.filter_queryset(self.get_queryset()), names, params
+            )
+        return response
 
     def get_permissions(self):
         """
@@ -26,12 +108,197 @@ class ProductListView(generics.ListCreateAPIView):
             return [RBACPermission(element_name="product")]
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductAutocompleteView(APIView):
     """
-    Детальный просмотр товара
+    Подсказки для строки поиска: ?q=<префикс от 3 символов>&limit=<до 10>.
+
+    Ответ кешируется на короткое время по нормализованному префиксу.
+    """
+
+    permission_classes = [PublicReadOnly]
+
+    def get(self, request):
+        prefix = normalize_prefix(request.query_params.get("q", ""))
+        try:
+            limit = int(request.query_params.get("limit", AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, AUTOCOMPLETE_LIMIT))
+
+        suggestions = []
+        if len(prefix) >= AUTOCOMPLETE_MIN_LENGTH:
+            digest = hashlib.sha1(prefix.encode()).hexdigest()
+            cache_key = f"products:autocomplete:{limit}:{digest}"
+            suggestions = cache.get(cache_key)
+            if suggestions is None:
+                suggestions = [
+                    {
+                        "id": str(row["id"]),
+                        "title": row["title"],
+                        "author": row["author"],
+                    }
+                    for row in Product.objects.autocomplete(prefix, limit)
+                ]
+                cache.set(cache_key, suggestions, AUTOCOMPLETE_CACHE_TIMEOUT)
+
+        response = Response({"query": prefix, "suggestions": suggestions})
+        response["Cache-Control"] = f"public, max-age={AUTOCOMPLETE_CACHE_TIMEOUT}"
+        return response
+
+
+class BestsellerListView(VersionedResponseCacheMixin, generics.ListAPIView):
+    """
+    Бестселлеры окна: ?window=week|month, ?category= (с подкатегориями),
+    ?limit= (до RANKING_TOP_K).
+
+    Читается готовый топ-K (см. rankings.py) по индексу (окно, категория,
+    место); ответ кешируется до пересчета рейтинга или изменения каталога.
     """
 
+    response_cache_namespace = (CATALOG_VERSION, BESTSELLERS_VERSION)
+    response_cache_name = "bestsellers"
+    permission_classes = [PublicReadOnly]
+    serializer_class = BestsellerReadSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        params = BestsellerQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        category_id = params.validated_data.get("category")
+
+        queryset = Product.objects.filter(
+            bestseller_ranks__window=params.validated_data["window"],
+            bestseller_ranks__category_id=category_id,
+            is_available=True,
+        )
+        if category_id is not None:
+            paths = get_subtree_paths([str(category_id)])
+            if not paths:
+                raise NotFound("Категория не найдена")
+            # Товар могли перенести в другую категорию после пересчета
+            queryset = queryset.filter(category__path__startswith=paths[0])
+        return queryset.order_by("bestseller_ranks__position").values(
+            *ProductReadSerializer.FIELDS,
+            position=F("bestseller_ranks__position"),
+            sales_score=F("bestseller_ranks__score"),
+        )[: params.validated_data["limit"]]
+
+
+class ProductImportView(generics.GenericAPIView):
+    """
+    Импорт товаров из CSV/JSONL файла (multipart, поле file).
+
+    Новые товары создаются, существующие обновляются по external_id, если
+    пользователь может их изменять (иначе - ошибка строки); ответ - число
+    строк, записанных товаров и ошибки по строкам.
+    Для фидов на сотни тысяч строк - команда import_products.
+    """
+
+    parser_classes = [MultiPartParser]
     queryset = Product.objects.all()
+    # Обновлять можно только товары из области update пользователя
+    filter_backends = [RBACPermission.filter_backend]
+    business_element_name = "product"
+
+    def get_permissions(self):
+        return [RBACPermission(element_name="product")]
+
+    def post(self, request):
+        serializer = ProductImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        upload = params["file"]
+
+        def progress(report):
+            logger.info(
+                "Импорт товаров %s: строк %s, записано %s, ошибок %s",
+                upload.name,
+                report["rows"],
+                report["imported"],
+                report["error_count"],
+            )
+
+        # Файл читается построчно: большой upload лежит во временном файле
+        report = import_products(
+            codecs.iterdecode(upload, "utf-8-sig"),
+            format=params.get("format") or detect_format(upload.name),
+            owner=request.user,
+            batch_size=params["batch_size"],
+            progress=progress,
+            update_queryset=self.filter_queryset(self.get_queryset()),
+        )
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class ProductExportView(APIView):
+    """
+    Выгрузка всего каталога потоком: ?output=csv|jsonl, ?gzip=true.
+
+    Строки идут в порядке (updated_at, id) из серверного курсора, без COUNT
+    и без пагинации. ?since= - только измененные с момента, ?after= -
+    продолжение после последней полученной строки.
+    """
+
+    def get_permissions(self):
+        return [IsAuthenticated(), RBACPermission(element_name="product")]
+
+    def get(self, request):
+        serializer = ProductExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        render, content_type = EXPORT_FORMATS[params["output"]]
+        batches = iter_export_batches(
+            export_queryset(since=params.get("since"), after=params.get("after"))
+        )
+        filename = f"catalog-{timezone.now():%Y%m%d-%H%M%S}.{params['output']}"
+        stream = render(batches)
+        if params["gzip"]:
+            stream = gzip_stream(stream)
+            content_type = "application/gzip"
+            filename += ".gz"
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ProductBulkUpdateView(generics.GenericAPIView):
+    """
+    Пакетное изменение цены, остатка и доступности:
+    PATCH {"items": [{"id", "price", "stock", "is_available"}, ...]}.
+
+    Право update проверяется один раз, доступные строки (свои/все)
+    отбираются RBAC фильтром в SQL; ошибки - по строкам, без отката пачки.
+    """
+
+    queryset = Product.objects.all()
+    filter_backends = [RBACPermission.filter_backend]
+    business_element_name = "product"
+
+    def get_permissions(self):
+        return [RBACPermission(element_name="product")]
+
+    def patch(self, request):
+        serializer = ProductBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_update_products(
+            self.filter_queryset(self.get_queryset()),
+            serializer.validated_data["items"],
+        )
+        return Response(result)
+
+
+class ProductDetailView(
+    ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    """
+    Детальный просмотр товара (GET поддерживает ETag / If-None-Match)
+    """
+
+    # В ответе есть название категории - ее изменение тоже меняет ETag
+    conditional_timestamps = ("updated_at", "category__updated_at")
+    queryset = Product.objects.select_related("category")
     serializer_class = ProductSerializer
 
     def get_permissions(self):
@@ -45,11 +312,13 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
             return [RBACPermission(element_name="product")]
 
 
-class CategoryListView(generics.ListCreateAPIView):
+class CategoryListView(VersionedResponseCacheMixin, generics.ListCreateAPIView):
     """
     Список категорий
     """
 
+    response_cache_namespace = CATALOG_VERSION
+    response_cache_name = "categories"
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
@@ -60,9 +329,22 @@ class CategoryListView(generics.ListCreateAPIView):
             return [RBACPermission(element_name="category")]
 
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryTreeView(APIView):
+    """
+    Все дерево категорий одним ответом (из кеша до изменения категорий)
+    """
+
+    permission_classes = [PublicReadOnly]
+
+    def get(self, request):
+        return Response(get_category_tree()["tree"])
+
+
+class CategoryDetailView(
+    ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
-    Детальный просмотр категории
+    Детальный просмотр категории (GET поддерживает ETag / If-None-Match)
     """
 
     queryset = Category.objects.all()
@@ -75,6 +357,27 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
             return [RBACPermission(element_name="category")]
 
 
+class CatalogCacheStatsView(APIView):
+    """
+    Статистика кешей каталога: ответы, фасеты, дерево (только для админов)
+    """
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        stats = {
+            name: response_cache_stats(name)
+            for name in (
+                ProductListView.response_cache_name,
+                CategoryListView.response_cache_name,
+                BestsellerListView.response_cache_name,
+            )
+        }
+        stats["facets"] = cache_stats("products:facets")
+        stats["category_tree"] = cache_stats("products:category_tree")
+        return Response(stats)
+
+
 class TestRBACView(APIView):
     """
     Тестовый endpoint для демонстрации работы RBAC
@@ -50,6 +50,9 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
 
     objects = UserManager()
 
+    # Владелец профиля - сам пользователь (см. apps.core.ownership)
+    owner_field = "pk"
+
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
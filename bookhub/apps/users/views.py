@@ -16,23 +16,14 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.filter(deleted_at__isnull=True)  # Только не удаленные
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated, RBACPermission]
+    filter_backends = [RBACPermission.filter_backend]
 
     # Указываем бизнес-элемент для RBAC
     business_element_name = "user"
 
     def get_queryset(self):
-        user = self.request.user
-
-        # Админы видят всех пользователей
-        if user.is_staff:
-            return User.objects.filter(deleted_at__isnull=True)
-
-        # Менеджеры видят всех пользователей (но не могут удалять)
-        if user.roles.filter(name="manager").exists():
-            return User.objects.filter(deleted_at__isnull=True)
-
-        # Обычные пользователи видят только себя
-        return User.objects.filter(id=user.id, deleted_at__isnull=True)
+        # Всех или только себя - решает RBACFilterBackend по read/read_all
+        return User.objects.filter(deleted_at__isnull=True)
 
     def perform_destroy(self, instance):
         """
@@ -179,6 +179,9 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = "BookHub <noreply@bookhub.com>"
 
+# Аудит решений RBAC: отказы пишутся всегда, разрешения - выборочно
+RBAC_AUDIT_SAMPLE_RATE = float(os.getenv("RBAC_AUDIT_SAMPLE_RATE", "0.1"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -186,11 +189,19 @@ LOGGING = {
         "console": {
             "class": "logging.StreamHandler",
         },
+        "rbac_audit": {
+            "class": "apps.authorization.audit.AuditQueueHandler",
+        },
     },
     "loggers": {
         "apps.authorization": {
             "handlers": ["console"],
+            "level": "WARNING",
+        },
+        "apps.authorization.audit": {
+            "handlers": ["rbac_audit"],
             "level": "INFO",
+            "propagate": False,
         },
         "apps.orders": {
             "handlers": ["console"],
@@ -18,6 +18,7 @@ def api_root(request):
                 "products": "/api/products/",
                 "orders": "/api/orders/",
                 "users": "/api/users/",
+                "permissions": "/api/permissions/check/",
                 "admin": "/admin/",
                 "swagger": "/swagger/",
                 "redoc": "/redoc/",
@@ -43,6 +44,7 @@ urlpatterns = [
     # Админ
     path("admin/", admin.site.urls),
     path("api/admin/permissions/", include("apps.authorization.urls")),
+    path("api/permissions/", include("apps.authorization.check_urls")),
     # Документация API
     path(
         "swagger/",
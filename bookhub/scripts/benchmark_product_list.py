@@ -0,0 +1,126 @@
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookhub.settings")
+django.setup()
+
+from apps.products.models import Category, Product  # noqa: E402
+from apps.products.serializers import (  # noqa: E402
+    ProductReadSerializer,
+    ProductSerializer,
+)
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+
+def model_path(size):
+    """
+    Старый путь: экземпляры моделей и ProductSerializer (category.name)
+    """
+
+    products = Product.objects.all().order_by("-created_at", "-id")[:size]
+    return JSONRenderer().render(ProductSerializer(products, many=True).data)
+
+
+def read_path(size):
+    """
+    Новый путь: .values() с категорией через JOIN и ProductReadSerializer
+    """
+
+    rows = Product.objects.order_by("-created_at", "-id").values(
+        *ProductReadSerializer.FIELDS
+    )[:size]
+    return JSONRenderer().render(ProductReadSerializer(rows, many=True).data)
+
+
+def measure(path, size, iterations):
+    """
+    Запросы, пик выделенной памяти и время одной страницы
+    """
+
+    with CaptureQueriesContext(connection) as captured:
+        path(size)
+    queries = len(captured.captured_queries)
+
+    tracemalloc.start()
+    path(size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        path(size)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "queries": queries,
+        "peak_kb": round(peak / 1024, 1),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+    }
+
+
+def main():
+    """
+    Сравнение путей чтения списка товаров на страницах 20/100/1000
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Бенчмарк списка товаров")
+    parser.add_argument("--sizes", default="20,100,1000")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--output", help="Сохранить отчет в JSON файл")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    report = {}
+    # Данные бенчмарка откатываются вместе с транзакцией
+    with transaction.atomic():
+        rnd = random.Random(42)
+        categories = Category.objects.bulk_create(
+            Category(name=f"Bench {i}", slug=f"bench-list-{i}")
+            for i in range(args.categories)
+        )
+        Product.objects.bulk_create(
+            Product(
+                title=f"Книга {i}",
+                author=f"Автор {i % 100}",
+                description="Описание " * 20,
+                price=rnd.randint(100, 5000),
+                stock=rnd.randint(0, 50),
+                category=rnd.choice(categories),
+            )
+            for i in range(max(sizes))
+        )
+
+        print(f"{'page':>6} {'path':>6} {'queries':>8} {'peak KB':>9} {'median':>10}")
+        for size in sizes:
+            for name, path in (("model", model_path), ("read", read_path)):
+                result = measure(path, size, args.iterations)
+                report[f"{size}:{name}"] = result
+                print(
+                    f"{size:>6} {name:>6} {result['queries']:>8} "
+                    f"{result['peak_kb']:>9} {result['median_ms']:>8.2f}ms"
+                )
+
+        transaction.set_rollback(True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Отчет сохранен: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
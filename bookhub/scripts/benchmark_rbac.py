@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookhub.settings")
+django.setup()
+
+from apps.authorization.hierarchy import RBAC_VERSION  # noqa: E402
+from apps.authorization.models import (  # noqa: E402
+    AccessRule,
+    BusinessElement,
+    Role,
+    UserRole,
+)
+from apps.authorization.permissions import (  # noqa: E402
+    IsCustomer,
+    IsManager,
+    IsOwnerOrAdmin,
+    RBACPermission,
+)
+from apps.core.cache import bump_version  # noqa: E402
+from apps.orders.models import Order  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+PERMISSION_CLASSES = {
+    "RBACPermission": RBACPermission,
+    "IsManager": IsManager,
+    "IsCustomer": IsCustomer,
+    "IsOwnerOrAdmin": IsOwnerOrAdmin,
+}
+
+FLAGS = [
+    "read_permission",
+    "read_all_permission",
+    "create_permission",
+    "update_permission",
+    "update_all_permission",
+    "delete_permission",
+    "delete_all_permission",
+]
+
+
+class BenchView:
+    """Минимальное представление для вызова permission-классов"""
+
+    business_element_name = "order"
+    action = "retrieve"
+
+
+def build_dataset(roles_count, elements_count, density, user_roles_count, seed):
+    """
+    Создает роли, бизнес-элементы, правила и пользователей для замера
+    """
+
+    rnd = random.Random(seed)
+
+    roles = Role.objects.bulk_create(
+        Role(name=f"bench_role_{i:04d}", description="benchmark")
+        for i in range(roles_count)
+    )
+    # Цепочки наследования по 10 ролей
+    for index, role in enumerate(roles):
+        if index % 10:
+            role.parent = roles[index - 1]
+    Role.objects.bulk_update(roles, ["parent"])
+
+    for name in ("manager", "customer", "guest"):
+        Role.objects.get_or_create(name=name)
+    order_element, _ = BusinessElement.objects.get_or_create(name="order")
+
+    elements = BusinessElement.objects.bulk_create(
+        BusinessElement(name=f"bench_el_{i:04d}", description="benchmark")
+        for i in range(elements_count)
+    )
+    elements.append(order_element)
+
+    rules = []
+    for role in roles:
+        for element in rnd.sample(elements, max(1, int(len(elements) * density))):
+            rules.append(
+                AccessRule(
+                    role=role,
+                    element=element,
+                    **{flag: rnd.random() < 0.3 for flag in FLAGS},
+                )
+            )
+    AccessRule.objects.bulk_create(rules, ignore_conflicts=True)
+
+    users = {}
+    for label, count in (("few_roles", 2), ("many_roles", user_roles_count)):
+        user = User(
+            email=f"bench_{label}@bench.local",
+            username=f"bench_{label}",
+            is_active=True,
+        )
+        user.set_unusable_password()
+        user.save()
+        # post_save назначает customer - оставляем только роли бенчмарка
+        UserRole.objects.filter(user=user).delete()
+        UserRole.objects.bulk_create(
+            UserRole(user=user, role=role) for role in rnd.sample(roles, count)
+        )
+        users[label] = (user, Order.objects.create(customer=user, shipping_address="-"))
+
+    bump_version(RBAC_VERSION)
+    return {"rules": len(rules), "users": users}
+
+
+def make_request(user):
+    request = Request(APIRequestFactory().get("/api/orders/orders/"))
+    request.user = user
+    return request
+
+
+def measure(permission_class, check, user, order, iterations):
+    """
+    Замеряет время и число запросов одной проверки (свежий запрос на итерацию)
+    """
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        request = make_request(user)
+        obj = Order.objects.get(pk=order.pk)
+        permission = permission_class()
+        view = BenchView()
+
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            if check == "has_permission":
+                permission.has_permission(request, view)
+            else:
+                permission.has_object_permission(request, view, obj)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+        "cold_queries": queries[0],
+        "queries": statistics.median(queries[1:] or queries),
+    }
+
+
+def run(args):
+    """
+    Строит данные, замеряет все permission-классы и откатывает изменения
+    """
+
+    # Аудит решений не должен засорять вывод и замер
+    logging.getLogger("apps.authorization.audit").disabled = True
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "scale": {
+            "roles": args.roles,
+            "elements": args.elements,
+            "density": args.density,
+            "user_roles": args.user_roles,
+            "iterations": args.iterations,
+        },
+        "results": {},
+        "flagged": [],
+    }
+
+    with transaction.atomic():
+        dataset = build_dataset(
+            args.roles, args.elements, args.density, args.user_roles, args.seed
+        )
+        report["scale"]["access_rules"] = dataset["rules"]
+
+        for name, permission_class in PERMISSION_CLASSES.items():
+            for check in ("has_permission", "has_object_permission"):
+                path = f"{name}.{check}"
+                by_user = {
+                    label: measure(
+                        permission_class, check, user, order, args.iterations
+                    )
+                    for label, (user, order) in dataset["users"].items()
+                }
+                report["results"][path] = by_user
+
+                # Число запросов не должно зависеть от количества ролей
+                if by_user["many_roles"]["queries"] > by_user["few_roles"]["queries"]:
+                    report["flagged"].append(path)
+
+        transaction.set_rollback(True)
+
+    # Откат не трогает кеш - сбрасываем скомпилированные права бенчмарка
+    bump_version(RBAC_VERSION)
+    return report
+
+
+def print_report(report):
+    print(f"\nRBAC benchmark ({report['generated_at']})")
+    print(", ".join(f"{key}={value}" for key, value in report["scale"].items()))
+    print("=" * 78)
+    print(f"{'path':42} {'roles':>10} {'median':>9} {'p95':>9} {'q':>3}")
+    for path, by_user in report["results"].items():
+        for label, data in by_user.items():
+            mark = " !" if path in report["flagged"] else ""
+            print(
+                f"{path:42} {label:>10} {data['median_ms']:>8.3f}ms "
+                f"{data['p95_ms']:>7.3f}ms {data['queries']:>3}{mark}"
+            )
+    print("=" * 78)
+    if report["flagged"]:
+        print("Число запросов растет с количеством ролей:")
+        for path in report["flagged"]:
+            print(f"   • {path}")
+    else:
+        print("Число запросов не зависит от количества ролей")
+
+
+def main():
+    """
+    Бенчмарк проверок прав RBAC на больших объемах данных
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Бенчмарк RBAC permission-классов")
+    parser.add_argument("--roles", type=int, default=120, help="Количество ролей")
+    parser.add_argument(
+        "--elements", type=int, default=300, help="Количество бизнес-элементов"
+    )
+    parser.add_argument(
+        "--density", type=float, default=0.2, help="Доля элементов с правилом у роли"
+    )
+    parser.add_argument(
+        "--user-roles", type=int, default=100, help="Ролей у 'тяжелого' пользователя"
+    )
+    parser.add_argument("--iterations", type=int, default=200, help="Повторов замера")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Сохранить отчет в JSON файл")
+    parser.add_argument(
+        "--fail-on-growth",
+        action="store_true",
+        help="Код возврата 1, если число запросов растет с числом ролей",
+    )
+    args = parser.parse_args()
+    args.user_roles = min(args.user_roles, args.roles)
+
+    report = run(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nОтчет сохранен: {args.output}")
+
+    if args.fail_on_growth and report["flagged"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
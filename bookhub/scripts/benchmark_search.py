@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookhub.settings")
+django.setup()
+
+from apps.products.models import Product  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+WORDS = [
+    "война",
+    "мир",
+    "преступление",
+    "наказание",
+    "мастер",
+    "маргарита",
+    "история",
+    "программирование",
+    "алгоритмы",
+    "python",
+    "django",
+    "database",
+    "design",
+    "patterns",
+    "science",
+    "history",
+    "roman",
+    "детектив",
+    "путешествие",
+    "философия",
+]
+AUTHORS = ["Толстой", "Достоевский", "Булгаков", "Knuth", "Fowler", "Martin"]
+QUERIES = ["война и мир", "толстой", "программирования", "design patterns", "knuth"]
+
+
+def generate_products(count, batch_size, seed):
+    """
+    Создает count товаров со случайными названиями и описаниями
+    """
+
+    rnd = random.Random(seed)
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        Product.objects.bulk_create(
+            Product(
+                title=" ".join(rnd.choices(WORDS, k=3)).capitalize(),
+                author=rnd.choice(AUTHORS),
+                description=" ".join(rnd.choices(WORDS, k=30)),
+                price=rnd.randint(100, 5000),
+                stock=rnd.randint(0, 100),
+            )
+            for _ in range(size)
+        )
+        created += size
+        print(f"   создано {created}/{count}", end="\r")
+    print()
+
+
+def measure(query, iterations, page_size):
+    """
+    Время получения первой страницы результатов поиска
+    """
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        list(Product.objects.search(query).values("id", "title")[:page_size])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+    }
+
+
+def main():
+    """
+    Бенчмарк полнотекстового поиска по каталогу
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска товаров (?q=)")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--explain", action="store_true", help="Показать план запроса")
+    parser.add_argument("--output", help="Сохранить отчет в JSON файл")
+    args = parser.parse_args()
+
+    print(f"Поиск по {args.products} товарам ({connection.vendor})")
+    report = {"vendor": connection.vendor, "products": args.products, "results": {}}
+
+    # Данные бенчмарка откатываются вместе с транзакцией
+    with transaction.atomic():
+        generate_products(args.products, args.batch_size, args.seed)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE products_product")
+
+        for query in QUERIES:
+            result = measure(query, args.iterations, args.page_size)
+            report["results"][query] = result
+            print(
+                f"   {query:25} median {result['median_ms']:>9.3f}ms "
+                f"p95 {result['p95_ms']:>9.3f}ms"
+            )
+            if args.explain:
+                print(Product.objects.search(query)[: args.page_size].explain())
+
+        transaction.set_rollback(True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Отчет сохранен: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,14 @@ def create_roles():
 
     for name, description in roles_data:
         Role.objects.get_or_create(name=name, defaults={"description": description})
+
+    # Иерархия: каждая роль наследует права родительской. Менеджер - не
+    # покупатель, поэтому наследует права гостя, а не корзину и заказы
+    hierarchy = [("customer", "guest"), ("manager", "guest"), ("admin", "manager")]
+    for name, parent_name in hierarchy:
+        role = Role.objects.get(name=name)
+        role.parent = Role.objects.get(name=parent_name)
+        role.save()
     print("✅ Роли созданы")
 
 
@@ -50,7 +58,10 @@ def create_business_elements():
 
 def create_access_rules():
     """
-    Создаем базовые правила доступа
+    Создаем базовые правила доступа.
+
+    Права родительской роли наследуются, поэтому у каждой роли
+    заведены только правила, которых нет у ее предков.
     """
 
     # Получаем роли
@@ -59,11 +70,10 @@ def create_access_rules():
     customer_role = Role.objects.get(name="customer")
     guest_role = Role.objects.get(name="guest")
 
-    # Получаем все элементы
-    elements = BusinessElement.objects.all()
+    manager_elements = ["product", "category", "order", "review"]
 
-    # Правила для Администратора
-    for element in elements:
+    # Правила для Администратора (остальное наследуется от менеджера)
+    for element in BusinessElement.objects.exclude(name__in=manager_elements):
         AccessRule.objects.get_or_create(
             role=admin_role,
             element=element,
@@ -79,7 +89,6 @@ def create_access_rules():
         )
 
     # Правила для Менеджера
-    manager_elements = ["product", "category", "order", "review"]
     for element_name in manager_elements:
         element = BusinessElement.objects.get(name=element_name)
         AccessRule.objects.get_or_create(
@@ -96,39 +105,23 @@ def create_access_rules():
             },
         )
 
-    # Правила для Покупателя
-    customer_elements = ["product", "category", "order", "cart", "review"]
+    # Правила для Покупателя (чтение товаров и категорий - от гостя)
+    customer_elements = ["order", "cart", "review"]
     for element_name in customer_elements:
         element = BusinessElement.objects.get(name=element_name)
-        if element_name in ["order", "cart", "review"]:
-            AccessRule.objects.get_or_create(
-                role=customer_role,
-                element=element,
-                defaults={
-                    "read_permission": True,
-                    "read_all_permission": False,
-                    "create_permission": True,
-                    "update_permission": True,
-                    "update_all_permission": False,
-                    "delete_permission": True,
-                    "delete_all_permission": False,
-                },
-            )
-        else:
-            # Для товаров и категорий - только чтение
-            AccessRule.objects.get_or_create(
-                role=customer_role,
-                element=element,
-                defaults={
-                    "read_permission": True,
-                    "read_all_permission": True,
-                    "create_permission": False,
-                    "update_permission": False,
-                    "update_all_permission": False,
-                    "delete_permission": False,
-                    "delete_all_permission": False,
-                },
-            )
+        AccessRule.objects.get_or_create(
+            role=customer_role,
+            element=element,
+            defaults={
+                "read_permission": True,
+                "read_all_permission": False,
+                "create_permission": True,
+                "update_permission": True,
+                "update_all_permission": False,
+                "delete_permission": True,
+                "delete_all_permission": False,
+            },
+        )
 
     # Правила для Гостя
     guest_elements = ["product", "category"]